@@ -1,9 +1,13 @@
 """aligner.py"""
-from typing import Tuple, Dict
+from functools import lru_cache
+from typing import Tuple, Dict, List, Optional
 
+import numpy as np
 
-def positional_alignment(match_reward: int, mismatch_penalty: int, indel_penalty: int, s: str,
-                         t: str) -> Tuple[int, str, str, Dict[int, Tuple[int, int]]]:
+
+
+def positional_alignment(match_reward: int, mismatch_penalty: int, indel_penalty: int, s: str, t: str,
+                         profile: Optional["ReferenceProfile"] = None) -> Tuple[int, str, str, Dict[int, Tuple[int, int]]]:
     """
     Perform local sequence alignment between two strings using dynamic programming.
 
@@ -18,6 +22,8 @@ def positional_alignment(match_reward: int, mismatch_penalty: int, indel_penalty
         indel_penalty (int): The penalty (negative score) to assign for insertions and deletions.
         s (str): The source string to align.
         t (str): The target string to align with the source string.
+        profile (Optional[ReferenceProfile]): Accepted for a uniform engine interface and not used, this engine
+                                              compares characters directly.
 
     Returns:
         max_score (int): The highest score achieved in the alignment.
@@ -77,3 +83,630 @@ def positional_alignment(match_reward: int, mismatch_penalty: int, indel_penalty
             scores_at_positions[pos] = (dp[len(s)][pos], alignment_length)
 
     return max_score, aligned_s, aligned_t, scores_at_positions
+
+
+def positional_scores(match_reward: int, mismatch_penalty: int, indel_penalty: int, s: str, t: str,
+                      profile: Optional["ReferenceProfile"] = None) -> Tuple[int, Dict[int, Tuple[int, int]]]:
+    """
+    Compute the positional scores of a local alignment without building the aligned strings.
+
+    Returns the same `max_score` and `scores_at_positions` as `positional_alignment`, but keeps only two rolling DP
+    rows plus a row tracking the length (in target characters) of the best path into each cell, so memory is
+    O(len(t)) instead of O(len(s) * len(t)).
+
+    Args:
+        match_reward (int): The score to reward when characters match.
+        mismatch_penalty (int): The penalty (negative score) to assign for character mismatches.
+        indel_penalty (int): The penalty (negative score) to assign for insertions and deletions.
+        s (str): The source string to align.
+        t (str): The target string to align with the source string.
+        profile (Optional[ReferenceProfile]): Accepted for a uniform engine interface and not used, this engine
+                                              compares characters directly.
+
+    Returns:
+        max_score (int): The highest score achieved in the alignment.
+        scores_at_positions (Dict[int, Tuple[int, int]]): A dictionary mapping each position in the target string where an actual alignment occurred to the score achieved at that position and the final length of aligned_t.
+    """
+    prev_row = [0] * (len(t) + 1)
+    prev_lengths = [0] * (len(t) + 1)
+    max_score = 0
+    alignment_length = 0
+
+    for i in range(1, len(s) + 1):
+        row = [0] * (len(t) + 1)
+        lengths = [0] * (len(t) + 1)
+        for j in range(1, len(t) + 1):
+            match = match_reward if s[i - 1] == t[j - 1] else -mismatch_penalty
+            up = prev_row[j] - indel_penalty
+            left = row[j - 1] - indel_penalty
+            diagonal = prev_row[j - 1] + match
+            score = max(0, up, left, diagonal)
+            row[j] = score
+
+            # Same tie-breaking as the backtrack in positional_alignment: stop, up, left, diagonal.
+            if score == 0:
+                lengths[j] = 0
+            elif score == up:
+                lengths[j] = prev_lengths[j]
+            elif score == left:
+                lengths[j] = lengths[j - 1] + 1
+            else:
+                lengths[j] = prev_lengths[j - 1] + 1
+
+            if score > max_score:
+                max_score = score
+                alignment_length = lengths[j]
+        prev_row, prev_lengths = row, lengths
+
+    scores_at_positions = {}
+    for pos in range(1, len(t) + 1):
+        if prev_row[pos] > 0:
+            scores_at_positions[pos] = (prev_row[pos], alignment_length)
+
+    return max_score, scores_at_positions
+
+
+def _encode(sequence: str) -> np.ndarray:
+    """Encodes a sequence as an array of byte codes so characters can be compared with array operations."""
+    return np.frombuffer(sequence.encode(), dtype=np.uint8)
+
+
+def _score_dtype(match_reward: int, mismatch_penalty: int, indel_penalty: int, s_length: int, t_length: int) -> type:
+    """Returns int32 when no DP cell can overflow it, which halves the memory traffic of the array engines."""
+    bound = (s_length + t_length + 1) * max(abs(match_reward), abs(mismatch_penalty), abs(indel_penalty), 1)
+    return np.int32 if bound < np.iinfo(np.int32).max // 2 else np.int64
+
+
+def _substitution_profile(match_reward: int, mismatch_penalty: int, t: str, dtype: type = np.int64) -> np.ndarray:
+    """
+    Builds a substitution score profile for the target string.
+
+    Row ``c`` of the profile holds the match/mismatch score of byte code ``c`` against every character of t, so the
+    scores for a whole DP row are a single lookup of the source character.
+    """
+    codes = np.arange(256, dtype=np.uint8)
+    return np.where(codes[:, None] == _encode(t)[None, :], match_reward, -mismatch_penalty).astype(dtype)
+
+
+def _gap_offsets(indel_penalty: int, t_length: int, dtype: type = np.int64) -> np.ndarray:
+    """Returns k * indel_penalty for every column k, used to unroll the horizontal gap recurrence."""
+    return (np.arange(t_length + 1) * indel_penalty).astype(dtype)
+
+
+class ReferenceProfile:
+    """
+    A reference sequence preprocessed once for the array engines, so that aligning many reads against it does not
+    re-encode it or rebuild its substitution scores for every read or batch.
+
+    The substitution profile and gap offsets depend on the integer type chosen for the DP cells, which depends on the
+    read length, so they are built on first use for each type and cached. Every engine accepts the profile through its
+    `profile` argument; it must have been built with the same scoring parameters and target as the call.
+
+    Attributes:
+        sequence (str): The reference sequence.
+        scoring_parameters (Tuple[int, int, int]): The match, mismatch and indel scores.
+        codes (np.ndarray): The reference as uint8 byte codes.
+
+    Args:
+        match_reward (int): The score to reward when characters match.
+        mismatch_penalty (int): The penalty (negative score) to assign for character mismatches.
+        indel_penalty (int): The penalty (negative score) to assign for insertions and deletions.
+        t (str): The reference sequence.
+    """
+
+    def __init__(self, match_reward: int, mismatch_penalty: int, indel_penalty: int, t: str):
+        """
+        Initializes ReferenceProfile
+        """
+        self.sequence = t
+        self.scoring_parameters = (match_reward, mismatch_penalty, indel_penalty)
+        self.codes = _encode(t)
+        self._substitution = {}
+        self._offsets = {}
+        self._prefix_counts = None
+
+    def __len__(self) -> int:
+        return len(self.sequence)
+
+    def dtype(self, s_length: int) -> type:
+        """Returns the integer type of the DP cells for sources of up to `s_length` characters, see `_score_dtype`."""
+        return _score_dtype(*self.scoring_parameters, s_length, len(self.sequence))
+
+    def substitution(self, dtype: type) -> np.ndarray:
+        """Returns the substitution profile of the reference, see `_substitution_profile`."""
+        if dtype not in self._substitution:
+            match_reward, mismatch_penalty, _ = self.scoring_parameters
+            self._substitution[dtype] = _substitution_profile(match_reward, mismatch_penalty, self.sequence, dtype)
+        return self._substitution[dtype]
+
+    def offsets(self, dtype: type) -> np.ndarray:
+        """Returns the gap offsets of every column of the reference, see `_gap_offsets`."""
+        if dtype not in self._offsets:
+            self._offsets[dtype] = _gap_offsets(self.scoring_parameters[2], len(self.sequence), dtype)
+        return self._offsets[dtype]
+
+    def prefix_counts(self) -> np.ndarray:
+        """
+        Returns the number of occurrences of every byte code in each prefix of the reference, shape (256, len(t) + 1),
+        used by the banded mode to check for matches outside the band in constant time per row.
+        """
+        if self._prefix_counts is None:
+            counts = np.zeros((256, len(self.sequence) + 1), dtype=np.int32)
+            counts[self.codes, np.arange(1, len(self.sequence) + 1)] = 1
+            self._prefix_counts = np.cumsum(counts, axis=1, dtype=np.int32)
+        return self._prefix_counts
+
+
+@lru_cache(maxsize=32)
+def reference_profile(match_reward: int, mismatch_penalty: int, indel_penalty: int, t: str) -> ReferenceProfile:
+    """
+    Returns the `ReferenceProfile` of a reference, building it only once per process for the same arguments.
+
+    Worker processes receive only the reference sequence and look its profile up here, so each builds it once per
+    locus instead of once per chunk.
+    """
+    return ReferenceProfile(match_reward, mismatch_penalty, indel_penalty, t)
+
+
+def _row_values(prev_row: np.ndarray, substitution_row: np.ndarray, indel_penalty: int,
+                offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the DP values of one row from the previous row using array operations.
+
+    The horizontal dependency dp[i][j] = max(candidate[j], dp[i][j - 1] - indel_penalty) is resolved with a running
+    maximum over candidate[k] + k * indel_penalty, which unrolls the recurrence for every j at once. Leading axes are
+    treated as independent alignments.
+
+    Args:
+        prev_row (np.ndarray): DP values of the previous row, shape (..., len(t) + 1).
+        substitution_row (np.ndarray): Match/mismatch scores of the current source character, shape (..., len(t)).
+        indel_penalty (int): The penalty to subtract for insertions and deletions.
+        offsets (np.ndarray): The gap offsets returned by `_gap_offsets`.
+
+    Returns:
+        row (np.ndarray): DP values of the current row, shape (..., len(t) + 1).
+        up (np.ndarray): The scores coming from the cell above, needed to resolve the backtrack direction.
+    """
+    up = prev_row - indel_penalty
+    candidate = np.empty_like(prev_row)
+    candidate[..., 0] = 0
+    np.add(prev_row[..., :-1], substitution_row, out=candidate[..., 1:])
+    np.maximum(candidate[..., 1:], up[..., 1:], out=candidate[..., 1:])
+    np.maximum(candidate, 0, out=candidate)
+    candidate += offsets
+
+    row = np.maximum.accumulate(candidate, axis=-1)
+    row -= offsets
+    return row, up
+
+
+def _directions(row: np.ndarray, up: np.ndarray, indel_penalty: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Resolves which move produced every cell of a row.
+
+    Ties resolve in the same order as max(scores, key=scores.get) in `positional_alignment`: stop, up, left, diagonal.
+
+    Returns:
+        Boolean masks of the cells that stop the backtrack, come from above and come from the left. All remaining
+        cells come from the diagonal.
+    """
+    stop = row == 0
+    from_up = (row == up) & ~stop
+    from_left = np.zeros(row.shape, dtype=bool)
+    np.equal(row[..., 1:], row[..., :-1] - indel_penalty, out=from_left[..., 1:])
+    from_left &= ~stop
+    from_left &= ~from_up
+    return stop, from_up, from_left
+
+
+def _row_step(prev_row: np.ndarray, substitution_row: np.ndarray, indel_penalty: int,
+              offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes one DP row together with its backtrack pointers.
+
+    Returns:
+        row (np.ndarray): DP values of the current row, shape (..., len(t) + 1).
+        pointers (np.ndarray): Backtrack pointers of the current row as uint8, using the same codes as
+                               `positional_alignment` (0 stop, 1 up, 2 left, 3 diagonal).
+    """
+    row, up = _row_values(prev_row, substitution_row, indel_penalty, offsets)
+    stop, from_up, from_left = _directions(row, up, indel_penalty)
+    pointers = np.full(row.shape, 3, dtype=np.uint8)
+    pointers[from_left] = 2
+    pointers[from_up] = 1
+    pointers[stop] = 0
+    return row, pointers
+
+
+def positional_alignment_numpy(match_reward: int,
+                               mismatch_penalty: int,
+                               indel_penalty: int,
+                               s: str,
+                               t: str,
+                               profile: Optional[ReferenceProfile] = None) -> Tuple[int, str, str, Dict[int, Tuple[int, int]]]:
+    """
+    Perform local sequence alignment between two strings using a NumPy dynamic programming engine.
+
+    Produces exactly the same result as `positional_alignment`, but fills the DP matrix one row at a time with array
+    operations and stores the backtrack pointers in a compact uint8 array.
+
+    Args:
+        match_reward (int): The score to reward when characters match.
+        mismatch_penalty (int): The penalty (negative score) to assign for character mismatches.
+        indel_penalty (int): The penalty (negative score) to assign for insertions and deletions.
+        s (str): The source string to align.
+        t (str): The target string to align with the source string.
+        profile (Optional[ReferenceProfile]): The preprocessed target, built here when not given.
+
+    Returns:
+        max_score (int): The highest score achieved in the alignment.
+        aligned_s (str): The aligned version of the source string with gaps ('-') as necessary.
+        aligned_t (str): The aligned version of the target string with gaps ('-') as necessary.
+        scores_at_positions (Dict[int, Tuple[int, int]]): A dictionary mapping each position in the target string where an actual alignment occurred to the score achieved at that position and the final length of aligned_t.
+    """
+    if profile is None:
+        profile = ReferenceProfile(match_reward, mismatch_penalty, indel_penalty, t)
+    dtype = profile.dtype(len(s))
+    substitution = profile.substitution(dtype)
+    offsets = profile.offsets(dtype)
+    s_codes = _encode(s)
+
+    dp = np.zeros((len(s) + 1, len(t) + 1), dtype=dtype)
+    backtrack = np.zeros((len(s) + 1, len(t) + 1), dtype=np.uint8)
+    for i in range(1, len(s) + 1):
+        dp[i], backtrack[i] = _row_step(dp[i - 1], substitution[s_codes[i - 1]], indel_penalty, offsets)
+
+    max_score = int(dp.max())
+    max_pos = np.unravel_index(int(dp.argmax()), dp.shape) if max_score > 0 else (0, 0)
+
+    i, j = int(max_pos[0]), int(max_pos[1])
+    aligned_s, aligned_t = [], []
+    alignment_length = 0
+    while i > 0 and j > 0 and dp[i, j] > 0:
+        if backtrack[i, j] == 3:
+            aligned_s.append(s[i - 1])
+            aligned_t.append(t[j - 1])
+            i -= 1
+            j -= 1
+            alignment_length += 1
+        elif backtrack[i, j] == 1:
+            aligned_s.append(s[i - 1])
+            aligned_t.append('-')
+            i -= 1
+        elif backtrack[i, j] == 2:
+            aligned_s.append('-')
+            aligned_t.append(t[j - 1])
+            j -= 1
+            alignment_length += 1
+        else:
+            break
+
+    last_row = dp[len(s)]
+    scores_at_positions = {pos: (int(last_row[pos]), alignment_length) for pos in np.flatnonzero(last_row > 0).tolist()}
+
+    return max_score, ''.join(reversed(aligned_s)), ''.join(reversed(aligned_t)), scores_at_positions
+
+
+def _score_row_step(prev_row: np.ndarray, prev_lengths: np.ndarray, substitution_row: np.ndarray, indel_penalty: int,
+                    offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes one DP row together with the number of target characters on the backtrack path ending in each cell.
+
+    Runs of left moves are resolved by looking up the nearest cell to the left that is not a left move and adding the
+    distance to it, so no pointers need to be kept. Leading axes are treated as independent alignments.
+
+    Args:
+        prev_row (np.ndarray): DP values of the previous row, shape (..., len(t) + 1).
+        prev_lengths (np.ndarray): Path lengths of the previous row, shape (..., len(t) + 1).
+        substitution_row (np.ndarray): Match/mismatch scores of the current source character, shape (..., len(t)).
+        indel_penalty (int): The penalty to subtract for insertions and deletions.
+        offsets (np.ndarray): The gap offsets returned by `_gap_offsets`.
+
+    Returns:
+        row (np.ndarray): DP values of the current row, shape (..., len(t) + 1).
+        lengths (np.ndarray): Path lengths of the current row, shape (..., len(t) + 1).
+    """
+    row, up = _row_values(prev_row, substitution_row, indel_penalty, offsets)
+    stop, from_up, from_left = _directions(row, up, indel_penalty)
+
+    base = np.empty_like(prev_lengths)
+    base[..., 0] = 0
+    np.add(prev_lengths[..., :-1], 1, out=base[..., 1:])
+    np.copyto(base, prev_lengths, where=from_up)
+    base[stop] = 0
+
+    columns = np.arange(row.shape[-1], dtype=prev_lengths.dtype)
+    starts = np.where(from_left, 0, columns)
+    np.maximum.accumulate(starts, axis=-1, out=starts)
+    lengths = np.take_along_axis(base, starts, axis=-1)
+    lengths += columns
+    lengths -= starts
+    return row, lengths
+
+
+def _score_column_step(prev_column: np.ndarray, prev_lengths: np.ndarray, substitution_column: np.ndarray,
+                       indel_penalty: int, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes one DP column (target position) together with the path lengths, the transpose of `_score_row_step`.
+
+    The recurrence is symmetric in s and t, so the values come from `_row_values` with the roles of rows and columns
+    swapped. Only the tie-breaking differs: the vertical run inside the column is now the "up" move, which wins over
+    the "left" move coming from the previous column, and up moves do not consume target characters.
+
+    Args:
+        prev_column (np.ndarray): DP values of the previous column, shape (..., len(s) + 1).
+        prev_lengths (np.ndarray): Path lengths of the previous column, shape (..., len(s) + 1).
+        substitution_column (np.ndarray): Match/mismatch scores of the current target character against every
+                                          source character, shape (..., len(s)).
+        indel_penalty (int): The penalty to subtract for insertions and deletions.
+        offsets (np.ndarray): The gap offsets returned by `_gap_offsets` for len(s).
+
+    Returns:
+        column (np.ndarray): DP values of the current column, shape (..., len(s) + 1).
+        lengths (np.ndarray): Path lengths of the current column, shape (..., len(s) + 1).
+    """
+    column, left = _row_values(prev_column, substitution_column, indel_penalty, offsets)
+    stop = column == 0
+    from_up = np.zeros(column.shape, dtype=bool)
+    np.equal(column[..., 1:], column[..., :-1] - indel_penalty, out=from_up[..., 1:])
+    from_up &= ~stop
+    from_left = (column == left) & ~stop & ~from_up
+
+    base = np.empty_like(prev_lengths)
+    base[..., 0] = 0
+    np.add(prev_lengths[..., :-1], 1, out=base[..., 1:])
+    np.add(prev_lengths, 1, out=base, where=from_left)
+    base[stop] = 0
+    if not from_up.any():
+        return column, base
+
+    rows = np.arange(column.shape[-1], dtype=prev_lengths.dtype)
+    starts = np.where(from_up, 0, rows)
+    np.maximum.accumulate(starts, axis=-1, out=starts)
+    return column, np.take_along_axis(base, starts, axis=-1)
+
+
+def positional_scores_numpy(match_reward: int, mismatch_penalty: int, indel_penalty: int, s: str, t: str,
+                            profile: Optional[ReferenceProfile] = None) -> Tuple[int, Dict[int, Tuple[int, int]]]:
+    """
+    NumPy implementation of `positional_scores` using two rolling rows plus a length-tracking row.
+
+    Args:
+        match_reward (int): The score to reward when characters match.
+        mismatch_penalty (int): The penalty (negative score) to assign for character mismatches.
+        indel_penalty (int): The penalty (negative score) to assign for insertions and deletions.
+        s (str): The source string to align.
+        t (str): The target string to align with the source string.
+        profile (Optional[ReferenceProfile]): The preprocessed target, built here when not given.
+
+    Returns:
+        max_score (int): The highest score achieved in the alignment.
+        scores_at_positions (Dict[int, Tuple[int, int]]): A dictionary mapping each position in the target string where an actual alignment occurred to the score achieved at that position and the final length of aligned_t.
+    """
+    if profile is None:
+        profile = ReferenceProfile(match_reward, mismatch_penalty, indel_penalty, t)
+    dtype = profile.dtype(len(s))
+    substitution = profile.substitution(dtype)
+    offsets = profile.offsets(dtype)
+    s_codes = _encode(s)
+
+    row = np.zeros(len(t) + 1, dtype=dtype)
+    lengths = np.zeros(len(t) + 1, dtype=dtype)
+    max_score = 0
+    alignment_length = 0
+    for i in range(1, len(s) + 1):
+        row, lengths = _score_row_step(row, lengths, substitution[s_codes[i - 1]], indel_penalty, offsets)
+        best = int(row.argmax())
+        if row[best] > max_score:
+            max_score = int(row[best])
+            alignment_length = int(lengths[best])
+
+    scores_at_positions = {pos: (int(row[pos]), alignment_length) for pos in np.flatnonzero(row > 0).tolist()}
+    return max_score, scores_at_positions
+
+
+def _encode_reads(reads: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pads the reads into a 2D uint8 array of byte codes and returns it with the length of every read."""
+    read_lengths = np.array([len(read) for read in reads])
+    codes = np.zeros((len(reads), int(read_lengths.max())), dtype=np.uint8)
+    for index, read in enumerate(reads):
+        codes[index, :len(read)] = _encode(read)
+    return codes, read_lengths
+
+
+def _batch_scores(codes: np.ndarray, read_lengths: np.ndarray, indel_penalty: int,
+                  profile: ReferenceProfile) -> List[Tuple[int, Dict[int, Tuple[int, int]]]]:
+    """Runs the batch DP of `positional_scores_batch` on reads already encoded by `_encode_reads`."""
+    dtype = profile.dtype(codes.shape[1])
+    substitution = profile.substitution(dtype)
+    offsets = profile.offsets(dtype)
+
+    read_index = np.arange(len(read_lengths))
+    row = np.zeros((len(read_lengths), len(profile) + 1), dtype=dtype)
+    lengths = np.zeros_like(row)
+    final_rows = np.zeros_like(row)
+    max_scores = np.zeros(len(read_lengths), dtype=dtype)
+    alignment_lengths = np.zeros(len(read_lengths), dtype=dtype)
+    for i in range(1, codes.shape[1] + 1):
+        row, lengths = _score_row_step(row, lengths, substitution[codes[:, i - 1]], indel_penalty, offsets)
+        best = row.argmax(axis=1)
+        best_scores = row[read_index, best]
+        improved = (best_scores > max_scores) & (read_lengths >= i)
+        max_scores[improved] = best_scores[improved]
+        alignment_lengths[improved] = lengths[read_index, best][improved]
+        finished = read_lengths == i
+        final_rows[finished] = row[finished]
+
+    results = []
+    for final_row, max_score, alignment_length in zip(final_rows, max_scores.tolist(), alignment_lengths.tolist()):
+        positions = np.flatnonzero(final_row > 0)
+        scores_at_positions = {
+            pos: (score, alignment_length)
+            for pos, score in zip(positions.tolist(), final_row[positions].tolist())
+        }
+        results.append((max_score, scores_at_positions))
+    return results
+
+
+def positional_scores_batch(match_reward: int, mismatch_penalty: int, indel_penalty: int, reads: List[str], t: str,
+                            profile: Optional[ReferenceProfile] = None) -> List[Tuple[int, Dict[int, Tuple[int, int]]]]:
+    """
+    Compute the positional scores of many reads against the same target in one pass.
+
+    The reads are padded into a 2D uint8 array and all of their DP matrices are advanced together, one row (read
+    position) at a time, with every array operation broadcast over the read axis. Rows past the end of a shorter read
+    are ignored when tracking its best cell, and its final row is captured as soon as it ends. The result for each
+    read is identical to `positional_scores_numpy`.
+
+    Args:
+        match_reward (int): The score to reward when characters match.
+        mismatch_penalty (int): The penalty (negative score) to assign for character mismatches.
+        indel_penalty (int): The penalty (negative score) to assign for insertions and deletions.
+        reads (List[str]): The source strings to align.
+        t (str): The target string to align the source strings with.
+        profile (Optional[ReferenceProfile]): The preprocessed target, built here when not given.
+
+    Returns:
+        List[Tuple[int, Dict[int, Tuple[int, int]]]]: The `(max_score, scores_at_positions)` of each read, in order.
+    """
+    if not reads:
+        return []
+    if profile is None:
+        profile = ReferenceProfile(match_reward, mismatch_penalty, indel_penalty, t)
+    return _batch_scores(*_encode_reads(reads), indel_penalty, profile)
+
+
+def positional_scores_sweep(parameter_sets: List[Tuple[int, int, int]], reads: List[str],
+                            t: str) -> List[List[Tuple[int, Dict[int, Tuple[int, int]]]]]:
+    """
+    Compute the positional scores of many reads against the same target under several scoring parameter sets.
+
+    The reads are encoded once and then run through the batch DP of `positional_scores_batch` under each parameter
+    set in turn, with the cached `reference_profile` of that set.
+
+    Args:
+        parameter_sets (List[Tuple[int, int, int]]): The (match, mismatch, indel) scores of every parameter set.
+        reads (List[str]): The source strings to align.
+        t (str): The target string to align the source strings with.
+
+    Returns:
+        List[List[Tuple[int, Dict[int, Tuple[int, int]]]]]: For every parameter set, in order, the
+                                                            `(max_score, scores_at_positions)` of each read, exactly
+                                                            as `positional_scores_batch` returns them.
+    """
+    if not reads:
+        return [[] for _ in parameter_sets]
+    codes, read_lengths = _encode_reads(reads)
+    return [
+        _batch_scores(codes, read_lengths, parameters[2], reference_profile(*parameters, t))
+        for parameters in parameter_sets
+    ]
+
+
+def positional_scores_each(match_reward: int, mismatch_penalty: int, indel_penalty: int, reads: List[str], t: str,
+                           profile: Optional[ReferenceProfile] = None) -> List[Tuple[int, Dict[int, Tuple[int, int]]]]:
+    """
+    Pure-Python counterpart of `positional_scores_batch` that aligns the reads one after the other.
+
+    The `profile` is accepted for a uniform engine interface but not used: the pure-Python engine stays the plain
+    reference implementation that the array engines are checked against.
+    """
+    return [positional_scores(match_reward, mismatch_penalty, indel_penalty, read, t) for read in reads]
+
+
+def positional_scores_banded(match_reward: int,
+                             mismatch_penalty: int,
+                             indel_penalty: int,
+                             s: str,
+                             t: str,
+                             diagonal: Optional[int] = None,
+                             band_width: int = 16,
+                             profile: Optional[ReferenceProfile] = None) -> Tuple[int, Dict[int, Tuple[int, int]]]:
+    """
+    Compute the positional scores of a local alignment, filling only a diagonal band of the DP when that is exact.
+
+    Only the cells (i, j) with |(j - i) - diagonal| <= band_width are filled when `_banded_scores` can show that every
+    cell outside the band is zero in the full DP; otherwise, and when there is no seed, this falls back to the full
+    `positional_scores_numpy`. Either way the result is identical to `positional_scores`. The diagonal usually comes
+    from k-mer hits shared by s and t (see `KmerIndex.seed_diagonal`).
+
+    Args:
+        match_reward (int): The score to reward when characters match.
+        mismatch_penalty (int): The penalty (negative score) to assign for character mismatches.
+        indel_penalty (int): The penalty (negative score) to assign for insertions and deletions.
+        s (str): The source string to align.
+        t (str): The target string to align with the source string.
+        diagonal (Optional[int]): The seed diagonal, i.e. the offset of t positions relative to s positions.
+        band_width (int): The number of diagonals filled on each side of the seed diagonal.
+        profile (Optional[ReferenceProfile]): The preprocessed target, built here when not given.
+
+    Returns:
+        max_score (int): The highest score achieved in the alignment.
+        scores_at_positions (Dict[int, Tuple[int, int]]): A dictionary mapping each position in the target string where an actual alignment occurred to the score achieved at that position and the final length of aligned_t.
+    """
+    if profile is None:
+        profile = ReferenceProfile(match_reward, mismatch_penalty, indel_penalty, t)
+    result = None
+    if diagonal is not None:
+        result = _banded_scores(match_reward, mismatch_penalty, indel_penalty, s, t, diagonal, band_width, profile)
+    if result is None:
+        return positional_scores_numpy(match_reward, mismatch_penalty, indel_penalty, s, t, profile)
+    return result
+
+
+def _banded_scores(match_reward: int, mismatch_penalty: int, indel_penalty: int, s: str, t: str, diagonal: int,
+                   band_width: int, profile: ReferenceProfile) -> Optional[Tuple[int, Dict[int, Tuple[int, int]]]]:
+    """
+    Fills only the diagonal band of the DP, and returns None unless that provably gives the full DP result.
+
+    With non-negative mismatch and indel penalties, a cell outside the band can only be positive through a match
+    outside the band, or through a move out of a band-edge cell whose value exceeds the indel penalty. When neither
+    happens, every cell outside the band is zero in the full DP, so the band cells, the best cell and the last row are
+    all exact. Matches outside the band are ruled out before any DP work, from the prefix counts of the reference, and
+    the band edges are checked row by row, stopping at the first leak.
+
+    Returns:
+        Optional[Tuple[int, Dict[int, Tuple[int, int]]]]: The `(max_score, scores_at_positions)` of the full DP, or
+                                                          None when the band cannot be shown to hold it.
+    """
+    if mismatch_penalty < 0 or indel_penalty < 0:
+        return None
+    s_codes = _encode(s)
+    rows = np.arange(1, len(s) + 1)
+    prefix_counts = profile.prefix_counts()
+    before = np.clip(rows + diagonal - band_width - 1, 0, len(t))
+    after = np.clip(rows + diagonal + band_width, 0, len(t))
+    outside_matches = (prefix_counts[s_codes, before] + prefix_counts[s_codes, len(t)] -
+                       prefix_counts[s_codes, after])
+    if outside_matches.any():
+        return None
+
+    dtype = profile.dtype(len(s))
+    substitution = profile.substitution(dtype)
+    offsets = profile.offsets(dtype)
+    row = np.zeros(len(t) + 1, dtype=dtype)
+    lengths = np.zeros(len(t) + 1, dtype=dtype)
+    max_score = 0
+    alignment_length = 0
+    for i in range(1, len(s) + 1):
+        low, high = max(1, i + diagonal - band_width), min(len(t), i + diagonal + band_width)
+        next_row = np.zeros_like(row)
+        next_lengths = np.zeros_like(lengths)
+        if low <= high:
+            band_row, band_lengths = _score_row_step(row[low - 1:high + 1], lengths[low - 1:high + 1],
+                                                     substitution[s_codes[i - 1], low - 1:high], indel_penalty,
+                                                     offsets[:high - low + 2])
+            next_row[low:high + 1] = band_row[1:]
+            next_lengths[low:high + 1] = band_lengths[1:]
+            for edge in (i + diagonal - band_width, i + diagonal + band_width):
+                if 1 <= edge <= len(t) and next_row[edge] > indel_penalty:
+                    return None
+            best = int(band_row.argmax())
+            if band_row[best] > max_score:
+                max_score = int(band_row[best])
+                alignment_length = int(band_lengths[best])
+        row, lengths = next_row, next_lengths
+
+    scores_at_positions = {pos: (int(row[pos]), alignment_length) for pos in np.flatnonzero(row > 0).tolist()}
+    return max_score, scores_at_positions
+
@@ -0,0 +1,295 @@
+"""alleles.py"""
+import csv
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from mlst_aligner.aligner import _encode, _gap_offsets, _score_column_step, _score_dtype
+from mlst_aligner.scoring import GeneScore, ScoreAccumulator, chunked
+from mlst_aligner.utils import fetch_references
+
+
+def split_allele_name(name: str) -> Tuple[str, str]:
+    """
+    Splits an allele name such as "adk_36" into its locus and allele number at the last underscore.
+
+    Returns:
+        Tuple[str, str]: The locus and the allele number, which is empty when the name has no underscore.
+    """
+    locus, _, allele = name.rpartition("_")
+    return (locus, allele) if locus else (name, "")
+
+
+def group_alleles(references: List[Tuple[str, str]]) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Groups (name, sequence) pairs of an allele database by locus, keeping the order of the file.
+
+    Returns:
+        Dict[str, List[Tuple[str, str]]]: The (allele name, sequence) pairs of every locus.
+    """
+    loci = {}
+    for name, sequence in references:
+        loci.setdefault(split_allele_name(name)[0], []).append((name, sequence))
+    return loci
+
+
+def load_profiles(file_path: str) -> Tuple[List[str], Dict[Tuple[str, ...], str]]:
+    """
+    Reads a PubMLST-style tab-separated profiles file: an "ST" column followed by one column per locus, with any
+    extra columns such as "clonal_complex" ignored by the caller.
+
+    Returns:
+        loci (List[str]): The locus columns, in file order.
+        profiles (Dict[Tuple[str, ...], str]): Maps the allele numbers of every locus, in the order of `loci`, to the
+                                                sequence type.
+    """
+    with open(file_path, newline="") as infile:
+        reader = csv.reader(infile, delimiter="\t")
+        header = next(reader)
+        loci = [column for column in header[1:] if column not in ("clonal_complex", "species")]
+        profiles = {tuple(row[1:1 + len(loci)]): row[0] for row in reader if row}
+    return loci, profiles
+
+
+class TrieNode:
+    """
+    A node of an `AlleleTrie`.
+
+    Attributes:
+        edge (str): The characters on the edge leading to this node.
+        children (List[TrieNode]): The child nodes, ordered by their first character.
+        sequence_index (Optional[int]): The index of the unique sequence ending at this node, if any.
+    """
+
+    def __init__(self, edge: str):
+        """
+        Initializes TrieNode
+        """
+        self.edge = edge
+        self.children = []
+        self.sequence_index = None
+
+
+class AlleleTrie:
+    """
+    A radix tree over the allele sequences of one locus.
+
+    Alleles of a locus mostly differ by a few substitutions, so every sequence shares a prefix with its neighbours in
+    sorted order. Identical sequences are stored once, and each edge of the tree stands for the reference columns
+    shared by every allele below it, which are aligned once per read instead of once per allele.
+
+    Attributes:
+        names (List[str]): The allele names, in input order.
+        sequences (List[str]): The unique allele sequences, in sorted order.
+        sequence_of (List[int]): The index in `sequences` of every allele.
+        root (TrieNode): The root of the tree, with an empty edge.
+        columns (int): The number of reference columns in the tree, i.e. the DP columns filled per read.
+
+    Args:
+        alleles (List[Tuple[str, str]]): The (name, sequence) pairs of the locus.
+    """
+
+    def __init__(self, alleles: List[Tuple[str, str]]):
+        """
+        Initializes AlleleTrie
+        """
+        self.names = [name for name, _ in alleles]
+        self.sequences = sorted({sequence for _, sequence in alleles})
+        sequence_indices = {sequence: index for index, sequence in enumerate(self.sequences)}
+        self.sequence_of = [sequence_indices[sequence] for _, sequence in alleles]
+        self.root = TrieNode("")
+        self.columns = 0
+
+        # Each entry is a node with the contiguous range of sorted sequences below it and the depth at its edge start.
+        stack = [(self.root, 0, len(self.sequences), 0)]
+        while stack:
+            node, start, end, depth = stack.pop()
+            first, last = self.sequences[start], self.sequences[end - 1]
+            prefix = depth
+            if node is not self.root:
+                while prefix < min(len(first), len(last)) and first[prefix] == last[prefix]:
+                    prefix += 1
+                node.edge = first[depth:prefix]
+                self.columns += len(node.edge)
+
+            if len(first) == prefix:
+                node.sequence_index = start
+                start += 1
+            while start < end:
+                group_end = start
+                while group_end < end and self.sequences[group_end][prefix] == self.sequences[start][prefix]:
+                    group_end += 1
+                child = TrieNode("")
+                node.children.append(child)
+                stack.append((child, start, group_end, prefix))
+                start = group_end
+
+    def score(self, scoring_parameters: Tuple[int, int, int], reads: List[str],
+              multiplicities: Optional[List[int]] = None) -> List[ScoreAccumulator]:
+        """
+        Aligns a batch of reads against every unique allele sequence, filling each shared column once.
+
+        The DP matrices of all reads are swept one reference column at a time with `_score_column_step`, walking
+        the tree depth-first, since the column for t[j] only depends on t[:j]. The final-row values of each edge are
+        kept per read and concatenated at the allele nodes, and the best cell is tracked in the row-major order of
+        `positional_scores`, so every allele gets exactly the scores at positions of the per-allele batch kernel.
+
+        Args:
+            scoring_parameters (Tuple[int, int, int]): The match, mismatch and indel scores.
+            reads (List[str]): The read sequences.
+            multiplicities (Optional[List[int]]): The number of times each read occurs.
+
+        Returns:
+            List[ScoreAccumulator]: The accumulated scores of every unique sequence, in the order of `sequences`.
+        """
+        match_reward, mismatch_penalty, indel_penalty = scoring_parameters
+        accumulators = [ScoreAccumulator(len(sequence)) for sequence in self.sequences]
+        if not reads or not self.sequences:
+            return accumulators
+
+        read_lengths = np.array([len(read) for read in reads])
+        codes = np.zeros((len(reads), int(read_lengths.max())), dtype=np.uint8)
+        for index, read in enumerate(reads):
+            codes[index, :len(read)] = _encode(read)
+        weights = np.ones(len(reads), dtype=np.int64) if multiplicities is None else np.array(multiplicities,
+                                                                                              dtype=np.int64)
+
+        dtype = _score_dtype(match_reward, mismatch_penalty, indel_penalty, codes.shape[1],
+                             max(len(sequence) for sequence in self.sequences))
+        offsets = _gap_offsets(indel_penalty, codes.shape[1], dtype)
+        substitutions = {}
+        read_index = np.arange(len(reads))
+        valid_rows = np.arange(codes.shape[1] + 1)[None, :] <= read_lengths[:, None]
+
+        column = np.zeros((len(reads), codes.shape[1] + 1), dtype=dtype)
+        best = (np.zeros(len(reads), dtype=dtype), np.zeros(len(reads), dtype=np.int64), np.zeros_like(column[:, 0]))
+        stack = [(self.root, column, np.zeros_like(column), best, [])]
+        while stack:
+            node, column, lengths, (max_scores, max_rows, alignment_lengths), final_rows = stack.pop()
+            max_scores, max_rows, alignment_lengths = max_scores.copy(), max_rows.copy(), alignment_lengths.copy()
+            edge_final_rows = np.empty((len(reads), len(node.edge)), dtype=dtype)
+            for j, character in enumerate(node.edge):
+                if character not in substitutions:
+                    substitutions[character] = np.where(codes == ord(character), match_reward,
+                                                         -mismatch_penalty).astype(dtype)
+                column, lengths = _score_column_step(column, lengths, substitutions[character], indel_penalty,
+                                                     offsets)
+                masked = np.where(valid_rows, column, -1)
+                rows = masked.argmax(axis=1)
+                scores = masked[read_index, rows]
+                improved = (scores > 0) & ((scores > max_scores) | ((scores == max_scores) & (rows < max_rows)))
+                max_scores[improved] = scores[improved]
+                max_rows[improved] = rows[improved]
+                alignment_lengths[improved] = lengths[read_index, rows][improved]
+                edge_final_rows[:, j] = column[read_index, read_lengths]
+            final_rows = final_rows + [edge_final_rows]
+
+            if node.sequence_index is not None:
+                values = np.concatenate(final_rows, axis=1).astype(np.int64)
+                aligned = values > 0
+                read_weights = alignment_lengths.astype(np.int64) * weights
+                accumulator = accumulators[node.sequence_index]
+                accumulator.weighted_scores[1:] += (values * aligned * read_weights[:, None]).sum(axis=0)
+                accumulator.weights[1:] += (aligned * read_weights[:, None]).sum(axis=0)
+            for child in reversed(node.children):
+                stack.append((child, column, lengths, (max_scores, max_rows, alignment_lengths), final_rows))
+
+        return accumulators
+
+
+class ScoreAlleles(GeneScore):
+    """
+    A class for typing reads against a full allele database, ranking the alleles of every locus and calling the
+    sequence type.
+
+    Alleles are grouped by locus from their names ("adk_36" is allele 36 of adk), and the alleles of each locus are
+    scored together through an `AlleleTrie`, so the DP work on the sequence they share is done once per read. Each
+    allele gets the score `GeneScore.get_t_score` would give it.
+
+    Attributes:
+        references (List[Tuple[str, str]]): The (name, sequence) pairs of the allele database.
+        loci (Dict[str, List[Tuple[str, str]]]): The alleles of every locus.
+        tries (Dict[str, AlleleTrie]): The allele tree of every locus.
+        profiles (Optional[Tuple[List[str], Dict[Tuple[str, ...], str]]]): The loci and profiles loaded from
+                                                                            `profiles_fp`, if given.
+        locus_timings (Dict[str, float]): The seconds spent scoring each locus in the last `score_alleles` run.
+
+    Inherits:
+        GeneScore: Inherits from the GeneScore class for its read handling and scoring options.
+
+    Args:
+        reads_fp (str): File path to the reads FASTA/FASTQ file, optionally gzipped.
+        alleles_fp (str): File path to the allele database FASTA file.
+        **kwargs: Arbitrary keyword arguments passed to the GeneScore initializer. ScoreAlleles additionally accepts
+                  `profiles_fp`, a tab-separated profiles file used to call the sequence type.
+    """
+
+    def __init__(self, reads_fp: str, alleles_fp: str, **kwargs):
+        """
+        Initializes ScoreAlleles
+        """
+        super().__init__(reads_fp, "", **kwargs)
+        with self.metrics.stage("reference_load"):
+            self.references = fetch_references(alleles_fp)
+            self.loci = group_alleles(self.references)
+            self.tries = {locus: AlleleTrie(alleles) for locus, alleles in self.loci.items()}
+            profiles_fp = kwargs.get("profiles_fp")
+            self.profiles = load_profiles(profiles_fp) if profiles_fp else None
+        self.locus_timings = {}
+
+    def score_alleles(self) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Scores every allele of every locus against the reads and ranks the alleles of each locus.
+
+        Reads are streamed once per locus and aligned `batch_size` at a time. With `dedup` set, identical reads are
+        collapsed first and weighted by their count. The time spent on each locus is stored in `locus_timings`.
+
+        Returns:
+            Dict[str, List[Tuple[str, float]]]: The (allele name, score) pairs of every locus, best first. The score
+                                                is `get_t_score` before rounding down, so that close alleles are told
+                                                apart. Ties keep the order of the database.
+        """
+        rankings = {}
+        self.locus_timings = {}
+        for locus, trie in self.tries.items():
+            start_time = time.time()
+            reads = self.iter_reads()
+            sequences = self._collapse_reads(reads) if self.dedup else ((sequence, 1) for _, sequence in reads)
+            accumulators = [ScoreAccumulator(len(sequence)) for sequence in trie.sequences]
+            for batch in chunked(sequences, self.batch_size):
+                batch_sequences, multiplicities = map(list, zip(*batch))
+                self.metrics.count("reads", sum(multiplicities))
+                self.metrics.count("alignments", len(batch_sequences) * len(trie.sequences))
+                self.metrics.count("dp_cells", sum(len(sequence) for sequence in batch_sequences) * trie.columns)
+                with self.metrics.stage("alignment"):
+                    batch_accumulators = trie.score(self.scoring_parameters, batch_sequences, multiplicities)
+                with self.metrics.stage("merge"):
+                    for accumulator, batch_accumulator in zip(accumulators, batch_accumulators):
+                        accumulator.merge(batch_accumulator)
+
+            with self.metrics.stage("final_scoring"):
+                scores = [
+                    accumulators[index].total_score() / len(trie.sequences[index]) for index in trie.sequence_of
+                ]
+            rankings[locus] = sorted(zip(trie.names, scores), key=lambda allele: -allele[1])
+            self.locus_timings[locus] = time.time() - start_time
+        return rankings
+
+    def sequence_type(self, rankings: Dict[str, List[Tuple[str, float]]]) -> Optional[str]:
+        """
+        Looks up the sequence type of the best allele of every locus in the profiles.
+
+        Args:
+            rankings (Dict[str, List[Tuple[str, float]]]): The output of `score_alleles`.
+
+        Returns:
+            Optional[str]: The sequence type, or None when no profiles were loaded, a profile locus was not typed or
+                           the combination of best alleles is not a known profile.
+        """
+        if self.profiles is None:
+            return None
+        loci, profiles = self.profiles
+        if any(not rankings.get(locus) for locus in loci):
+            return None
+        return profiles.get(tuple(split_allele_name(rankings[locus][0][0])[1] for locus in loci))
@@ -0,0 +1,187 @@
+"""backends.py"""
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mlst_aligner.aligner import (ReferenceProfile, _encode, positional_alignment, positional_alignment_numpy,
+                                  positional_scores, positional_scores_batch, positional_scores_each,
+                                  positional_scores_numpy, reference_profile)
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+class Backend:
+    """
+    An alignment backend: one implementation of the alignment engines used by `GeneScore` and `ScoreMLST`.
+
+    Every engine takes the match, mismatch and indel scores first, like `positional_alignment`, and an optional
+    `ReferenceProfile` of the target last, which a backend is free to ignore. All backends must return exactly what
+    the pure-Python reference backend returns, see tests/test_backends.py.
+
+    Attributes:
+        name (str): The name the backend is registered and selected under, e.g. with `--engine`.
+        align (Callable): Aligns one read with traceback, like `positional_alignment`.
+        score (Callable): Computes the positional scores of one read, like `positional_scores`.
+        score_batch (Callable): Computes the positional scores of a list of reads, like `positional_scores_each`.
+        description (str): A one-line description shown in the CLI help.
+    """
+
+    def __init__(self, name: str, align: Callable, score: Callable, score_batch: Callable, description: str = ""):
+        """
+        Initializes Backend
+        """
+        self.name = name
+        self.align = align
+        self.score = score
+        self.score_batch = score_batch
+        self.description = description
+
+
+BACKENDS: Dict[str, Backend] = {}
+
+
+def register_backend(backend: Backend) -> Backend:
+    """Adds a backend to the registry under its name, replacing any backend of the same name, and returns it."""
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+def get_backend(name: str) -> Backend:
+    """
+    Looks up a registered backend by name.
+
+    Raises:
+        ValueError: If no backend is registered under that name, e.g. an optional backend whose library is missing.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown alignment engine {name}, expected one of {', '.join(BACKENDS)}.")
+    return BACKENDS[name]
+
+
+def select_backend(scoring_parameters: Tuple[int, int, int],
+                   reads: Sequence[str],
+                   references: Sequence[str],
+                   names: Optional[Sequence[str]] = None) -> Tuple[str, Dict[str, float]]:
+    """
+    Picks the fastest backend on a sample of the actual reads and references.
+
+    The reads are dealt round-robin to the references, so the sample has the read-length and reference-length mix of
+    the run, and every backend scores the same read/reference pairs with its batch engine. Each backend is first run
+    once on a tiny input so that one-off costs, such as the compilation of a JIT backend, are not timed.
+
+    Args:
+        scoring_parameters (Tuple[int, int, int]): The match, mismatch and indel scores.
+        reads (Sequence[str]): The sample of read sequences, e.g. the first reads of the file.
+        references (Sequence[str]): The reference sequences the reads will be aligned against.
+        names (Optional[Sequence[str]]): The backends to try, every registered backend by default.
+
+    Returns:
+        name (str): The name of the fastest backend, "numpy" when there is nothing to time.
+        timings (Dict[str, float]): The seconds each backend took on the sample.
+    """
+    names = list(BACKENDS) if names is None else list(names)
+    references = [reference for reference in references if reference]
+    if not reads or not references:
+        return "numpy", {}
+
+    pairs = [(reference, list(reads[index::len(references)])) for index, reference in enumerate(references)]
+    timings = {}
+    for name in names:
+        score_batch = get_backend(name).score_batch
+        score_batch(*scoring_parameters, reads=[reads[0][:8]], t=references[0][:8])
+        start_time = time.perf_counter()
+        for reference, batch in pairs:
+            if batch:
+                score_batch(*scoring_parameters, reads=batch, t=reference,
+                            profile=reference_profile(*scoring_parameters, reference))
+        timings[name] = time.perf_counter() - start_time
+    return min(timings, key=timings.get), timings
+
+
+def _scores_kernel(s_codes: np.ndarray, t_codes: np.ndarray, match_reward: int, mismatch_penalty: int,
+                   indel_penalty: int) -> Tuple[int, int, np.ndarray]:
+    """
+    The two-row DP of `positional_scores` over byte codes, written in the subset of Python that numba compiles.
+
+    Returns:
+        max_score (int): The highest score achieved in the alignment.
+        alignment_length (int): The path length of the first cell with that score.
+        last_row (np.ndarray): The DP values of the last row.
+    """
+    prev_row = np.zeros(len(t_codes) + 1, dtype=np.int64)
+    prev_lengths = np.zeros(len(t_codes) + 1, dtype=np.int64)
+    row = np.zeros(len(t_codes) + 1, dtype=np.int64)
+    lengths = np.zeros(len(t_codes) + 1, dtype=np.int64)
+    max_score = 0
+    alignment_length = 0
+    for i in range(1, len(s_codes) + 1):
+        for j in range(1, len(t_codes) + 1):
+            match = match_reward if s_codes[i - 1] == t_codes[j - 1] else -mismatch_penalty
+            up = prev_row[j] - indel_penalty
+            left = row[j - 1] - indel_penalty
+            diagonal = prev_row[j - 1] + match
+            score = max(0, up, left, diagonal)
+            row[j] = score
+
+            if score == 0:
+                lengths[j] = 0
+            elif score == up:
+                lengths[j] = prev_lengths[j]
+            elif score == left:
+                lengths[j] = lengths[j - 1] + 1
+            else:
+                lengths[j] = prev_lengths[j - 1] + 1
+
+            if score > max_score:
+                max_score = score
+                alignment_length = lengths[j]
+        prev_row, row = row, prev_row
+        prev_lengths, lengths = lengths, prev_lengths
+    return max_score, alignment_length, prev_row
+
+
+def kernel_scores(kernel: Callable) -> Callable:
+    """
+    Wraps a DP kernel with the signature of `_scores_kernel` into a single-read engine like `positional_scores`.
+    """
+
+    def score(match_reward: int, mismatch_penalty: int, indel_penalty: int, s: str, t: str,
+              profile: Optional[ReferenceProfile] = None) -> Tuple[int, Dict[int, Tuple[int, int]]]:
+        t_codes = _encode(t) if profile is None else profile.codes
+        max_score, alignment_length, last_row = kernel(_encode(s), t_codes, match_reward, mismatch_penalty,
+                                                       indel_penalty)
+        alignment_length = int(alignment_length)
+        positions = np.flatnonzero(last_row > 0)
+        return int(max_score), {
+            pos: (score, alignment_length)
+            for pos, score in zip(positions.tolist(), last_row[positions].tolist())
+        }
+
+    return score
+
+
+def batch_of(score: Callable) -> Callable:
+    """Turns a single-read engine like `positional_scores` into a batch engine that aligns the reads one by one."""
+
+    def score_batch(match_reward: int, mismatch_penalty: int, indel_penalty: int, reads: List[str], t: str,
+                    profile: Optional[ReferenceProfile] = None) -> List[Tuple[int, Dict[int, Tuple[int, int]]]]:
+        return [score(match_reward, mismatch_penalty, indel_penalty, read, t, profile) for read in reads]
+
+    return score_batch
+
+
+register_backend(
+    Backend("python", positional_alignment, positional_scores, positional_scores_each,
+            "Pure-Python reference implementation."))
+register_backend(
+    Backend("numpy", positional_alignment_numpy, positional_scores_numpy, positional_scores_batch,
+            "NumPy row-vectorized DP, batching reads together."))
+if numba is not None:
+    _numba_scores = kernel_scores(numba.njit(cache=True)(_scores_kernel))
+    register_backend(
+        Backend("numba", positional_alignment_numpy, _numba_scores, batch_of(_numba_scores),
+                "JIT-compiled scalar DP, only available when numba is installed."))
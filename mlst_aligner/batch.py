@@ -0,0 +1,158 @@
+"""batch.py"""
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Set, Tuple
+
+from mlst_aligner.index import KmerIndex
+from mlst_aligner.mlst import ScoreMLST
+from mlst_aligner.utils import fetch_references
+
+# References and options shared by every sample scored in this process, set once per worker by `init_worker`.
+_WORKER_STATE = {}
+
+
+def read_manifest(file_path: str) -> List[Tuple[str, str]]:
+    """
+    Reads a tab-separated sample manifest with a sample name and a reads file path on every line.
+
+    An optional "sample\\treads" header, blank lines and lines starting with "#" are skipped. Relative reads paths are
+    resolved against the directory of the manifest.
+
+    Returns:
+        List[Tuple[str, str]]: The (sample, reads file path) pairs, in manifest order.
+
+    Raises:
+        ValueError: If a line does not have two columns or a sample name appears twice.
+    """
+    base_dir = os.path.dirname(os.path.abspath(file_path))
+    samples = []
+    with open(file_path, newline="") as infile:
+        for line_number, row in enumerate(csv.reader(infile, delimiter="\t"), start=1):
+            if not row or not row[0].strip() or row[0].startswith("#"):
+                continue
+            if line_number == 1 and [column.lower() for column in row[:2]] == ["sample", "reads"]:
+                continue
+            if len(row) < 2:
+                raise ValueError(f"Line {line_number} of {file_path} needs a sample name and a reads file.")
+            samples.append((row[0], os.path.join(base_dir, row[1])))
+
+    names = [sample for sample, _ in samples]
+    if len(set(names)) != len(names):
+        raise ValueError(f"The manifest {file_path} lists a sample more than once.")
+    return samples
+
+
+def completed_samples(output_fp: str) -> Set[str]:
+    """
+    Returns the samples that already have a complete row in a batch TSV output, so a rerun can skip them.
+
+    A last line cut short by a crash is removed from the file, so that new rows can be appended after it.
+    """
+    if not os.path.exists(output_fp):
+        return set()
+    with open(output_fp, "rb+") as outfile:
+        content = outfile.read()
+        if content and not content.endswith(b"\n"):
+            outfile.truncate(content.rfind(b"\n") + 1)
+    with open(output_fp, newline="") as infile:
+        rows = list(csv.reader(infile, delimiter="\t"))
+    if not rows:
+        return set()
+    return {row[0] for row in rows[1:] if len(row) == len(rows[0])}
+
+
+def init_worker(references: List[Tuple[str, str]], kmer_index: Optional[KmerIndex], options: Dict):
+    """Stores the preprocessed references and the scoring options in this process, for `score_sample`."""
+    _WORKER_STATE.update(references=references, kmer_index=kmer_index, options=options)
+
+
+def score_sample(sample: str, reads_fp: str) -> Dict:
+    """Scores every gene of the references given to `init_worker` against the reads of one sample."""
+    start_time = time.time()
+    scorer = ScoreMLST(reads_fp, None, references=_WORKER_STATE["references"],
+                       kmer_index=_WORKER_STATE["kmer_index"], **_WORKER_STATE["options"])
+    row = {"sample": sample, "reads": reads_fp}
+    row.update(scorer.score_mlst())
+    row["seconds"] = round(time.time() - start_time, 3)
+    return row
+
+
+def run_batch(manifest_fp: str,
+              references_fp: str,
+              output_fp: str,
+              json_fp: Optional[str] = None,
+              workers: int = 1,
+              **options) -> List[Dict]:
+    """
+    Scores the MLST genes of every sample in a manifest, loading and indexing the references only once.
+
+    Samples are spread over up to `workers` processes, each of which receives the parsed references (and k-mer index,
+    when `kmer_size` is given) once at start-up. When there are fewer samples left than workers, the rest of the budget
+    goes to the `ScoreMLST` of every sample, which then aligns its reads over several processes. Every sample's row is
+    appended to the TSV output as soon as it finishes, so after a crash a rerun with the same output skips the samples
+    already done. A sample that fails is reported on stderr and left out of the output, so that it is retried on the
+    next run.
+
+    Args:
+        manifest_fp (str): File path to the sample manifest, see `read_manifest`.
+        references_fp (str): File path to the references FASTA file.
+        output_fp (str): File path to the combined TSV output, appended to when it exists.
+        json_fp (Optional[str]): File path to also write the complete result table to as JSON.
+        workers (int): The number of processes shared between the samples and the reads of every sample.
+        **options: Keyword arguments passed to every `ScoreMLST`, e.g. `match`, `mismatch`, `indel` or `kmer_size`.
+
+    Returns:
+        List[Dict]: The rows of every sample in the output, in manifest order: the sample, its reads file, the score of
+                    every gene and the seconds it took.
+    """
+    samples = read_manifest(manifest_fp)
+    done = completed_samples(output_fp)
+    references = fetch_references(references_fp)
+    kmer_size = options.get("kmer_size")
+    kmer_index = KmerIndex(references, kmer_size) if kmer_size else None
+    columns = ["sample", "reads"] + [gene_name for gene_name, _ in references] + ["seconds"]
+
+    pending = [(sample, reads_fp) for sample, reads_fp in samples if sample not in done]
+    sample_workers = max(1, min(workers, len(pending)))
+    options = {**options, "workers": max(1, workers // sample_workers)}
+    write_header = not done
+    with open(output_fp, "a" if done else "w", newline="") as outfile:
+        writer = csv.DictWriter(outfile, fieldnames=columns, delimiter="\t")
+        if write_header:
+            writer.writeheader()
+            outfile.flush()
+
+        def record(row: Dict):
+            writer.writerow(row)
+            outfile.flush()
+
+        if sample_workers > 1:
+            with ProcessPoolExecutor(max_workers=sample_workers, initializer=init_worker,
+                                     initargs=(references, kmer_index, options)) as executor:
+                futures = {executor.submit(score_sample, sample, reads_fp): sample for sample, reads_fp in pending}
+                for future in as_completed(futures):
+                    try:
+                        record(future.result())
+                    except Exception as e:
+                        print(f"Error encountered scoring sample {futures[future]}: {e}", file=sys.stderr)
+        else:
+            init_worker(references, kmer_index, options)
+            for sample, reads_fp in pending:
+                try:
+                    record(score_sample(sample, reads_fp))
+                except Exception as e:
+                    print(f"Error encountered scoring sample {sample}: {e}", file=sys.stderr)
+
+    with open(output_fp, newline="") as infile:
+        rows = {row["sample"]: row for row in csv.DictReader(infile, delimiter="\t") if None not in row.values()}
+    table = [rows[sample] for sample, _ in samples if sample in rows]
+    for row in table:
+        row.update({column: float(row[column]) for column in columns[2:]})
+    if json_fp is not None:
+        with open(json_fp, "w") as outfile:
+            json.dump(table, outfile, indent=2)
+    return table
@@ -0,0 +1,173 @@
+"""benchmark.py"""
+import os
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mlst_aligner.metrics import peak_rss_mb
+from mlst_aligner.mlst import ScoreMLST
+from mlst_aligner.utils import stream_reads
+
+def _measure(reads_fp: str, references_fp: str, engine: str, workers: int, scoring_parameters: Tuple[int, int, int],
+             max_reads: Optional[int]) -> Dict:
+    """Scores every gene of the references against the reads once and returns the timings of the run."""
+    reads = list(islice(stream_reads(reads_fp), max_reads))
+    match, mismatch, indel = scoring_parameters
+    scorer = ScoreMLST(reads_fp, references_fp, engine=engine, workers=workers, match=match, mismatch=mismatch,
+                       indel=indel)
+    references = scorer.references
+
+    start_time = time.perf_counter()
+    for _, sequence in references:
+        scorer.reference = sequence
+        scorer.get_t_score(reads)
+    seconds = time.perf_counter() - start_time
+
+    read_length = sum(len(read_sequence) for _, read_sequence in reads)
+    return {
+        "reads_file": os.path.basename(reads_fp),
+        "engine": engine,
+        "workers": workers,
+        "reads": len(reads),
+        "alignments": len(reads) * len(references),
+        "cells": read_length * sum(len(sequence) for _, sequence in references),
+        "seconds": seconds,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_benchmark(reads_fp: str,
+                  references_fp: str,
+                  engine: str = "numpy",
+                  workers: int = 1,
+                  scoring_parameters: Tuple[int, int, int] = (2, -4, -2),
+                  max_reads: Optional[int] = None) -> Dict:
+    """
+    Times the scoring of every gene in the references against the reads with one engine and worker count.
+
+    Each run happens in a fresh child process, so the peak RSS covers that run only (including its worker
+    processes) and is not inflated by earlier runs.
+
+    Args:
+        reads_fp (str): File path to the reads FASTA/FASTQ file, optionally gzipped.
+        references_fp (str): File path to the references FASTA file.
+        engine (str): The name of the alignment engine to use.
+        workers (int): The number of worker processes used to align reads.
+        scoring_parameters (Tuple[int, int, int]): The match, mismatch and indel scores.
+        max_reads (Optional[int]): Only use the first reads of the file, e.g. to keep the python engine affordable.
+
+    Returns:
+        Dict: The reads file, engine, workers, reads, alignments and DP cells of the run, its wall time, the reads,
+              alignments and cells per second and the peak RSS in MiB.
+    """
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        result = executor.submit(_measure, reads_fp, references_fp, engine, workers, scoring_parameters,
+                                 max_reads).result()
+    seconds = max(result["seconds"], 1e-9)
+    result.update({
+        "reads_per_second": result["reads"] / seconds,
+        "alignments_per_second": result["alignments"] / seconds,
+        "cells_per_second": result["cells"] / seconds,
+    })
+    return result
+
+
+def benchmark_suite(read_files: Sequence[str],
+                    references_fp: str,
+                    engines: Sequence[str] = ("numpy",),
+                    worker_counts: Sequence[int] = (1,),
+                    scoring_parameters: Tuple[int, int, int] = (2, -4, -2),
+                    max_reads: Optional[int] = None) -> Dict:
+    """
+    Runs `run_benchmark` for every combination of reads file, engine and worker count.
+
+    Args:
+        read_files (Sequence[str]): The reads files, e.g. subsets of one sample of growing size to measure scaling.
+        references_fp (str): File path to the references FASTA file.
+        engines (Sequence[str]): The names of the alignment engines to benchmark.
+        worker_counts (Sequence[int]): The worker counts to benchmark.
+        scoring_parameters (Tuple[int, int, int]): The match, mismatch and indel scores.
+        max_reads (Optional[int]): Only use the first reads of every file.
+
+    Returns:
+        Dict: The environment of the machine, the list of results and the scaling of each engine and worker count
+              (see `scaling_efficiency`), ready to be written as JSON.
+    """
+    results = [
+        run_benchmark(reads_fp, references_fp, engine, workers, scoring_parameters, max_reads)
+        for engine in engines for workers in worker_counts for reads_fp in read_files
+    ]
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "scoring_parameters": list(scoring_parameters),
+        "results": results,
+        "scaling": scaling_efficiency(results),
+    }
+
+
+def scaling_efficiency(results: List[Dict]) -> List[Dict]:
+    """
+    Compares the throughput on the largest and smallest reads file of every engine and worker count.
+
+    An efficiency of 1.0 means the run time grew linearly with the number of reads; lower values mean the larger
+    inputs were processed more slowly per read.
+
+    Returns:
+        List[Dict]: The engine, workers, smallest and largest read counts and their reads-per-second ratio.
+    """
+    groups = {}
+    for result in results:
+        groups.setdefault((result["engine"], result["workers"]), []).append(result)
+
+    scaling = []
+    for (engine, workers), group in groups.items():
+        smallest = min(group, key=lambda result: result["reads"])
+        largest = max(group, key=lambda result: result["reads"])
+        scaling.append({
+            "engine": engine,
+            "workers": workers,
+            "smallest_reads": smallest["reads"],
+            "largest_reads": largest["reads"],
+            "efficiency": largest["reads_per_second"] / smallest["reads_per_second"]
+                          if smallest["reads_per_second"] else 0.0,
+        })
+    return scaling
+
+
+def compare_to_baseline(current: Dict, baseline: Dict, threshold: float = 0.1) -> List[str]:
+    """
+    Finds the runs whose throughput dropped by more than `threshold` against a saved baseline.
+
+    Runs are matched on reads file, engine and worker count; runs missing from either side are ignored.
+
+    Args:
+        current (Dict): The output of `benchmark_suite`.
+        baseline (Dict): An earlier output of `benchmark_suite`, e.g. loaded from its JSON file.
+        threshold (float): The tolerated relative drop in reads per second.
+
+    Returns:
+        List[str]: A description of every regression, empty when there is none.
+    """
+    key = lambda result: (result["reads_file"], result["engine"], result["workers"])
+    baseline_results = {key(result): result for result in baseline["results"]}
+
+    regressions = []
+    for result in current["results"]:
+        reference = baseline_results.get(key(result))
+        if reference is None:
+            continue
+        ratio = result["reads_per_second"] / reference["reads_per_second"]
+        if ratio < 1 - threshold:
+            regressions.append(f"{result['reads_file']} ({result['engine']}, {result['workers']} workers): "
+                               f"{result['reads_per_second']:.1f} reads/s vs {reference['reads_per_second']:.1f} "
+                               f"baseline ({ratio - 1:+.1%})")
+    return regressions
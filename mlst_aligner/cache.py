@@ -0,0 +1,153 @@
+"""cache.py"""
+import hashlib
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mlst_aligner")
+
+
+class AlignmentCache:
+    """
+    A persistent, size-limited cache of alignment results stored in an SQLite database in a cache directory.
+
+    Entries are keyed by a hash of the read sequence, the reference sequence and the scoring parameters, and hold the
+    `scores_at_positions` of that alignment, with the scores stored as int64 like the DP computes them. When the cache
+    grows past `max_entries`, the least recently used entries are evicted.
+
+    Attributes:
+        path (str): The path of the SQLite database.
+        max_entries (int): The maximum number of alignment results kept.
+        entries (int): The number of alignment results stored, counted once on opening and kept up to date after.
+        hits (int): The number of lookups answered from the cache since it was opened.
+        misses (int): The number of lookups that had to be computed since it was opened.
+
+    Args:
+        cache_dir (str): The directory holding the cache database, created if needed.
+        max_entries (int): The maximum number of alignment results kept.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_entries: int = 1_000_000):
+        """
+        Initializes AlignmentCache
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "alignments.sqlite")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS alignments "
+                                "(key BLOB PRIMARY KEY, length INTEGER, positions BLOB, scores BLOB, last_used INTEGER)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS alignments_last_used ON alignments (last_used)")
+        self.connection.commit()
+        self.clock = self.connection.execute("SELECT COALESCE(MAX(last_used), 0) FROM alignments").fetchone()[0]
+        self.entries = self.connection.execute("SELECT COUNT(*) FROM alignments").fetchone()[0]
+
+    def tick(self) -> int:
+        """Advances the logical clock used to order entries by recency of use."""
+        self.clock += 1
+        return self.clock
+
+    @staticmethod
+    def scope(reference: str, parameters: Tuple) -> bytes:
+        """
+        Hashes a reference sequence together with everything else that changes an alignment result.
+
+        Args:
+            reference (str): The reference sequence.
+            parameters (Tuple): The scoring parameters and alignment mode options.
+
+        Returns:
+            bytes: A digest to combine with read sequences in `key`.
+        """
+        return hashlib.sha256(reference.encode() + b"\0" + repr(parameters).encode()).digest()
+
+    @staticmethod
+    def key(scope: bytes, read: str) -> bytes:
+        """Returns the cache key of a read sequence within a scope returned by `scope`."""
+        return hashlib.sha256(scope + read.encode()).digest()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, Dict[int, Tuple[int, int]]]:
+        """
+        Looks up alignment results and marks the ones found as recently used.
+
+        Args:
+            keys (List[bytes]): The cache keys to look up.
+
+        Returns:
+            Dict[bytes, Dict[int, Tuple[int, int]]]: The `scores_at_positions` of every key found in the cache.
+        """
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        # SQLite limits the number of host parameters per statement.
+        for start in range(0, len(unique_keys), 500):
+            batch = unique_keys[start:start + 500]
+            rows = self.connection.execute(
+                f"SELECT key, length, positions, scores FROM alignments WHERE key IN ({','.join('?' * len(batch))})",
+                batch)
+            for key, length, positions, scores in rows:
+                found[key] = dict(
+                    zip(
+                        np.frombuffer(positions, dtype=np.int32).tolist(),
+                        ((score, length) for score in np.frombuffer(scores, dtype=np.int64).tolist())))
+        if found:
+            now = self.tick()
+            self.connection.executemany("UPDATE alignments SET last_used = ? WHERE key = ?",
+                                        [(now, key) for key in found])
+            self.connection.commit()
+        self.hits += sum(key in found for key in keys)
+        self.misses += sum(key not in found for key in keys)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[bytes, Dict[int, Tuple[int, int]]]]):
+        """
+        Stores alignment results, then evicts the least recently used entries beyond `max_entries`.
+
+        Results whose key is already stored are left as they are, since the same key always gives the same result.
+
+        Args:
+            items (Iterable[Tuple[bytes, Dict[int, Tuple[int, int]]]]): (key, scores_at_positions) pairs.
+        """
+        now = self.tick()
+        rows = []
+        for key, scores_at_positions in items:
+            length = next(iter(scores_at_positions.values()))[1] if scores_at_positions else 0
+            positions = np.fromiter(scores_at_positions.keys(), dtype=np.int32, count=len(scores_at_positions))
+            scores = np.fromiter((score for score, _ in scores_at_positions.values()),
+                                 dtype=np.int64,
+                                 count=len(scores_at_positions))
+            rows.append((key, length, positions.tobytes(), scores.tobytes(), now))
+        if not rows:
+            return
+        changes = self.connection.total_changes
+        self.connection.executemany("INSERT OR IGNORE INTO alignments VALUES (?, ?, ?, ?, ?)", rows)
+        self.entries += self.connection.total_changes - changes
+        if self.entries > self.max_entries:
+            self.evict()
+        self.connection.commit()
+
+    def evict(self):
+        """Deletes the least recently used entries until at most `max_entries` remain."""
+        excess = self.entries - self.max_entries
+        if excess > 0:
+            deleted = self.connection.execute(
+                "DELETE FROM alignments WHERE key IN (SELECT key FROM alignments ORDER BY last_used LIMIT ?)", (excess, ))
+            self.entries -= deleted.rowcount
+            self.connection.commit()
+
+    def clear(self):
+        """Deletes every entry of the cache."""
+        self.connection.execute("DELETE FROM alignments")
+        self.connection.commit()
+        self.connection.execute("VACUUM")
+        self.entries = 0
+
+    def close(self):
+        """Closes the underlying database connection."""
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return self.entries
@@ -1,8 +1,121 @@
+import asyncio
 import click
+import cProfile
+import json
+import os
+import pstats
+import sys
 import time
+from contextlib import contextmanager
+from mlst_aligner.backends import BACKENDS
+from mlst_aligner.cache import AlignmentCache, DEFAULT_CACHE_DIR
+from mlst_aligner.metrics import Metrics
+from mlst_aligner.server import DEFAULT_SOCKET, ScoringServer, send_request
 from mlst_aligner.scoring import GeneScore
-from mlst_aligner.utils import subset_fasta
+from mlst_aligner.store import encode_reads
+from mlst_aligner.partial import final_scores, merge_partials, parse_shard
+from mlst_aligner.sketch import exact_rankings, load_sketches, save_sketches, sketch_references
+from mlst_aligner.sweep import parameter_grid, run_sweep
+from mlst_aligner.utils import fetch_references, subset_fasta
 from mlst_aligner.mlst import ScoreMLST
+from mlst_aligner.alleles import ScoreAlleles
+from mlst_aligner.batch import run_batch
+from mlst_aligner.benchmark import benchmark_suite, compare_to_baseline
+
+
+def print_dedup_stats(stats):
+    """Prints the read deduplication statistics of the last scored reference."""
+    print(f"Unique reads: {stats['unique_reads']} of {stats['reads']} ({stats['unique_fraction']:.1%}), "
+          f"alignments saved: {stats['alignments_saved']}.")
+
+
+def engine_option(command):
+    """Adds the --engine option, choosing a registered alignment backend or `auto` to calibrate one."""
+    return click.option('--engine', default='numpy', type=click.Choice([*BACKENDS, 'auto']),
+                        help='Alignment backend, or auto to pick the fastest on a sample of the reads.')(command)
+
+
+def print_engine_timings(scorer):
+    """Prints the backend picked by `--engine auto` and the calibration time of every backend."""
+    if scorer.engine_timings:
+        timings = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in scorer.engine_timings.items())
+        print(f"Engine: {scorer.engine} (calibrated: {timings})")
+
+
+def print_cache_stats(cache):
+    """Prints how many alignments were answered from the alignment cache."""
+    print(f"Alignment cache: {cache.hits} hits, {cache.misses} misses, {len(cache)} entries in {cache.path}.")
+
+
+def cache_options(command):
+    """Adds the alignment cache options to a scoring command."""
+    command = click.option('--cache/--no-cache', default=False,
+                           help='Reuse alignment results from a persistent cache.')(command)
+    command = click.option('--cache-dir', default=DEFAULT_CACHE_DIR, help='Directory of the alignment cache.',
+                           type=click.Path())(command)
+    command = click.option('--cache-size', default=1_000_000, help='Maximum number of cached alignment results.',
+                           type=int)(command)
+    command = click.option('--clear-cache', is_flag=True, help='Empty the alignment cache before scoring.',
+                           default=False)(command)
+    return command
+
+
+def adaptive_options(command):
+    """Adds the adaptive early-stopping options to a scoring command."""
+    command = click.option('--adaptive', is_flag=True, help='Score shuffled batches of reads until the score converges.',
+                           default=False)(command)
+    command = click.option('--adaptive-batch-size', default=500, help='Number of reads per adaptive batch.',
+                           type=int)(command)
+    command = click.option('--tolerance', default=0.01, help='Relative change of the score estimate deemed converged.',
+                           type=float)(command)
+    command = click.option('--patience', default=3, help='Consecutive converged batches needed to stop.',
+                           type=int)(command)
+    command = click.option('--max-error', default=None, help='Also stop once the relative standard error is this low.',
+                           type=float)(command)
+    command = click.option('--seed', default=0, help='Seed of the read shuffle.', type=int)(command)
+    return command
+
+
+def print_adaptive_stats(stats, prefix=""):
+    """Prints how many reads the adaptive mode used and the estimated error of the score."""
+    status = "converged" if stats["converged"] else "not converged"
+    print(f"{prefix}Reads used: {stats['reads']} in {stats['batches']} batches ({status}), "
+          f"estimate: {stats['estimate']:.2f} +/- {stats['standard_error']:.2f}.")
+
+
+def prepare_cache(cache, cache_dir, clear_cache):
+    """Clears the cache if requested and returns the cache directory to use, or None when caching is off."""
+    if clear_cache:
+        alignment_cache = AlignmentCache(cache_dir)
+        alignment_cache.clear()
+        alignment_cache.close()
+    return cache_dir if cache else None
+
+
+def metrics_options(command):
+    """Adds the instrumentation options to a scoring command."""
+    command = click.option('--metrics-json', default=None, help='Write per-stage timings and counters to this JSON file.',
+                           type=click.Path())(command)
+    command = click.option('--profile', is_flag=True, help='Print a cProfile report of the run to stderr.',
+                           default=False)(command)
+    return command
+
+
+@contextmanager
+def instrumented(metrics_json, profile):
+    """Yields the Metrics to pass to a scorer, writing them to `metrics_json` and printing a profile when asked."""
+    metrics = Metrics(enabled=metrics_json is not None)
+    profiler = cProfile.Profile() if profile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield metrics
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+        if metrics_json is not None:
+            metrics.write_json(metrics_json)
 
 
 @click.group()
@@ -17,14 +130,48 @@ def cli():
 @click.option('--match', default=2, help='Match score.')
 @click.option('--mismatch', default=-2, help='Mismatch penalty.')
 @click.option('--indel', default=-1, help='Indel penalty.')
-def score(read_fp, reference, match, mismatch, indel):
+@click.option('--workers', default=1, help='Number of worker processes used to align reads.', type=int)
+@click.option('--batch-size', default=64, help='Number of reads aligned together by the batch kernel.', type=int)
+@click.option('--dedup', is_flag=True, help='Align each unique read sequence once, weighted by its count.', default=False)
+@engine_option
+@cache_options
+@metrics_options
+@adaptive_options
+def score(read_fp, reference, match, mismatch, indel, workers, batch_size, dedup, engine, cache, cache_dir,
+          cache_size, clear_cache, metrics_json, profile, adaptive, adaptive_batch_size, tolerance, patience, max_error,
+          seed):
     """
     Compute and print the gene scores based on alignments.
     """
     start_time = time.time()
-    gene_score = GeneScore(read_fp, reference, match=match, mismatch=mismatch, indel=indel)
-    final_score = gene_score.get_t_score()
+    with instrumented(metrics_json, profile) as metrics:
+        gene_score = GeneScore(read_fp,
+                               reference,
+                               match=match,
+                               mismatch=mismatch,
+                               indel=indel,
+                               workers=workers,
+                               batch_size=batch_size,
+                               dedup=dedup,
+                               engine=engine,
+                               cache_dir=prepare_cache(cache, cache_dir, clear_cache),
+                               cache_size=cache_size,
+                               metrics=metrics,
+                               adaptive=adaptive,
+                               adaptive_batch_size=adaptive_batch_size,
+                               tolerance=tolerance,
+                               patience=patience,
+                               max_error=max_error,
+                               seed=seed)
+        final_score = gene_score.get_t_score()
     click.echo(f"Final Score: {final_score}")
+    print_engine_timings(gene_score)
+    if gene_score.adaptive_stats:
+        print_adaptive_stats(gene_score.adaptive_stats)
+    if gene_score.dedup_stats:
+        print_dedup_stats(gene_score.dedup_stats)
+    if gene_score.cache is not None:
+        print_cache_stats(gene_score.cache)
     end_time = time.time()
     print(f"Completed in {end_time - start_time:.2f} seconds.")
 
@@ -33,20 +180,26 @@ def score(read_fp, reference, match, mismatch, indel):
 @click.argument('original_fasta_fp', type=click.Path(exists=True))
 @click.option('--subset_count', default=1000, help='Number of reads to include in the subset.', type=int)
 @click.option('--randomize', is_flag=True, help='Randomize the subset selection.', default=False)
+@click.option('--seed', default=None, help='Seed of the random subset, for a reproducible selection.', type=int)
 @click.argument('output_fasta_fp', type=click.Path())
-def subset(original_fasta_fp, subset_count, output_fasta_fp, randomize):
+def subset(original_fasta_fp, subset_count, output_fasta_fp, randomize, seed):
     """
-    Subsets a FASTA file and saves the subset to a new file. Optionally randomizes the subset selection.
+    Subsets a FASTA/FASTQ file (optionally gzipped) in a single streaming pass and saves the subset to a new file.
+    Optionally randomizes the subset selection.
     
-    ORIGINAL_FASTA_FP: Path to the original FASTA file.
-    OUTPUT_FASTA_FP: Path where the subset FASTA file will be saved.
+    ORIGINAL_FASTA_FP: Path to the original FASTA/FASTQ file.
+    OUTPUT_FASTA_FP: Path where the subset will be saved, as FASTQ for a .fastq/.fq extension, gzipped for .gz.
     
     Options:
     --subset_count: Specify the number of reads to include in the subset. Default is 1000.
-    --randomize: If set, the reads selection for the subset will be randomized.
+    --randomize: If set, the reads are drawn at random from the whole file by reservoir sampling.
+    --seed: The seed of the random selection, so that the same subset is drawn again.
     """
-    subset_fasta(original_fasta=original_fasta_fp, subset_count=subset_count, output_fasta=output_fasta_fp, randomize=randomize)
-
+    try:
+        subset_fasta(original_fasta=original_fasta_fp, subset_count=subset_count, output_fasta=output_fasta_fp,
+                     randomize=randomize, seed=seed)
+    except ValueError as e:
+        raise click.ClickException(str(e))
 
 
 @click.command()
@@ -55,15 +208,350 @@ def subset(original_fasta_fp, subset_count, output_fasta_fp, randomize):
 @click.option('--match', default=2, help='Match score.')
 @click.option('--mismatch', default=-4, help='Mismatch penalty.')
 @click.option('--indel', default=-2, help='Indel penalty.')
-def score_mlst(reads_fp, mlst_fp, match, mismatch, indel):
+@click.option('--workers', default=1, help='Number of worker processes used to align reads.', type=int)
+@click.option('--batch-size', default=64, help='Number of reads aligned together by the batch kernel.', type=int)
+@click.option('--kmer-size', default=None, help='Route reads to loci through a k-mer index of this k.', type=int)
+@click.option('--check-recall', is_flag=True, help='Compare the k-mer routing against the exhaustive mode.', default=False)
+@click.option('--dedup', is_flag=True, help='Align each unique read sequence once, weighted by its count.', default=False)
+@click.option('--shard', default=None, help='Only score the i-th of N deterministic slices of the reads, given as i/N.')
+@click.option('--partial', 'partial_fp', default=None, help='Write the per-gene accumulators to this file for merge.',
+              type=click.Path())
+@click.option('--checkpoint', default=None, help='Resume from this checkpoint file and save progress to it.',
+              type=click.Path())
+@click.option('--checkpoint-interval', default=10_000, help='Number of reads scored between checkpoint saves.', type=int)
+@click.option('--sketch-top-k', default=None, help='Only score the top k alleles of every locus ranked by sketch.',
+              type=int)
+@click.option('--sketch-k', default=21, help='K-mer length of the allele and read sketches.', type=int)
+@click.option('--sketch-scaled', default=1, help='Keep one in about this many k-mers in the sketches.', type=int)
+@click.option('--sketches', 'sketches_fp', default=None, type=click.Path(),
+              help='Load the allele sketches from this file, built with the same MLST file, k and scaled, or save them to it.')
+@engine_option
+@cache_options
+@metrics_options
+@adaptive_options
+def score_mlst(reads_fp, mlst_fp, match, mismatch, indel, workers, batch_size, kmer_size, check_recall, dedup, shard,
+               partial_fp, checkpoint, checkpoint_interval, sketch_top_k, sketch_k, sketch_scaled, sketches_fp, engine,
+               cache, cache_dir, cache_size, clear_cache, metrics_json, profile, adaptive, adaptive_batch_size, tolerance,
+               patience, max_error, seed):
     """
     Compute and print the MLST scores for multiple genes based on alignments.
     """
+    try:
+        shard = parse_shard(shard)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--shard")
+    if shard is not None and partial_fp is None:
+        raise click.UsageError("--shard needs --partial to write the partial result to.")
+    if check_recall and kmer_size is None:
+        raise click.UsageError("--check-recall needs --kmer-size to route the reads.")
     start_time = time.time()
-    mlst_scorer = ScoreMLST(reads_fp=reads_fp, references_fp=mlst_fp, match=match, mismatch=mismatch, indel=indel)
-    gene_scores = mlst_scorer.score_mlst()
+    allele_sketches = None
+    if sketch_top_k is not None and sketches_fp is not None:
+        references = fetch_references(mlst_fp)
+        if os.path.exists(sketches_fp):
+            try:
+                allele_sketches = load_sketches(sketches_fp, references, sketch_k, sketch_scaled)
+            except ValueError as e:
+                raise click.UsageError(f"{e} Remove it to rebuild the sketches, or pass another --sketches file.")
+        else:
+            allele_sketches = sketch_references(references, sketch_k, sketch_scaled)
+            save_sketches(sketches_fp, allele_sketches, references)
+    with instrumented(metrics_json, profile) as metrics:
+        mlst_scorer = ScoreMLST(reads_fp=reads_fp,
+                                references_fp=mlst_fp,
+                                match=match,
+                                mismatch=mismatch,
+                                indel=indel,
+                                workers=workers,
+                                batch_size=batch_size,
+                                kmer_size=kmer_size,
+                                check_recall=check_recall,
+                                dedup=dedup,
+                                engine=engine,
+                                cache_dir=prepare_cache(cache, cache_dir, clear_cache),
+                                cache_size=cache_size,
+                                metrics=metrics,
+                                adaptive=adaptive,
+                                adaptive_batch_size=adaptive_batch_size,
+                                tolerance=tolerance,
+                                patience=patience,
+                                max_error=max_error,
+                                seed=seed,
+                                shard=shard,
+                                checkpoint=checkpoint,
+                                checkpoint_interval=checkpoint_interval,
+                                sketch_top_k=sketch_top_k,
+                                sketch_k=sketch_k,
+                                sketch_scaled=sketch_scaled,
+                                allele_sketches=allele_sketches)
+        gene_scores = mlst_scorer.score_mlst()
+    if partial_fp is not None:
+        mlst_scorer.save_partial(partial_fp)
+        print(f"Partial result written to {partial_fp}.")
     for gene_name, gene_score in gene_scores:
         click.echo(f"Gene: {gene_name}, Score: {gene_score}")
+    print_engine_timings(mlst_scorer)
+    for gene_name, stats in mlst_scorer.gene_adaptive_stats.items():
+        print_adaptive_stats(stats, prefix=f"Gene: {gene_name}, ")
+    if mlst_scorer.checkpoint_stats:
+        stats = mlst_scorer.checkpoint_stats
+        print(f"Resumed {stats['resumed_reads']} reads from {checkpoint}, scored {stats['new_reads']} new reads.")
+    if mlst_scorer.sketch_rankings:
+        exact = exact_rankings(gene_scores)
+        for locus, ranking in mlst_scorer.sketch_rankings.items():
+            estimated = ", ".join(f"{name} ({containment:.3f})" for name, containment in ranking)
+            scored = ", ".join(f"{name} ({score})" for name, score in exact.get(locus, []))
+            print(f"Locus: {locus}, Estimated: {estimated}; Exact: {scored}")
+    if mlst_scorer.routing_stats and "skipped_alignments" in mlst_scorer.routing_stats:
+        stats = mlst_scorer.routing_stats
+        print(f"Skipped {stats['skipped_alignments']} of {stats['exhaustive_alignments']} alignments.")
+        for gene_name, recall in stats.get("recall", {}).items():
+            print(f"Gene: {gene_name}, Routing recall: {recall:.3f}")
+    if mlst_scorer.dedup_stats:
+        print_dedup_stats(mlst_scorer.dedup_stats)
+    if mlst_scorer.cache is not None:
+        print_cache_stats(mlst_scorer.cache)
+    end_time = time.time()
+    print(f"Completed in {end_time - start_time:.2f} seconds.")
+
+
+@click.command()
+@click.argument('reads_fp', type=click.Path(exists=True))
+@click.argument('alleles_fp', type=click.Path(exists=True))
+@click.option('--profiles', 'profiles_fp', default=None, help='Tab-separated ST profiles used to call the sequence type.',
+              type=click.Path(exists=True))
+@click.option('--match', default=2, help='Match score.')
+@click.option('--mismatch', default=-4, help='Mismatch penalty.')
+@click.option('--indel', default=-2, help='Indel penalty.')
+@click.option('--batch-size', default=64, help='Number of reads aligned together by the batch kernel.', type=int)
+@click.option('--dedup', is_flag=True, help='Align each unique read sequence once, weighted by its count.', default=False)
+@click.option('--top', default=3, help='Number of ranked alleles printed per locus.', type=int)
+@metrics_options
+def type_alleles(reads_fp, alleles_fp, profiles_fp, match, mismatch, indel, batch_size, dedup, top, metrics_json, profile):
+    """
+    Rank every allele of every locus in an allele database and call the sequence type.
+    """
+    start_time = time.time()
+    with instrumented(metrics_json, profile) as metrics:
+        allele_scorer = ScoreAlleles(reads_fp=reads_fp,
+                                     alleles_fp=alleles_fp,
+                                     profiles_fp=profiles_fp,
+                                     match=match,
+                                     mismatch=mismatch,
+                                     indel=indel,
+                                     batch_size=batch_size,
+                                     dedup=dedup,
+                                     metrics=metrics)
+        rankings = allele_scorer.score_alleles()
+    for locus, ranking in rankings.items():
+        trie = allele_scorer.tries[locus]
+        alleles = ", ".join(f"{allele_name} ({score:.2f})" for allele_name, score in ranking[:top])
+        click.echo(f"Locus: {locus}, Alleles: {alleles}")
+        print(f"Locus: {locus}, {len(ranking)} alleles, {trie.columns} of "
+              f"{sum(len(sequence) for sequence in trie.sequences)} columns aligned, "
+              f"{allele_scorer.locus_timings[locus]:.2f} seconds.")
+    if profiles_fp:
+        click.echo(f"ST: {allele_scorer.sequence_type(rankings) or 'unknown'}")
+    end_time = time.time()
+    print(f"Completed in {end_time - start_time:.2f} seconds.")
+
+
+@click.command()
+@click.argument('read_files', nargs=-1, required=True, type=click.Path(exists=True))
+@click.argument('references_fp', type=click.Path(exists=True))
+@click.option('--engine', 'engines', multiple=True, default=["numpy"], help='Alignment engine to benchmark, repeatable.',
+              type=click.Choice(list(BACKENDS)))
+@click.option('--workers', 'worker_counts', multiple=True, default=[1], help='Worker count to benchmark, repeatable.',
+              type=int)
+@click.option('--max-reads', default=None, help='Only use the first reads of every file.', type=int)
+@click.option('--output', default=None, help='Write the results as JSON to this file.', type=click.Path())
+@click.option('--baseline', default=None, help='Fail when throughput drops against this saved JSON output.',
+              type=click.Path(exists=True))
+@click.option('--threshold', default=0.1, help='Tolerated relative drop in reads per second against the baseline.',
+              type=float)
+def benchmark(read_files, references_fp, engines, worker_counts, max_reads, output, baseline, threshold):
+    """
+    Benchmark the alignment engines and worker counts over one or more reads files against the MLST references.
+    """
+    report = benchmark_suite(read_files, references_fp, engines, worker_counts, max_reads=max_reads)
+    for result in report["results"]:
+        click.echo(f"{result['reads_file']} ({result['engine']}, {result['workers']} workers): "
+                   f"{result['reads_per_second']:.1f} reads/s, {result['alignments_per_second']:.1f} alignments/s, "
+                   f"{result['cells_per_second']:.3g} cells/s, peak RSS {result['peak_rss_mb']:.1f} MiB")
+    for scaling in report["scaling"]:
+        click.echo(f"Scaling ({scaling['engine']}, {scaling['workers']} workers): {scaling['smallest_reads']} to "
+                   f"{scaling['largest_reads']} reads, efficiency {scaling['efficiency']:.2f}")
+    if output:
+        with open(output, "w") as outfile:
+            json.dump(report, outfile, indent=2)
+    if baseline:
+        with open(baseline) as infile:
+            regressions = compare_to_baseline(report, json.load(infile), threshold)
+        for regression in regressions:
+            click.echo(f"Regression: {regression}")
+        if regressions:
+            raise click.ClickException(f"{len(regressions)} benchmark(s) regressed by more than {threshold:.0%}.")
+
+
+@click.command()
+@click.argument('manifest_fp', type=click.Path(exists=True))
+@click.argument('mlst_fp', type=click.Path(exists=True))
+@click.argument('output_fp', type=click.Path())
+@click.option('--json', 'json_fp', default=None, help='Also write the result table as JSON to this file.',
+              type=click.Path())
+@click.option('--match', default=2, help='Match score.')
+@click.option('--mismatch', default=-4, help='Mismatch penalty.')
+@click.option('--indel', default=-2, help='Indel penalty.')
+@click.option('--workers', default=1, type=int,
+              help='Number of processes. Samples are scored in parallel, and with fewer samples than processes the rest '
+              'align the reads of each sample in parallel.')
+@click.option('--batch-size', default=64, help='Number of reads aligned together by the batch kernel.', type=int)
+@click.option('--kmer-size', default=None, help='Route reads to loci through a k-mer index of this k.', type=int)
+@click.option('--dedup', is_flag=True, help='Align each unique read sequence once, weighted by its count.', default=False)
+def batch(manifest_fp, mlst_fp, output_fp, json_fp, match, mismatch, indel, workers, batch_size, kmer_size, dedup):
+    """
+    Compute the MLST scores of every sample in a manifest into one table.
+
+    MANIFEST_FP: Tab-separated file with a sample name and a reads file on every line.
+    OUTPUT_FP: TSV result table. Samples already in it are skipped, so an interrupted run can be resumed.
+    """
+    start_time = time.time()
+    table = run_batch(manifest_fp,
+                      mlst_fp,
+                      output_fp,
+                      json_fp=json_fp,
+                      workers=workers,
+                      match=match,
+                      mismatch=mismatch,
+                      indel=indel,
+                      batch_size=batch_size,
+                      kmer_size=kmer_size,
+                      dedup=dedup)
+    click.echo(f"Scored {len(table)} samples into {output_fp}.")
+    end_time = time.time()
+    print(f"Completed in {end_time - start_time:.2f} seconds.")
+
+
+@click.command()
+@click.argument('mlst_fp', type=click.Path(exists=True))
+@click.option('--socket', 'socket_path', default=DEFAULT_SOCKET, help='Unix socket to listen on.', type=click.Path())
+@click.option('--workers', default=1, help='Number of jobs scored in parallel.', type=int)
+@click.option('--max-queue', default=64, help='Number of jobs allowed to wait for a worker before rejecting.', type=int)
+@click.option('--match', default=2, help='Match score.')
+@click.option('--mismatch', default=-4, help='Mismatch penalty.')
+@click.option('--indel', default=-2, help='Indel penalty.')
+@click.option('--batch-size', default=64, help='Number of reads aligned together by the batch kernel.', type=int)
+@click.option('--kmer-size', default=None, help='Route reads to loci through a k-mer index of this k.', type=int)
+@click.option('--dedup', is_flag=True, help='Align each unique read sequence once, weighted by its count.', default=False)
+def serve(mlst_fp, socket_path, workers, max_queue, match, mismatch, indel, batch_size, kmer_size, dedup):
+    """
+    Keep the MLST references loaded and score reads files sent over a Unix socket.
+    """
+    server = ScoringServer(mlst_fp,
+                           socket_path,
+                           workers=workers,
+                           max_queue=max_queue,
+                           match=match,
+                           mismatch=mismatch,
+                           indel=indel,
+                           batch_size=batch_size,
+                           kmer_size=kmer_size,
+                           dedup=dedup)
+    print(f"Serving {len(server.references)} genes on {socket_path} with {workers} workers.")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+@click.command()
+@click.argument('reads_fp', type=click.Path(exists=True))
+@click.option('--socket', 'socket_path', default=DEFAULT_SOCKET, help='Unix socket of the server.', type=click.Path())
+@click.option('--sample', default=None, help='Sample name reported back by the server.')
+def client(reads_fp, socket_path, sample):
+    """
+    Score a reads file on a running server and print the MLST scores.
+    """
+    request = {"reads": reads_fp}
+    if sample is not None:
+        request["sample"] = sample
+    response = send_request(request, socket_path)
+    if not response["ok"]:
+        raise click.ClickException(response["error"])
+    for gene_name, gene_score in response["scores"].items():
+        click.echo(f"Gene: {gene_name}, Score: {gene_score}")
+    print(f"Completed in {response['seconds']:.2f} seconds.")
+
+
+def int_list(ctx, param, value):
+    """Parses a comma-separated list of integers given to an option."""
+    try:
+        return [int(item) for item in value.split(",")]
+    except ValueError:
+        raise click.BadParameter(f"{value} is not a comma-separated list of integers.")
+
+
+@click.command()
+@click.argument('reads_fp', type=click.Path(exists=True))
+@click.argument('mlst_fp', type=click.Path(exists=True))
+@click.option('--match', 'matches', default='2', help='Comma-separated match scores to try.', callback=int_list)
+@click.option('--mismatch', 'mismatches', default='-4', help='Comma-separated mismatch penalties to try.',
+              callback=int_list)
+@click.option('--indel', 'indels', default='-2', help='Comma-separated indel penalties to try.', callback=int_list)
+@click.option('--workers', default=1, help='Number of worker processes used to align reads.', type=int)
+@click.option('--batch-size', default=64, help='Number of reads aligned together by the batch kernel.', type=int)
+@click.option('--max-reads', default=None, help='Only use the first reads of the file.', type=int)
+@click.option('--output', 'output_fp', default=None, help='Write the score table to this TSV file.', type=click.Path())
+def sweep(reads_fp, mlst_fp, matches, mismatches, indels, workers, batch_size, max_reads, output_fp):
+    """
+    Score every gene under every combination of the given scoring parameters in a single pass over the reads.
+
+    The reads are parsed and encoded once for all combinations, but the alignment DP still runs once per combination,
+    so this saves read parsing time, not alignment time.
+    """
+    start_time = time.time()
+    table = run_sweep(reads_fp, mlst_fp, parameter_grid(matches, mismatches, indels), workers=workers,
+                      batch_size=batch_size, max_reads=max_reads)
+    columns = list(table[0]) if table else []
+    lines = ["\t".join(columns)] + ["\t".join(str(row[column]) for column in columns) for row in table]
+    if output_fp is not None:
+        with open(output_fp, "w") as outfile:
+            outfile.write("\n".join(lines) + "\n")
+    for line in lines:
+        click.echo(line)
+    end_time = time.time()
+    print(f"Completed in {end_time - start_time:.2f} seconds.")
+
+
+@click.command()
+@click.argument('partial_fps', nargs=-1, required=True, type=click.Path(exists=True))
+def merge(partial_fps):
+    """
+    Combine the partial results written by `score_mlst --shard i/N --partial` into the MLST scores of the whole sample.
+    """
+    try:
+        metadata, gene_accumulators = merge_partials(partial_fps)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    for gene_name, gene_score in final_scores(gene_accumulators):
+        click.echo(f"Gene: {gene_name}, Score: {gene_score}")
+    if metadata["missing_shards"]:
+        print(f"Warning: shards {', '.join(map(str, metadata['missing_shards']))} of {metadata['shard_count']} are "
+              f"missing, the scores only cover part of the reads.", file=sys.stderr)
+
+
+@click.command()
+@click.argument('reads_fp', type=click.Path(exists=True))
+@click.argument('store_path', type=click.Path())
+def encode(reads_fp, store_path):
+    """
+    Encode a reads file once into a compact, memory-mapped read store that the scoring commands accept in place of
+    the reads file.
+    """
+    start_time = time.time()
+    metadata = encode_reads(reads_fp, store_path)
+    click.echo(f"Encoded {metadata['reads']} reads ({metadata['bases']} bases, {metadata['masked_bases']} masked) "
+               f"into {store_path}.")
     end_time = time.time()
     print(f"Completed in {end_time - start_time:.2f} seconds.")
 
@@ -71,6 +559,14 @@ def score_mlst(reads_fp, mlst_fp, match, mismatch, indel):
 cli.add_command(score)
 cli.add_command(subset)
 cli.add_command(score_mlst)
+cli.add_command(type_alleles)
+cli.add_command(benchmark)
+cli.add_command(batch)
+cli.add_command(serve)
+cli.add_command(client)
+cli.add_command(encode)
+cli.add_command(merge)
+cli.add_command(sweep)
 if __name__ == '__main__':
 
     cli()
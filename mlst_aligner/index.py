@@ -0,0 +1,87 @@
+"""index.py"""
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+def iter_kmers(sequence: str, k: int) -> Iterator[Tuple[int, str]]:
+    """
+    Yields every k-mer of a sequence together with its start position.
+
+    Args:
+        sequence (str): The sequence to split into k-mers.
+        k (int): The k-mer length.
+
+    Yields:
+        Tuple[int, str]: The start position and the k-mer.
+    """
+    for position in range(len(sequence) - k + 1):
+        yield position, sequence[position:position + k]
+
+
+class KmerIndex:
+    """
+    An index from every k-mer of a set of reference sequences to the references and positions it occurs at.
+
+    The index is built once and used to route reads to the references they share at least one k-mer with, so only
+    those read/reference pairs need to be aligned.
+
+    Attributes:
+        k (int): The k-mer length.
+        names (List[str]): The names of the indexed references, in order.
+        index (Dict[str, List[Tuple[int, int]]]): Maps each k-mer to the (reference index, position) pairs it occurs at.
+
+    Args:
+        references (List[Tuple[str, str]]): The (name, sequence) pairs to index, as returned by `fetch_references`.
+        k (int): The k-mer length.
+    """
+
+    def __init__(self, references: List[Tuple[str, str]], k: int = 15):
+        """
+        Initializes KmerIndex
+        """
+        if k < 1:
+            raise ValueError("k must be a positive integer")
+        self.k = k
+        self.names = [name for name, _ in references]
+        index = defaultdict(list)
+        for reference_index, (_, sequence) in enumerate(references):
+            for position, kmer in iter_kmers(sequence, k):
+                index[kmer].append((reference_index, position))
+        self.index: Dict[str, List[Tuple[int, int]]] = dict(index)
+
+    def candidates(self, read: str) -> Set[int]:
+        """
+        Finds the references that share at least one k-mer with a read.
+
+        Args:
+            read (str): The read sequence.
+
+        Returns:
+            Set[int]: The indices of the candidate references.
+        """
+        hits = set()
+        for _, kmer in iter_kmers(read, self.k):
+            for reference_index, _ in self.index.get(kmer, ()):
+                hits.add(reference_index)
+        return hits
+
+    def seed_diagonal(self, read: str, reference_index: int) -> Optional[int]:
+        """
+        Estimates where a read lies on a reference from the k-mers they share.
+
+        Args:
+            read (str): The read sequence.
+            reference_index (int): The index of the reference in the index.
+
+        Returns:
+            Optional[int]: The most frequent diagonal (reference position minus read position) of the shared k-mers,
+                           or None when the read shares no k-mer with the reference.
+        """
+        diagonals = Counter()
+        for read_position, kmer in iter_kmers(read, self.k):
+            for hit_index, reference_position in self.index.get(kmer, ()):
+                if hit_index == reference_index:
+                    diagonals[reference_position - read_position] += 1
+        if not diagonals:
+            return None
+        return diagonals.most_common(1)[0][0]
@@ -0,0 +1,97 @@
+"""metrics.py"""
+import json
+import resource
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, Iterator
+
+_NO_STAGE = nullcontext()
+
+
+def peak_rss_mb() -> float:
+    """Returns the peak resident set size of this process and its finished children, in MiB."""
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak * scale / 2**20
+
+
+class Metrics:
+    """
+    Lightweight per-stage timers and counters for a scoring run.
+
+    Scorers time their stages (reference load, read I/O, alignment, merge, final scoring) with `stage` and count reads,
+    alignments and DP cells with `count`. A disabled instance turns every call into a no-op: `stage` returns a shared
+    null context and `timed` hands the iterable back untouched, so instrumented code pays next to nothing.
+
+    Attributes:
+        enabled (bool): Whether anything is recorded.
+        stages (Dict[str, float]): The wall time spent in each stage, in seconds.
+        counters (Dict[str, int]): The value of each counter.
+
+    Args:
+        enabled (bool): Whether to record anything.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initializes Metrics
+        """
+        self.enabled = enabled
+        self.stages = {}
+        self.counters = {}
+
+    def stage(self, name: str):
+        """Returns a context manager adding the wall time spent inside it to the stage `name`."""
+        if not self.enabled:
+            return _NO_STAGE
+        return self._stage(name)
+
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start_time
+
+    def timed(self, iterable: Iterable, name: str) -> Iterable:
+        """Wraps an iterable so the time spent producing each item is added to the stage `name`."""
+        if not self.enabled:
+            return iterable
+        return self._timed(iterable, name)
+
+    def _timed(self, iterable: Iterable, name: str) -> Iterator:
+        iterator = iter(iterable)
+        while True:
+            start_time = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start_time
+                return
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start_time
+            yield item
+
+    def count(self, name: str, value: int = 1):
+        """Adds `value` to the counter `name`."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_dict(self) -> Dict:
+        """
+        Returns the recorded numbers, for a pipeline to scrape or to write as JSON.
+
+        Returns:
+            Dict: The seconds of every stage, the value of every counter and the peak RSS of the process in MiB.
+        """
+        return {"stages": dict(self.stages), "counters": dict(self.counters), "peak_rss_mb": peak_rss_mb()}
+
+    def write_json(self, file_path: str):
+        """Writes `as_dict` to a JSON file."""
+        with open(file_path, "w") as outfile:
+            json.dump(self.as_dict(), outfile, indent=2)
+
+
+NULL_METRICS = Metrics(enabled=False)
@@ -1,6 +1,14 @@
 """mlst.py"""
+import os
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from mlst_aligner.backends import get_backend
+from mlst_aligner.index import KmerIndex
+from mlst_aligner.partial import final_scores, load_partial, save_partial, scoring_fingerprint
+from mlst_aligner.sketch import Sketch, rank_alleles, sketch_references, top_candidates
 from mlst_aligner.utils import fetch_references
-from mlst_aligner.scoring import GeneScore
+from mlst_aligner.scoring import GeneScore, ScoreAccumulator, chunked
 
 
 class ScoreMLST(GeneScore):
@@ -8,18 +16,40 @@ class ScoreMLST(GeneScore):
     A class for scoring MLST (Multi-Locus Sequence Typing) based on gene sequences against a set of reference sequences.
 
     Attributes:
-        reads_fp (str): File path to the FASTA file containing read sequences.
+        reads_fp (str): File path to the FASTA/FASTQ file (optionally gzipped) containing read sequences.
         references_fp (str): File path to the FASTA file containing reference sequences.
         references (List[Tuple[str, str]]): A list of tuples, where each tuple contains a gene name and its sequence,
                                              extracted from the references FASTA file.
+        kmer_index (Optional[KmerIndex]): A k-mer index over the references used to route reads to loci, only built
+                                          when `kmer_size` is given.
+        routing_stats (Dict): Alignment counts of the last routed `score_mlst` run, and the per-gene recall against
+                              the exhaustive mode when `check_recall` is set.
+        gene_adaptive_stats (Dict[str, Dict]): The `adaptive_stats` of every gene in the last `score_mlst` run, only
+                                               filled in adaptive mode.
+        gene_accumulators (Dict[str, ScoreAccumulator]): The accumulator of every gene in the last `score_mlst` run,
+                                                         which `save_partial` writes for a later `merge_partials`.
+        checkpoint_stats (Dict[str, int]): The reads taken from the checkpoint and the new reads scored in the last
+                                           `score_mlst` run, only filled when `checkpoint` is set.
+        all_references (List[Tuple[str, str]]): Every allele of the references file, of which `score_mlst` only
+                                                scores the candidates kept by the sketch when `sketch_top_k` is set.
+        allele_sketches (Dict[str, Sketch]): The sketch of every allele, only built when `sketch_top_k` is set.
+        sketch_rankings (Dict[str, List[Tuple[str, float]]]): The alleles of every locus ranked by their estimated
+                                                              containment in the reads in the last `score_mlst` run.
     
     Inherits:
         GeneScore: Inherits from the GeneScore class to utilize its scoring mechanisms.
     
     Args:
-        reads_fp (str): File path to the reads FASTA file.
+        reads_fp (str): File path to the reads FASTA/FASTQ file, optionally gzipped.
         references_fp (str): File path to the references FASTA file.
-        **kwargs: Arbitrary keyword arguments passed to the GeneScore initializer.
+        **kwargs: Arbitrary keyword arguments passed to the GeneScore initializer. ScoreMLST additionally accepts
+                  `kmer_size` to route reads through a k-mer index, `check_recall` to compare the routing against
+                  the exhaustive mode and `recall_min_score`, the exhaustive alignment score from which a read
+                  counts as a true hit for a locus (defaults to `kmer_size` matches). Already parsed `references`
+                  and a prebuilt `kmer_index` can be passed to skip loading them, e.g. when scoring many samples.
+                  `checkpoint` is a file to resume from and save progress to every `checkpoint_interval` reads.
+                  `sketch_top_k` only scores the alleles of every locus that rank in the top k by sketch containment,
+                  with sketches of `sketch_k`-mers sampled at one in `sketch_scaled`, or prebuilt `allele_sketches`.
     """
 
     def __init__(self, reads_fp: str, references_fp: str, **kwargs):
@@ -28,7 +58,111 @@ class ScoreMLST(GeneScore):
         """
         super().__init__(reads_fp, "", **kwargs)
         self.reads_fp = reads_fp
-        self.references = fetch_references(references_fp)
+        self.kmer_size = kwargs.get("kmer_size")
+        self.check_recall = kwargs.get("check_recall", False)
+        self.recall_min_score = kwargs.get("recall_min_score")
+        with self.metrics.stage("reference_load"):
+            self.references = kwargs.get("references") or fetch_references(references_fp)
+            self.kmer_index = kwargs.get("kmer_index")
+            if self.kmer_index is None and self.kmer_size:
+                self.kmer_index = KmerIndex(self.references, self.kmer_size)
+        if self.engine == "auto":
+            self.calibrate_engine([sequence for _, sequence in self.references])
+        self.checkpoint = kwargs.get("checkpoint")
+        self.checkpoint_interval = kwargs.get("checkpoint_interval", 10_000)
+        if self.checkpoint is not None and self.adaptive:
+            raise ValueError("Adaptive scoring stops at a point that depends on the reads, so it cannot be resumed.")
+        self.all_references = self.references
+        self.sketch_top_k = kwargs.get("sketch_top_k")
+        self.allele_sketches = {}
+        if self.sketch_top_k is not None:
+            if self.shard is not None or self.checkpoint is not None:
+                raise ValueError("The sketch candidates depend on all the reads, so they cannot be sharded or resumed.")
+            with self.metrics.stage("reference_load"):
+                self.allele_sketches = kwargs.get("allele_sketches") or sketch_references(
+                    self.references, kwargs.get("sketch_k", 21), kwargs.get("sketch_scaled", 1))
+            missing = [name for name, _ in self.references if name not in self.allele_sketches]
+            if missing:
+                raise ValueError(f"The allele sketches have no sketch of {', '.join(missing)}.")
+        self.routing_stats = {}
+        self.gene_adaptive_stats = {}
+        self.gene_accumulators = {}
+        self.checkpoint_stats = {}
+        self.sketch_rankings = {}
+
+    def route_reads(self, reads: Optional[Iterable[Tuple[str, str]]] = None) -> List[List[Tuple[str, str]]]:
+        """
+        Assigns every read to the loci it shares at least one k-mer with, in a single pass over the reads.
+
+        The number of reads seen is stored in `routing_stats["reads"]`.
+
+        Args:
+            reads (Optional[Iterable[Tuple[str, str]]]): The (name, sequence) pairs to route instead of every read in
+                                                         the reads file.
+
+        Returns:
+            List[List[Tuple[str, str]]]: For each reference, in order, the (name, sequence) pairs routed to it.
+        """
+        routed_reads = [[] for _ in self.references]
+        read_count = 0
+        for read_name, read_sequence in self.iter_reads() if reads is None else reads:
+            read_count += 1
+            with self.metrics.stage("routing"):
+                for reference_index in self.kmer_index.candidates(read_sequence):
+                    routed_reads[reference_index].append((read_name, read_sequence))
+        self.routing_stats = {"reads": read_count}
+        return routed_reads
+
+    def preselect_alleles(self) -> List[Tuple[str, str]]:
+        """
+        Sketches the reads in a single pass and keeps the `sketch_top_k` alleles of every locus whose k-mers are most
+        contained in them, see `top_candidates`.
+
+        The ranking of every locus is stored in `sketch_rankings`.
+
+        Returns:
+            List[Tuple[str, str]]: The (name, sequence) pairs of the kept alleles, in references file order.
+        """
+        first_sketch = next(iter(self.allele_sketches.values()))
+        read_sketch = Sketch(first_sketch.k, first_sketch.scaled)
+        read_sketch.add(read_sequence for _, read_sequence in self.iter_reads())
+        allele_sketches = {name: self.allele_sketches[name] for name, _ in self.all_references}
+        self.sketch_rankings = rank_alleles(allele_sketches, read_sketch)
+        kept = set(top_candidates(self.sketch_rankings, self.sketch_top_k))
+        return [(name, sequence) for name, sequence in self.all_references if name in kept]
+
+    def routing_recall(self, routed_reads: List[List[Tuple[str, str]]]) -> Dict[str, float]:
+        """
+        Measures, for each locus, the fraction of true hits found by the k-mer routing.
+
+        A read is a true hit for a locus when its exhaustive alignment score against it reaches `recall_min_score`.
+        Every read is aligned against every locus, so this is as slow as the exhaustive mode.
+
+        Args:
+            routed_reads (List[List[Tuple[str, str]]]): The output of `route_reads`.
+
+        Returns:
+            Dict[str, float]: The recall of each gene, 1.0 when the gene has no true hits.
+        """
+        min_score = self.recall_min_score
+        if min_score is None:
+            min_score = self.kmer_size * self.scoring_parameters[0]
+        batch_score_function = get_backend(self.engine).score_batch
+
+        recall = {}
+        for (gene_name, sequence), routed in zip(self.references, routed_reads):
+            routed_names = {read_name for read_name, _ in routed}
+            true_hits = found = 0
+            for batch in chunked(self.iter_reads(), self.batch_size):
+                results = batch_score_function(*self.scoring_parameters,
+                                               reads=[read_sequence for _, read_sequence in batch],
+                                               t=sequence)
+                for (read_name, _), (max_score, _) in zip(batch, results):
+                    if max_score >= min_score:
+                        true_hits += 1
+                        found += read_name in routed_names
+            recall[gene_name] = found / true_hits if true_hits else 1.0
+        return recall
 
     def score_mlst(self):
         """
@@ -37,14 +171,137 @@ class ScoreMLST(GeneScore):
         Iterates through each reference gene, sets it as the current reference in the superclass, and calculates
         the total score for that gene using the superclass's scoring mechanism.
 
+        When a k-mer index was built, the reads are first routed to their candidate loci and each gene is only
+        scored against the reads routed to it. The number of skipped alignments is recorded in `routing_stats`.
+
+        With `shard` set, only that shard of the reads is scored; the gene accumulators, kept in `gene_accumulators`,
+        can then be written with `save_partial` and combined with those of the other shards by `merge_partials`.
+
+        With `checkpoint` set, the run resumes from the checkpoint file when it exists and saves its progress there,
+        see `_score_mlst_checkpointed`.
+
+        With `sketch_top_k` set, the alleles are first narrowed down to the candidates of `preselect_alleles`, and only
+        those are scored and returned.
+
         Returns:
             List[Tuple[str, int]]: A list of tuples, where each tuple contains a gene name and its corresponding
                                    total score. The scores are computed based on alignments with the reads.
         """
+        if self.checkpoint is not None:
+            return self._score_mlst_checkpointed()
+
+        if self.sketch_top_k is not None:
+            with self.metrics.stage("sketching"):
+                self.references = self.preselect_alleles()
+                if self.kmer_index is not None:
+                    self.kmer_index = KmerIndex(self.references, self.kmer_index.k)
+
+        routed_reads = self.route_reads() if self.kmer_index is not None else None
+
         gene_scores = []
-        for gene_name, sequence in self.references:
+        self.gene_adaptive_stats = {}
+        self.gene_accumulators = {}
+        for reference_index, (gene_name, sequence) in enumerate(self.references):
             self.reference = sequence
-            gene_score = self.get_t_score()
+            gene_score = self.get_t_score(None if routed_reads is None else routed_reads[reference_index])
             gene_scores.append((gene_name, gene_score))
+            self.gene_accumulators[gene_name] = self.accumulator
+            if self.adaptive:
+                self.gene_adaptive_stats[gene_name] = self.adaptive_stats
+
+        if routed_reads is not None:
+            exhaustive_alignments = self.routing_stats["reads"] * len(self.references)
+            alignments = sum(len(routed) for routed in routed_reads)
+            self.routing_stats.update({
+                "exhaustive_alignments": exhaustive_alignments,
+                "alignments": alignments,
+                "skipped_alignments": exhaustive_alignments - alignments,
+            })
+            if self.check_recall:
+                self.routing_stats["recall"] = self.routing_recall(routed_reads)
 
         return gene_scores
+
+    def fingerprint(self) -> str:
+        """Returns the `scoring_fingerprint` of the references and the options that change their accumulators."""
+        kmer_size = self.kmer_index.k if self.kmer_index is not None else None
+        return scoring_fingerprint(self.references, self.scoring_parameters, kmer_size=kmer_size)
+
+    def save_partial(self, file_path: str):
+        """
+        Writes the gene accumulators of the last `score_mlst` run to a partial result file, see `save_partial`.
+
+        The file records the fingerprint of the references and options and the shard that was scored (1/1 when the
+        run was not sharded), so that `merge_partials` only combines shards of the same sample and settings.
+        """
+        index, count = self.shard or (1, 1)
+        save_partial(file_path, self.gene_accumulators, {
+            "fingerprint": self.fingerprint(),
+            "reads": self.reads_fp,
+            "shard": index,
+            "shard_count": count,
+        })
+
+    def _score_mlst_checkpointed(self) -> List[Tuple[str, int]]:
+        """
+        Scores the reads not covered by the checkpoint yet and adds them to its gene accumulators.
+
+        The checkpoint is a partial result file (see `save_partial`) that also records how many reads it covers and
+        the name of the last of them. When it exists, those reads are skipped without being aligned, after checking
+        that the reads file still starts with them, so rerunning on a file that has grown since only aligns the new
+        reads. The remaining reads are then scored `checkpoint_interval` at a time against every gene, and the
+        checkpoint is replaced after each of these segments, so a run that crashes resumes from the last one.
+
+        Returns:
+            List[Tuple[str, int]]: The gene name and total score of every gene, over all the reads.
+
+        Raises:
+            ValueError: If the checkpoint comes from other references, options or shard, or from another reads file.
+        """
+        fingerprint = self.fingerprint()
+        shard, shard_count = self.shard or (1, 1)
+        self.gene_accumulators = {gene_name: ScoreAccumulator(len(sequence)) for gene_name, sequence in self.references}
+        consumed, last_read = 0, None
+        if os.path.exists(self.checkpoint):
+            metadata, self.gene_accumulators = load_partial(self.checkpoint)
+            if (metadata["fingerprint"], metadata["shard"], metadata["shard_count"]) != (fingerprint, shard,
+                                                                                         shard_count):
+                raise ValueError(f"The checkpoint {self.checkpoint} comes from a run with other references, "
+                                 f"parameters or shard.")
+            consumed, last_read = metadata["reads_consumed"], metadata["last_read"]
+
+        reads = self.iter_reads()
+        skipped_count, skipped = 0, None
+        for skipped, _ in islice(reads, consumed):
+            skipped_count += 1
+        if (skipped_count, skipped) != (consumed, last_read):
+            raise ValueError(f"The reads file {self.reads_fp} does not start with the {consumed} reads of the "
+                             f"checkpoint {self.checkpoint}.")
+        self.checkpoint_stats = {"resumed_reads": consumed, "new_reads": 0}
+
+        for segment in chunked(reads, self.checkpoint_interval):
+            routed_reads = self.route_reads(segment) if self.kmer_index is not None else None
+            for reference_index, (gene_name, sequence) in enumerate(self.references):
+                self.reference = sequence
+                self.get_scores(segment if routed_reads is None else routed_reads[reference_index])
+                self.gene_accumulators[gene_name].merge(self.accumulator)
+            consumed += len(segment)
+            last_read = segment[-1][0]
+            self.checkpoint_stats["new_reads"] += len(segment)
+            self._save_checkpoint(fingerprint, consumed, last_read)
+        if not os.path.exists(self.checkpoint):
+            self._save_checkpoint(fingerprint, consumed, last_read)
+
+        return final_scores(self.gene_accumulators)
+
+    def _save_checkpoint(self, fingerprint: str, consumed: int, last_read: Optional[str]):
+        """Replaces the checkpoint file with the current gene accumulators and the reads they cover."""
+        shard, shard_count = self.shard or (1, 1)
+        save_partial(self.checkpoint, self.gene_accumulators, {
+            "fingerprint": fingerprint,
+            "reads": self.reads_fp,
+            "shard": shard,
+            "shard_count": shard_count,
+            "reads_consumed": consumed,
+            "last_read": last_read,
+        })
@@ -0,0 +1,149 @@
+"""partial.py"""
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from mlst_aligner.scoring import ScoreAccumulator
+from mlst_aligner.utils import save_npz
+
+PARTIAL_VERSION = 1
+
+
+def scoring_fingerprint(references: List[Tuple[str, str]], scoring_parameters: Tuple[int, int, int],
+                        **options) -> str:
+    """
+    Hashes the references together with everything that changes the per-position accumulators of a gene.
+
+    Args:
+        references (List[Tuple[str, str]]): The (gene name, sequence) pairs that were scored.
+        scoring_parameters (Tuple[int, int, int]): The match, mismatch and indel scores.
+        **options: The other options that change the scores, e.g. `kmer_size`.
+
+    Returns:
+        str: The hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    for gene_name, sequence in references:
+        digest.update(f"{gene_name}\t{sequence}\n".encode())
+    digest.update(json.dumps([list(scoring_parameters), sorted(options.items())]).encode())
+    return digest.hexdigest()
+
+
+def save_partial(file_path: str, gene_accumulators: Dict[str, ScoreAccumulator], metadata: Dict):
+    """
+    Writes the per-gene accumulators of a run, with its metadata, to a compressed .npz file with `save_npz`.
+
+    Args:
+        file_path (str): The file to write.
+        gene_accumulators (Dict[str, ScoreAccumulator]): The accumulator of every gene, in reference order.
+        metadata (Dict): JSON-serializable metadata, e.g. the fingerprint and shard of the run.
+    """
+    arrays = {}
+    for index, accumulator in enumerate(gene_accumulators.values()):
+        arrays[f"weighted_scores_{index}"] = accumulator.weighted_scores
+        arrays[f"weights_{index}"] = accumulator.weights
+    metadata = {"version": PARTIAL_VERSION, **metadata, "genes": list(gene_accumulators)}
+    save_npz(file_path, metadata, arrays)
+
+
+def load_partial(file_path: str) -> Tuple[Dict, Dict[str, ScoreAccumulator]]:
+    """
+    Reads a file written by `save_partial`.
+
+    Returns:
+        metadata (Dict): The metadata of the run, with the list of `genes`.
+        gene_accumulators (Dict[str, ScoreAccumulator]): The accumulator of every gene, in reference order.
+
+    Raises:
+        ValueError: If the file was written by an incompatible version.
+    """
+    with np.load(file_path) as arrays:
+        metadata = json.loads(str(arrays["metadata"]))
+        if metadata.get("version") != PARTIAL_VERSION:
+            raise ValueError(f"The partial result {file_path} has version {metadata.get('version')}, "
+                             f"expected {PARTIAL_VERSION}.")
+        gene_accumulators = {}
+        for index, gene_name in enumerate(metadata["genes"]):
+            accumulator = ScoreAccumulator(len(arrays[f"weights_{index}"]) - 1)
+            accumulator.weighted_scores[:] = arrays[f"weighted_scores_{index}"]
+            accumulator.weights[:] = arrays[f"weights_{index}"]
+            gene_accumulators[gene_name] = accumulator
+    return metadata, gene_accumulators
+
+
+def merge_partials(file_paths: Iterable[str]) -> Tuple[Dict, Dict[str, ScoreAccumulator]]:
+    """
+    Adds up the per-gene accumulators of the partial results of the shards of one sample.
+
+    Since the accumulators hold exact integer sums, merging every shard gives exactly the accumulators, and so the
+    scores, of a single run over all the reads.
+
+    Args:
+        file_paths (Iterable[str]): The partial result files, in any order.
+
+    Returns:
+        metadata (Dict): The metadata of the first file, with `shard` replaced by `shards`, the sorted shards merged, and
+                         `missing_shards` listing the shards of the sample that were not given.
+        gene_accumulators (Dict[str, ScoreAccumulator]): The merged accumulator of every gene, in reference order.
+
+    Raises:
+        ValueError: If no file is given, the files come from runs with different references, parameters or shard
+                    counts, or a shard is given twice.
+    """
+    merged_metadata, merged = None, None
+    shards = []
+    for file_path in file_paths:
+        metadata, gene_accumulators = load_partial(file_path)
+        if merged is None:
+            merged_metadata, merged = metadata, gene_accumulators
+        elif (metadata["fingerprint"], metadata["shard_count"]) != (merged_metadata["fingerprint"],
+                                                                    merged_metadata["shard_count"]):
+            raise ValueError(f"The partial result {file_path} comes from a run with other references, parameters or "
+                             f"shard count.")
+        else:
+            for gene_name, accumulator in gene_accumulators.items():
+                merged[gene_name].merge(accumulator)
+        if metadata["shard"] in shards:
+            raise ValueError(f"Shard {metadata['shard']}/{metadata['shard_count']} is given more than once.")
+        shards.append(metadata["shard"])
+
+    if merged is None:
+        raise ValueError("No partial results to merge.")
+    merged_metadata = {
+        **merged_metadata,
+        "shards": sorted(shards),
+        "missing_shards": sorted(set(range(1, merged_metadata["shard_count"] + 1)) - set(shards)),
+    }
+    del merged_metadata["shard"]
+    return merged_metadata, merged
+
+
+def final_scores(gene_accumulators: Dict[str, ScoreAccumulator]) -> List[Tuple[str, int]]:
+    """
+    Computes the score of every gene from its accumulator, exactly like `GeneScore.get_t_score`.
+
+    Returns:
+        List[Tuple[str, int]]: The gene name and total score of every gene, in reference order.
+    """
+    return [(gene_name, accumulator.total_score() // (len(accumulator.weights) - 1))
+            for gene_name, accumulator in gene_accumulators.items()]
+
+
+def parse_shard(shard: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Parses a shard given as "i/N", the i-th of N shards counting from 1.
+
+    Raises:
+        ValueError: If the shard is malformed or out of range.
+    """
+    if shard is None:
+        return None
+    try:
+        index, count = (int(part) for part in shard.split("/"))
+    except ValueError:
+        raise ValueError(f"The shard {shard} must be given as i/N, e.g. 1/4.") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"The shard {shard} must satisfy 1 <= i <= N.")
+    return index, count
@@ -1,11 +1,21 @@
 """scoring.py"""
 from tqdm import tqdm
-import time
-from typing import List, Dict
+import math
+import random
+import statistics
+from collections import Counter, deque
+from itertools import islice
+from typing import Callable, List, Dict, Iterable, Iterator, Optional, Tuple
 
-from mlst_aligner.aligner import positional_alignment
-from mlst_aligner.utils import read_fasta, weighted_average
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+
+from mlst_aligner.aligner import reference_profile
+from mlst_aligner.backends import get_backend, select_backend
+from mlst_aligner.cache import AlignmentCache
+from mlst_aligner.metrics import NULL_METRICS
+from mlst_aligner.store import is_read_store, open_store
+from mlst_aligner.utils import stream_reads, validate_reads_path
+from concurrent.futures import ProcessPoolExecutor
 
 
 def merge_scores(scores_at_positions_list: List[Dict[int, int]]) -> Dict[int, List[int]]:
@@ -32,68 +42,561 @@ def merge_scores(scores_at_positions_list: List[Dict[int, int]]) -> Dict[int, Li
     return merged_scores
 
 
+class ScoreAccumulator:
+    """
+    Constant-memory running aggregate of scores at positions, indexed by reference position.
+
+    For every position it keeps sum(score * length) and sum(length) over all alignments folded in so far, which is
+    all `weighted_average` needs. Memory is bounded by the reference length instead of growing with the number of
+    reads, and accumulators of separate runs or read chunks can be merged exactly.
+
+    Attributes:
+        weighted_scores (np.ndarray): sum(score * length) per reference position, index 0 unused.
+        weights (np.ndarray): sum(length) per reference position, index 0 unused.
+
+    Args:
+        reference_length (int): The length of the reference sequence.
+    """
+
+    def __init__(self, reference_length: int):
+        """
+        Initializes ScoreAccumulator
+        """
+        self.weighted_scores = np.zeros(reference_length + 1, dtype=np.int64)
+        self.weights = np.zeros(reference_length + 1, dtype=np.int64)
+
+    def add(self, scores_at_positions: Dict[int, Tuple[int, int]], multiplicity: int = 1):
+        """
+        Folds the scores at positions of one alignment into the accumulator.
+
+        Args:
+            scores_at_positions (Dict[int, Tuple[int, int]]): Maps positions to (score, alignment length) tuples.
+            multiplicity (int): The number of identical alignments this result stands for.
+        """
+        if not scores_at_positions:
+            return
+        positions = np.fromiter(scores_at_positions.keys(), dtype=np.int64, count=len(scores_at_positions))
+        scores, lengths = np.array(list(scores_at_positions.values()), dtype=np.int64).T
+        self.weighted_scores[positions] += scores * lengths * multiplicity
+        self.weights[positions] += lengths * multiplicity
+
+    def merge(self, other: "ScoreAccumulator") -> "ScoreAccumulator":
+        """
+        Adds the sums of another accumulator over the same reference into this one.
+
+        Args:
+            other (ScoreAccumulator): The accumulator to merge in.
+
+        Returns:
+            ScoreAccumulator: This accumulator, for chaining.
+        """
+        self.weighted_scores += other.weighted_scores
+        self.weights += other.weights
+        return self
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, ScoreAccumulator) and np.array_equal(self.weighted_scores, other.weighted_scores)
+                and np.array_equal(self.weights, other.weights))
+
+    def total_score(self) -> float:
+        """
+        Sums the weighted average score of every position, i.e. `get_t_score` before the division by the reference
+        length.
+
+        Returns:
+            float: The summed weighted averages, or 0 when no alignment has been folded in.
+        """
+        covered = self.weights > 0
+        if not covered.any():
+            return 0
+        return math.fsum((self.weighted_scores[covered] / self.weights[covered]).tolist())
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Splits an iterable into consecutive lists of at most `size` items."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def shuffled(iterable: Iterable, buffer_size: int, rng: random.Random) -> Iterator:
+    """
+    Lazily shuffles an iterable through a buffer of `buffer_size` items, so memory stays bounded on large read files.
+
+    Every item is swapped into a random slot of the buffer and the item it replaces is yielded; the buffer is shuffled
+    and emptied at the end. The order is a full shuffle whenever the iterable fits in the buffer.
+    """
+    buffer = []
+    for item in iterable:
+        if len(buffer) < buffer_size:
+            buffer.append(item)
+            continue
+        index = rng.randrange(buffer_size)
+        yield buffer[index]
+        buffer[index] = item
+    rng.shuffle(buffer)
+    yield from buffer
+
+
+def align_reads(scoring_parameters: Tuple[int, int, int],
+                engine: str,
+                reference: str,
+                reads: List[str],
+                batch_size: int = 64) -> List[Dict[int, Tuple[int, int]]]:
+    """
+    Aligns reads against a reference and returns the scores at positions of each read.
+
+    The reference is preprocessed once per process (see `reference_profile`) and the reads are handed to the batch
+    alignment kernel of the engine `batch_size` at a time.
+
+    Args:
+        scoring_parameters (Tuple[int, int, int]): The match, mismatch and indel scores.
+        engine (str): The name of the registered alignment backend to use, see `get_backend`.
+        reference (str): The reference sequence.
+        reads (List[str]): The read sequences.
+        batch_size (int): The number of reads aligned together by the batch kernel.
+
+    Returns:
+        List[Dict[int, Tuple[int, int]]]: The scores at positions of each read, in order.
+    """
+    profile = reference_profile(*scoring_parameters, reference)
+    batch_score_function = get_backend(engine).score_batch
+    scores = []
+    for batch in chunked(reads, batch_size):
+        results = batch_score_function(*scoring_parameters, reads=batch, t=reference, profile=profile)
+        scores.extend(scores_at_positions for _, scores_at_positions in results)
+    return scores
+
+
+def score_chunk(scoring_parameters: Tuple[int, int, int],
+                engine: str,
+                reference: str,
+                reads: List[str],
+                batch_size: int = 64,
+                multiplicities: Optional[List[int]] = None) -> ScoreAccumulator:
+    """
+    Aligns a chunk of reads against a reference and folds their scores at positions into an accumulator.
+
+    This is the unit of work sent to worker processes, so that each worker returns one accumulator per chunk instead
+    of one dictionary per read. See `align_reads` for the alignment options.
+
+    Args:
+        scoring_parameters (Tuple[int, int, int]): The match, mismatch and indel scores.
+        engine (str): The name of the registered alignment backend to use, see `get_backend`.
+        reference (str): The reference sequence.
+        reads (List[str]): The read sequences of the chunk.
+        batch_size (int): The number of reads aligned together by the batch kernel.
+        multiplicities (Optional[List[int]]): The number of times each read occurs, when identical reads were
+                                              collapsed. Each result is weighted accordingly.
+
+    Returns:
+        ScoreAccumulator: The accumulated scores at positions of the chunk.
+    """
+    if multiplicities is None:
+        multiplicities = [1] * len(reads)
+    accumulator = ScoreAccumulator(len(reference))
+    scores = align_reads(scoring_parameters, engine, reference, reads, batch_size)
+    for scores_at_positions, multiplicity in zip(scores, multiplicities):
+        accumulator.add(scores_at_positions, multiplicity)
+    return accumulator
+
+
+def score_store_range(scoring_parameters: Tuple[int, int, int],
+                      engine: str,
+                      reference: str,
+                      store_path: str,
+                      start: int,
+                      stop: int,
+                      batch_size: int = 64) -> ScoreAccumulator:
+    """
+    Decodes the reads `start` to `stop` of a read store in this process and scores them like `score_chunk`.
+
+    Only the store path and the range are sent to worker processes; each worker maps the store once and reads its
+    ranges from the shared page cache.
+    """
+    reads = open_store(store_path).sequences(start, stop)
+    return score_chunk(scoring_parameters, engine, reference, reads, batch_size)
+
+
 class GeneScore:
     """docstring to come soonTM
     """
 
     def __init__(self, read_fp: str, reference: str, **kwargs):
         """GeneScore Initialization"""
-        self.reads = read_fasta(read_fp)
-        self.reference = reference
+        if is_read_store(read_fp):
+            self.store = open_store(read_fp)
+        else:
+            validate_reads_path(read_fp)
+            self.store = None
+        self.read_fp = read_fp
         self.scoring_parameters = (kwargs.get("match", 2), kwargs.get("mismatch", -2), kwargs.get("indel", -1))
-        self.scoring_dict = None
+        self.reference = reference
+        self.engine = kwargs.get("engine", "numpy")
+        if self.engine != "auto":
+            get_backend(self.engine)
+        self.engine_timings = {}
+        self.calibration_reads = kwargs.get("calibration_reads", 32)
+        self.workers = kwargs.get("workers", 1)
+        self.chunk_size = kwargs.get("chunk_size", 256)
+        self.batch_size = kwargs.get("batch_size", 64)
+        self.dedup = kwargs.get("dedup", False)
+        self.dedup_stats = {}
+        cache_dir = kwargs.get("cache_dir")
+        self.cache = AlignmentCache(cache_dir, kwargs.get("cache_size", 1_000_000)) if cache_dir else None
+        self.keep_alignments = kwargs.get("alignments", False)
+        self.metrics = kwargs.get("metrics") or NULL_METRICS
+        self.adaptive = kwargs.get("adaptive", False)
+        self.adaptive_batch_size = kwargs.get("adaptive_batch_size", 500)
+        self.tolerance = kwargs.get("tolerance", 0.01)
+        self.patience = kwargs.get("patience", 3)
+        self.max_error = kwargs.get("max_error")
+        self.seed = kwargs.get("seed", 0)
+        self.shuffle_buffer = kwargs.get("shuffle_buffer", 100_000)
+        self.shard = kwargs.get("shard")
+        if self.shard is not None:
+            if not 1 <= self.shard[0] <= self.shard[1]:
+                raise ValueError(f"Shard {self.shard[0]}/{self.shard[1]} must satisfy 1 <= i <= N.")
+            if self.adaptive:
+                raise ValueError("Adaptive scoring stops at a point that depends on the reads, so it cannot be sharded.")
+        self.adaptive_stats = {}
+        self.alignments = []
+        self.accumulator = None
+        if self.engine == "auto" and reference:
+            self.calibrate_engine([reference])
+
+    @property
+    def reference(self) -> str:
+        """The reference sequence scored against, e.g. each locus in turn in `ScoreMLST.score_mlst`."""
+        return self._reference
+
+    @reference.setter
+    def reference(self, reference: str):
+        """Sets the reference sequence and builds its `ReferenceProfile`, kept in `profile`."""
+        self._reference = reference
+        self.profile = reference_profile(*self.scoring_parameters, reference)
+
+    @property
+    def alignment_function(self) -> Callable:
+        """The traceback alignment engine of the backend `engine`, used when `alignments` is set."""
+        return get_backend(self.engine).align
 
-    def get_scores(self):
+    def calibrate_engine(self, references: List[str]):
+        """
+        Replaces the `auto` engine with the backend that aligns the first `calibration_reads` reads against the given
+        references fastest, see `select_backend`. The time each backend took is stored in `engine_timings`.
+        """
+        reads = [sequence for _, sequence in islice(self.iter_reads(), self.calibration_reads)]
+        with self.metrics.stage("calibration"):
+            self.engine, self.engine_timings = select_backend(self.scoring_parameters, reads, references)
+
+    def iter_reads(self) -> Iterator[Tuple[str, str]]:
+        """
+        Lazily yields the name and sequence of every read in the FASTA/FASTQ (optionally gzipped) reads file, or in
+        the read store when `read_fp` is a store directory written by `encode_reads`.
+
+        With `shard` set to (i, N), only every N-th read starting from the i-th is yielded, so that the N shards of a
+        sample split its reads deterministically.
+        """
+        reads = self.store.iter_reads() if self.store is not None else stream_reads(self.read_fp)
+        if self.shard is not None:
+            index, count = self.shard
+            reads = islice(reads, index - 1, None, count)
+        yield from self.metrics.timed(reads, "read_io")
+
+    def get_scores(self, reads: Optional[List[Tuple[str, str]]] = None):
         """
         Fetches each read from the FASTA file, performs local sequence alignment against a reference sequence,
-        and merges the scores at each position into a single dictionary.
+        and accumulates the scores at each position of the reference.
 
-        This method iterates over each read in the FASTA file specified by the read file path provided during
+        This method streams each read from the FASTA/FASTQ file specified by the read file path provided during
         object initialization. It performs local sequence alignment of each read against the reference sequence
-        using the scoring parameters. The scores at each position from these alignments are then aggregated across 
-        all reads to generate a scoring dictionary for the aligned segments of the reference. The resulting merged 
-        scores dictionary combines all scores on the position to which they were aligned.
+        using the scoring parameters. The scores at each position from these alignments are folded into a
+        `ScoreAccumulator` as they arrive, so memory stays bounded by the reference length however many reads
+        there are.
+
+        Only the positional scores are computed by default, in memory linear in the reference length. When the object
+        was created with `alignments=True`, the full traceback is run instead and the aligned strings are kept.
+
+        Reads are aligned `batch_size` at a time by the batch kernel of the engine. With `workers` greater than one,
+        reads are sent in chunks of `chunk_size` to a process pool. Each worker returns the accumulator of its chunk
+        and the chunk accumulators are merged exactly, so the result matches the serial path.
+
+        With `dedup` set, identical read sequences are collapsed first: each unique sequence is aligned once and its
+        result is weighted by the number of times it occurs, which gives the same total score. The read count,
+        unique count, unique fraction and number of alignments saved are stored in `dedup_stats`. Collapsing is
+        skipped when aligned strings are requested, since those are kept per read.
+
+        With `adaptive` set, reads are shuffled (with `seed`, through a buffer of `shuffle_buffer` reads) and scored
+        `adaptive_batch_size` at a time, and scoring stops early once the score estimate has moved by at most
+        `tolerance` (relative) for `patience` consecutive batches, or once its standard error relative to the
+        estimate is at most `max_error`. The reads used and the estimated error are stored in `adaptive_stats`.
+
+        When `read_fp` is a read store, the parallel path sends each worker only a range of read indices, which it
+        decodes from its own memory map of the store, unless `dedup` or the cache need the sequences in this process.
+
+        With `cache_dir` set, alignment results are looked up in a persistent `AlignmentCache` keyed by read,
+        reference and scoring parameters, and only the misses are aligned and stored.
+
+        When the object was created with a `Metrics` instance as `metrics`, the time spent reading, aligning and
+        merging is recorded in its stages, along with counts of reads, alignments, DP cells and cache hits.
+
+        Args:
+            reads (Optional[List[Tuple[str, str]]]): The (name, sequence) pairs to align instead of every read in the
+                                                     FASTA file, e.g. the reads routed to this reference.
 
         Attributes:
-            scores (Dict[int, List[int]]): A dictionary where each key is a position in the reference sequence,
-                                            and each value is a list of scores for that position from all reads'
-                                            alignments. This dictionary provides a comprehensive overview of how
-                                            each position in the reference sequence aligns with the reads.
+            accumulator (ScoreAccumulator): The per-position sums of score * alignment length and alignment length
+                                            over all reads' alignments.
+            alignments (List[Tuple[str, int, str, str]]): The read name, alignment score, aligned read and aligned
+                                                          reference of every read, only filled when `alignments=True`.
+        """
+        self.alignments = []
+        total = None if reads is None else len(reads)
+        reads = self.iter_reads() if reads is None else iter(reads)
+
+        if self.keep_alignments:
+            self.accumulator = self._get_alignments(reads, total)
+        elif self.adaptive:
+            self.accumulator = self._get_scores_adaptive(reads)
+        elif (self.workers > 1 and total is None and self.store is not None and self.shard is None and not self.dedup
+              and self.cache is None):
+            self.accumulator = self._get_scores_store_parallel()
+        else:
+            sequences = ((read_sequence, 1) for _, read_sequence in reads)
+            if self.dedup:
+                sequences = self._collapse_reads(reads)
+                total = len(sequences)
+            if self.workers > 1:
+                self.accumulator = self._get_scores_parallel(sequences, total)
+            else:
+                self.accumulator = self._get_scores_serial(sequences, total)
+
+    def _get_scores_adaptive(self, reads: Iterator[Tuple[str, str]]) -> ScoreAccumulator:
         """
-        start_time = time.time()
-        score_dicts = []
+        Scores shuffled batches of reads until the score estimate converges and records the `adaptive_stats`.
+
+        The estimate after each batch is the score of all reads so far, before rounding down. Its standard error is
+        the standard deviation of the scores of the individual batches divided by the square root of their number.
+        """
+        accumulator = ScoreAccumulator(len(self.reference))
+        estimates, batch_estimates = [], []
+        reads_used = stable_batches = 0
+        standard_error = math.inf
+        converged = False
+        for batch in chunked(shuffled(reads, self.shuffle_buffer, random.Random(self.seed)), self.adaptive_batch_size):
+            if self.dedup:
+                sequences = list(Counter(read_sequence for _, read_sequence in batch).items())
+            else:
+                sequences = [(read_sequence, 1) for _, read_sequence in batch]
+            if self.workers > 1:
+                batch_accumulator = self._get_scores_parallel(sequences, len(sequences))
+            else:
+                batch_accumulator = self._get_scores_serial(sequences, len(sequences))
+            batch_estimates.append(batch_accumulator.total_score() / len(self.reference))
+            with self.metrics.stage("merge"):
+                accumulator.merge(batch_accumulator)
+            reads_used += len(batch)
+            estimates.append(accumulator.total_score() / len(self.reference))
+
+            if len(estimates) < 2:
+                continue
+            change = abs(estimates[-1] - estimates[-2])
+            stable_batches = stable_batches + 1 if change <= self.tolerance * abs(estimates[-1]) else 0
+            standard_error = statistics.stdev(batch_estimates) / math.sqrt(len(batch_estimates))
+            if stable_batches >= self.patience or (self.max_error is not None
+                                                   and standard_error <= self.max_error * abs(estimates[-1])):
+                converged = True
+                break
+
+        self.adaptive_stats = {
+            "reads": reads_used,
+            "batches": len(estimates),
+            "converged": converged,
+            "estimate": estimates[-1] if estimates else 0.0,
+            "standard_error": standard_error,
+        }
+        return accumulator
+
+    def _collapse_reads(self, reads: Iterator[Tuple[str, str]]) -> List[Tuple[str, int]]:
+        """
+        Counts identical read sequences and records the deduplication statistics.
+
+        Returns:
+            List[Tuple[str, int]]: Every unique sequence with its multiplicity, in order of first occurrence.
+        """
+        counts = Counter(read_sequence for _, read_sequence in reads)
+        read_count = sum(counts.values())
+        self.dedup_stats = {
+            "reads": read_count,
+            "unique_reads": len(counts),
+            "unique_fraction": len(counts) / read_count if read_count else 1.0,
+            "alignments_saved": read_count - len(counts),
+        }
+        return list(counts.items())
+
+    def _get_scores_serial(self, sequences: Iterable[Tuple[str, int]], total: Optional[int]) -> ScoreAccumulator:
+        """Aligns (sequence, multiplicity) pairs in batches in this process and returns their accumulated scores."""
+        accumulator = ScoreAccumulator(len(self.reference))
 
         # Use tqdm to show progress bar
-        for read_name in tqdm(self.reads.references, desc="Aligning reads"):
-            read_sequence = self.reads.fetch(read_name)
-            alignment_score, aligned_read, aligned_reference, scores_at_positions = positional_alignment(
-                *self.scoring_parameters, s=read_sequence, t=self.reference)
-            score_dicts.append(scores_at_positions)
+        with tqdm(total=total, desc="Aligning reads") as progress:
+            for batch in chunked(sequences, self.batch_size):
+                batch_sequences, multiplicities = map(list, zip(*batch))
+                with self.metrics.stage("alignment"):
+                    batch_accumulator = self._process_chunk(batch_sequences, multiplicities)()
+                with self.metrics.stage("merge"):
+                    accumulator.merge(batch_accumulator)
+                progress.update(len(batch))
+
+        return accumulator
 
-        self.scoring_dict = merge_scores(score_dicts)
-        end_time = time.time()
-        print(f"Completed in {end_time - start_time:.2f} seconds.")
+    def _process_chunk(self,
+                       sequences: List[str],
+                       multiplicities: List[int],
+                       executor: Optional[ProcessPoolExecutor] = None) -> Callable[[], ScoreAccumulator]:
+        """
+        Starts scoring a chunk of reads, in this process or on `executor`, going through the cache if there is one.
 
-    def get_t_score(self) -> int:
+        Returns:
+            Callable[[], ScoreAccumulator]: Waits for the chunk to finish, stores any new alignment results in the
+                                            cache and returns the accumulated scores of the chunk.
         """
-        Calculates the total score from the aggregated scoring dictionary.
+        self.metrics.count("reads", sum(multiplicities))
+        if self.cache is None:
+            self._count_alignments(sequences)
+            arguments = (self.scoring_parameters, self.engine, self.reference, sequences, self.batch_size,
+                         multiplicities)
+            if executor is None:
+                accumulator = score_chunk(*arguments)
+                return lambda: accumulator
+            return executor.submit(score_chunk, *arguments).result
+
+        scope = AlignmentCache.scope(self.reference, self.scoring_parameters)
+        keys = [AlignmentCache.key(scope, sequence) for sequence in sequences]
+        results = self.cache.get_many(keys)
+        missing = [index for index, key in enumerate(keys) if key not in results]
+        self.metrics.count("cache_hits", len(keys) - len(missing))
+        self._count_alignments([sequences[index] for index in missing])
+        arguments = (self.scoring_parameters, self.engine, self.reference, [sequences[index] for index in missing],
+                     self.batch_size)
+        if executor is None:
+            computed = align_reads(*arguments)
+            wait = lambda: computed
+        else:
+            wait = executor.submit(align_reads, *arguments).result
+
+        def resolve() -> ScoreAccumulator:
+            new_results = [(keys[index], scores_at_positions) for index, scores_at_positions in zip(missing, wait())]
+            self.cache.put_many(new_results)
+            results.update(new_results)
+            accumulator = ScoreAccumulator(len(self.reference))
+            for key, multiplicity in zip(keys, multiplicities):
+                accumulator.add(results[key], multiplicity)
+            return accumulator
+
+        return resolve
+
+    def _count_alignments(self, sequences: List[str]):
+        """Counts the alignments and DP cells needed to align the given sequences against the reference."""
+        self.metrics.count("alignments", len(sequences))
+        self.metrics.count("dp_cells", sum(len(sequence) for sequence in sequences) * len(self.reference))
+
+    def _get_alignments(self, reads: Iterator[Tuple[str, str]], total: Optional[int]) -> ScoreAccumulator:
+        """Runs the full traceback for every read, keeping the aligned strings, and returns the accumulated scores."""
+        accumulator = ScoreAccumulator(len(self.reference))
+
+        # Use tqdm to show progress bar
+        for read_name, read_sequence in tqdm(reads, total=total, desc="Aligning reads"):
+            self.metrics.count("reads")
+            self._count_alignments([read_sequence])
+            with self.metrics.stage("alignment"):
+                alignment_score, aligned_read, aligned_reference, scores_at_positions = self.alignment_function(
+                    *self.scoring_parameters, s=read_sequence, t=self.reference, profile=self.profile)
+            self.alignments.append((read_name, alignment_score, aligned_read, aligned_reference))
+            with self.metrics.stage("merge"):
+                accumulator.add(scores_at_positions)
+
+        return accumulator
+
+    def _get_scores_parallel(self, sequences: Iterable[Tuple[str, int]], total: Optional[int]) -> ScoreAccumulator:
+        """
+        Aligns chunks of (sequence, multiplicity) pairs on a process pool and merges the chunk accumulators in
+        submission order.
+
+        At most two chunks per worker are in flight at any time, so reads are fetched from the FASTA file only as
+        fast as the pool consumes them.
+        """
+        accumulator = ScoreAccumulator(len(self.reference))
+        with ProcessPoolExecutor(max_workers=self.workers) as executor, \
+                tqdm(total=total, desc="Aligning reads") as progress:
+            pending = deque()
+            for chunk in chunked(sequences, self.chunk_size):
+                chunk_sequences, multiplicities = map(list, zip(*chunk))
+                pending.append((len(chunk), self._process_chunk(chunk_sequences, multiplicities, executor)))
+                if len(pending) >= 2 * self.workers:
+                    self._merge_next(accumulator, pending, progress)
+            while pending:
+                self._merge_next(accumulator, pending, progress)
+
+        return accumulator
+
+    def _get_scores_store_parallel(self) -> ScoreAccumulator:
+        """
+        Scores ranges of `chunk_size` reads of the read store on a process pool and merges the range accumulators in
+        submission order, like `_get_scores_parallel`.
+        """
+        accumulator = ScoreAccumulator(len(self.reference))
+        with ProcessPoolExecutor(max_workers=self.workers) as executor, \
+                tqdm(total=len(self.store), desc="Aligning reads") as progress:
+            pending = deque()
+            for start in range(0, len(self.store), self.chunk_size):
+                stop = min(start + self.chunk_size, len(self.store))
+                read_length = int(self.store.lengths(start, stop).sum())
+                self.metrics.count("reads", stop - start)
+                self.metrics.count("alignments", stop - start)
+                self.metrics.count("dp_cells", read_length * len(self.reference))
+                future = executor.submit(score_store_range, self.scoring_parameters, self.engine, self.reference,
+                                         self.store.path, start, stop, self.batch_size)
+                pending.append((stop - start, future.result))
+                if len(pending) >= 2 * self.workers:
+                    self._merge_next(accumulator, pending, progress)
+            while pending:
+                self._merge_next(accumulator, pending, progress)
+
+        return accumulator
+
+    def _merge_next(self, accumulator: ScoreAccumulator, pending: deque, progress: tqdm):
+        """Waits for the oldest pending chunk and merges its accumulator."""
+        chunk_length, resolve = pending.popleft()
+        with self.metrics.stage("alignment"):
+            chunk_accumulator = resolve()
+        with self.metrics.stage("merge"):
+            accumulator.merge(chunk_accumulator)
+        progress.update(chunk_length)
+
+    def get_t_score(self, reads: Optional[List[Tuple[str, str]]] = None) -> int:
+        """
+        Calculates the total score from the accumulated scores at positions.
 
         This method first ensures that scores are fetched and aggregated by calling `get_scores()`.
-        It then computes the total score by summing all the scores for every position in the reference
+        It then computes the total score by summing the weighted average score of every position in the reference
         sequence from all reads' alignments. The total score represents an overall measure of alignment
         quality or coverage across the entire set of reads and the reference sequence.
 
+        Args:
+            reads (Optional[List[Tuple[str, str]]]): The (name, sequence) pairs to score instead of every read in the
+                                                     FASTA file.
+
         Returns:
             int: The total score representing the sum of all alignment scores across all positions and reads.
         """
         if self.get_scores is not None:
             try:
-                self.get_scores()
+                self.get_scores(reads)
             except Exception as e:
                 print(f"Error encountered in get_scores: {e}")
                 return 0
-        final_score = 0
-        for value in self.scoring_dict.values():
-            final_score += weighted_average(value)
-        final_score = final_score // len(self.reference)
+        with self.metrics.stage("final_scoring"):
+            final_score = self.accumulator.total_score() // len(self.reference)
         return final_score
@@ -0,0 +1,174 @@
+"""server.py"""
+import asyncio
+import json
+import os
+import socket
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from mlst_aligner.batch import init_worker, score_sample
+from mlst_aligner.index import KmerIndex
+from mlst_aligner.utils import fetch_references
+
+DEFAULT_SOCKET = "/tmp/mlst_aligner.sock"
+
+
+class ScoringServer:
+    """
+    A long-lived scoring daemon that keeps the MLST references, and their k-mer index, loaded between jobs.
+
+    Clients connect to a Unix socket and send one JSON object per line; every request gets one JSON line back:
+
+    - `{"reads": PATH, "sample": NAME}` scores every gene against a reads file and answers
+      `{"ok": true, "sample": NAME, "scores": {GENE: SCORE, ...}, "seconds": SECONDS}`.
+    - `{"command": "stats"}` answers the number of running, queued, completed, failed and rejected jobs.
+
+    Errors are answered as `{"ok": false, "error": MESSAGE}`. At most `workers` jobs run at a time on a process pool
+    that received the references once at start-up, and at most `max_queue` more wait for a free worker; further jobs
+    are rejected straight away so that clients can back off.
+
+    Attributes:
+        references (List[Tuple[str, str]]): The (gene name, sequence) pairs of the MLST references.
+        kmer_index (Optional[KmerIndex]): The k-mer index over the references, built when `kmer_size` is given.
+        stats (Dict[str, int]): The job counters answered by the "stats" command.
+
+    Args:
+        references_fp (str): File path to the references FASTA file.
+        socket_path (str): File path of the Unix socket to listen on. A stale socket file is replaced.
+        workers (int): The number of jobs scored in parallel.
+        max_queue (int): The number of jobs allowed to wait for a worker.
+        **options: Keyword arguments passed to the `ScoreMLST` of every job, e.g. `match` or `kmer_size`.
+    """
+
+    def __init__(self, references_fp: str, socket_path: str = DEFAULT_SOCKET, workers: int = 1, max_queue: int = 64,
+                 **options):
+        """
+        Initializes ScoringServer
+        """
+        self.references = fetch_references(references_fp)
+        kmer_size = options.get("kmer_size")
+        self.kmer_index = KmerIndex(self.references, kmer_size) if kmer_size else None
+        self.socket_path = socket_path
+        self.workers = workers
+        self.max_queue = max_queue
+        self.options = options
+        self.stats = {"running": 0, "queued": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self._executor = None
+        self._slots = None
+        self._server = None
+
+    async def start(self):
+        """Starts the worker pool and listens on the socket."""
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                             initargs=(self.references, self.kmer_index, self.options))
+        self._slots = asyncio.Semaphore(self.workers)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path)
+
+    async def serve_forever(self):
+        """Starts the server and serves requests until cancelled."""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        """Stops listening, shuts the worker pool down and removes the socket file."""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answers every request line of a connection in turn."""
+        try:
+            while line := await reader.readline():
+                response = await self.handle_request(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle_request(self, line: bytes) -> Dict:
+        """
+        Parses and answers one request line.
+
+        Returns:
+            Dict: The response, see the class docstring.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"ok": False, "error": "The request is not valid JSON."}
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "The request must be a JSON object."}
+
+        command = request.get("command", "score")
+        if command == "stats":
+            return {"ok": True, **self.stats}
+        if command != "score":
+            return {"ok": False, "error": f"Unknown command {command}."}
+        if not request.get("reads"):
+            return {"ok": False, "error": "The request has no reads file."}
+
+        if self._slots.locked() and self.stats["queued"] >= self.max_queue:
+            self.stats["rejected"] += 1
+            return {"ok": False, "error": "The server is busy, try again later."}
+        return await self._score(request.get("sample", request["reads"]), request["reads"])
+
+    async def _score(self, sample: str, reads_fp: str) -> Dict:
+        """Waits for a free worker and scores one reads file on it."""
+        self.stats["queued"] += 1
+        async with self._slots:
+            self.stats["queued"] -= 1
+            self.stats["running"] += 1
+            try:
+                row = await asyncio.get_running_loop().run_in_executor(self._executor, score_sample, sample, reads_fp)
+            except Exception as e:
+                self.stats["failed"] += 1
+                return {"ok": False, "error": str(e)}
+            finally:
+                self.stats["running"] -= 1
+        self.stats["completed"] += 1
+        return {
+            "ok": True,
+            "sample": sample,
+            "scores": {gene_name: row[gene_name] for gene_name, _ in self.references},
+            "seconds": row["seconds"],
+        }
+
+
+def send_request(request: Dict, socket_path: str = DEFAULT_SOCKET, timeout: Optional[float] = None) -> Dict:
+    """
+    Sends one request to a `ScoringServer` and waits for its response.
+
+    Reads paths are resolved to absolute paths first, since the server may run in another directory.
+
+    Args:
+        request (Dict): The request, see `ScoringServer`.
+        socket_path (str): File path of the server's Unix socket.
+        timeout (Optional[float]): Seconds to wait for the response, None to wait as long as the job takes.
+
+    Returns:
+        Dict: The response of the server.
+
+    Raises:
+        ConnectionError: If the server closes the connection without answering.
+    """
+    if "reads" in request:
+        request = {**request, "reads": os.path.abspath(request["reads"])}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode() + b"\n")
+        with client.makefile("rb") as response:
+            line = response.readline()
+    if not line:
+        raise ConnectionError(f"The server at {socket_path} closed the connection without answering.")
+    return json.loads(line)
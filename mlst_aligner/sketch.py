@@ -0,0 +1,235 @@
+"""sketch.py"""
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from mlst_aligner.alleles import group_alleles
+from mlst_aligner.scoring import chunked
+from mlst_aligner.utils import save_npz
+
+SKETCH_VERSION = 2
+# The 2-bit code of every byte; bytes other than A, C, G and T map to 4 and break every k-mer they fall in.
+_CODES = np.full(256, 4, dtype=np.uint8)
+_CODES[np.frombuffer(b"ACGT", dtype=np.uint8)] = np.arange(4, dtype=np.uint8)
+
+
+def kmer_hashes(sequence: str, k: int) -> np.ndarray:
+    """
+    Hashes every k-mer of a sequence made only of A, C, G and T.
+
+    The k-mers are packed 2 bits per base into a 64-bit integer and mixed with the splitmix64 finalizer, so the hashes
+    are spread evenly over the 64-bit range and are the same in every process and run, unlike the built-in `hash`.
+    K-mers are taken from the forward strand only, like those of `KmerIndex`, since reads are only aligned forward.
+
+    Args:
+        sequence (str): The sequence, or several sequences joined by a character other than A, C, G and T.
+        k (int): The k-mer length, at most 32.
+
+    Returns:
+        np.ndarray: The uint64 hash of every valid k-mer, in sequence order, with repeats.
+    """
+    codes = _CODES[np.frombuffer(sequence.encode("ascii"), dtype=np.uint8)]
+    count = len(codes) - k + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.uint64)
+    values = np.zeros(count, dtype=np.uint64)
+    valid = np.ones(count, dtype=bool)
+    for offset in range(k):
+        window = codes[offset:offset + count]
+        valid &= window < 4
+        values = (values << np.uint64(2)) | (window & 3).astype(np.uint64)
+    values = values[valid]
+
+    values ^= values >> np.uint64(30)
+    values *= np.uint64(0xBF58476D1CE4E5B9)
+    values ^= values >> np.uint64(27)
+    values *= np.uint64(0x94D049BB133111EB)
+    values ^= values >> np.uint64(31)
+    return values
+
+
+class Sketch:
+    """
+    A FracMinHash sketch: the hashes of the k-mers of a set of sequences that fall in the lowest 1/`scaled` of the
+    hash range.
+
+    Since the same fraction of hash values is kept for every set, the kept hashes are a uniform sample of its k-mers
+    and the containment of one set in another can be estimated from their sketches alone, however large the other set
+    is. This lets the sketch of a whole read set be built in one streaming pass.
+
+    Attributes:
+        k (int): The k-mer length.
+        scaled (int): One in about `scaled` distinct k-mers is kept.
+        hashes (np.ndarray): The sorted, distinct uint64 hashes that were kept.
+
+    Args:
+        k (int): The k-mer length, from 1 to 32.
+        scaled (int): The inverse of the fraction of the hash range that is kept, 1 to keep every k-mer.
+        hashes (Optional[np.ndarray]): Already kept hashes, e.g. read from a file.
+    """
+
+    def __init__(self, k: int = 21, scaled: int = 1, hashes: Optional[np.ndarray] = None):
+        """
+        Initializes Sketch
+        """
+        if not 1 <= k <= 32:
+            raise ValueError("k must be between 1 and 32")
+        if scaled < 1:
+            raise ValueError("scaled must be a positive integer")
+        self.k = k
+        self.scaled = scaled
+        self.max_hash = np.uint64(np.iinfo(np.uint64).max // scaled)
+        self.hashes = np.unique(np.zeros(0, dtype=np.uint64) if hashes is None else np.asarray(hashes, np.uint64))
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def add(self, sequences: Iterable[str], chunk_size: int = 10_000):
+        """
+        Adds the k-mers of sequences to the sketch, hashing `chunk_size` sequences at a time.
+        """
+        for chunk in chunked(sequences, chunk_size):
+            hashes = kmer_hashes("N".join(chunk), self.k)
+            self.hashes = np.union1d(self.hashes, hashes[hashes <= self.max_hash])
+
+    def containment(self, other: "Sketch") -> float:
+        """
+        Estimates the fraction of the k-mers of this sketch's sequences that also occur in those of another sketch.
+
+        Raises:
+            ValueError: If the sketches were built with another k or scaled.
+        """
+        if (self.k, self.scaled) != (other.k, other.scaled):
+            raise ValueError(f"Cannot compare a sketch with k={self.k}, scaled={self.scaled} to one with "
+                             f"k={other.k}, scaled={other.scaled}.")
+        if not len(self.hashes):
+            return 0.0
+        return len(np.intersect1d(self.hashes, other.hashes, assume_unique=True)) / len(self.hashes)
+
+
+def sketch_references(references: List[Tuple[str, str]], k: int = 21, scaled: int = 1) -> Dict[str, Sketch]:
+    """
+    Sketches every sequence of a reference or allele database, as returned by `fetch_references`.
+
+    Returns:
+        Dict[str, Sketch]: The sketch of every sequence, by name, in database order.
+    """
+    sketches = {}
+    for name, sequence in references:
+        sketches[name] = Sketch(k, scaled)
+        sketches[name].add([sequence])
+    return sketches
+
+
+def references_fingerprint(references: List[Tuple[str, str]]) -> str:
+    """
+    Hashes the names and sequences of a reference or allele database, as returned by `fetch_references`.
+
+    Returns:
+        str: The hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    for name, sequence in references:
+        digest.update(f"{name}\t{sequence}\n".encode())
+    return digest.hexdigest()
+
+
+def save_sketches(file_path: str, sketches: Dict[str, Sketch], references: List[Tuple[str, str]]):
+    """
+    Writes sketches that share their k and scaled to a compressed .npz file with `save_npz`, so they can be reused
+    across runs.
+
+    Args:
+        file_path (str): The file to write.
+        sketches (Dict[str, Sketch]): The sketches, by name, as returned by `sketch_references`.
+        references (List[Tuple[str, str]]): The sketched sequences, whose fingerprint is stored with the sketches.
+
+    Raises:
+        ValueError: If the sketches were built with different k or scaled.
+    """
+    parameters = {(sketch.k, sketch.scaled) for sketch in sketches.values()}
+    if len(parameters) > 1:
+        raise ValueError("All the sketches of a file must share their k and scaled.")
+    k, scaled = parameters.pop() if parameters else (21, 1)
+    metadata = {"version": SKETCH_VERSION, "k": k, "scaled": scaled, "names": list(sketches),
+                "fingerprint": references_fingerprint(references)}
+    arrays = {f"hashes_{index}": sketch.hashes for index, sketch in enumerate(sketches.values())}
+    save_npz(file_path, metadata, arrays)
+
+
+def load_sketches(file_path: str,
+                  references: Optional[List[Tuple[str, str]]] = None,
+                  k: Optional[int] = None,
+                  scaled: Optional[int] = None) -> Dict[str, Sketch]:
+    """
+    Reads a file written by `save_sketches`, checking that it was built from the given references, k and scaled.
+
+    Args:
+        file_path (str): The file to read.
+        references (Optional[List[Tuple[str, str]]]): The sequences the sketches must have been built from.
+        k (Optional[int]): The k-mer length the sketches must have been built with.
+        scaled (Optional[int]): The scaled the sketches must have been built with.
+
+    Returns:
+        Dict[str, Sketch]: The sketches, by name, in the order they were written.
+
+    Raises:
+        ValueError: If the file was written by an incompatible version, or from other references, k or scaled.
+    """
+    with np.load(file_path) as arrays:
+        metadata = json.loads(str(arrays["metadata"]))
+        if metadata.get("version") != SKETCH_VERSION:
+            raise ValueError(f"The sketch file {file_path} has version {metadata.get('version')}, "
+                             f"expected {SKETCH_VERSION}.")
+        for key, expected in (("k", k), ("scaled", scaled)):
+            if expected is not None and metadata[key] != expected:
+                raise ValueError(f"The sketch file {file_path} was built with {key}={metadata[key]}, not {expected}.")
+        if references is not None and metadata["fingerprint"] != references_fingerprint(references):
+            raise ValueError(f"The sketch file {file_path} was built from other references.")
+        return {name: Sketch(metadata["k"], metadata["scaled"], arrays[f"hashes_{index}"])
+                for index, name in enumerate(metadata["names"])}
+
+
+def rank_alleles(allele_sketches: Dict[str, Sketch], read_sketch: Sketch) -> Dict[str, List[Tuple[str, float]]]:
+    """
+    Ranks the alleles of every locus by the estimated containment of their k-mers in the reads.
+
+    Alleles are grouped by locus from their names, see `group_alleles`.
+
+    Returns:
+        Dict[str, List[Tuple[str, float]]]: The (allele name, containment) pairs of every locus, best first. Ties keep
+                                            the order of the database.
+    """
+    containments = [(name, sketch.containment(read_sketch)) for name, sketch in allele_sketches.items()]
+    return {locus: sorted(alleles, key=lambda allele: -allele[1])
+            for locus, alleles in group_alleles(containments).items()}
+
+
+def top_candidates(rankings: Dict[str, List[Tuple[str, float]]], top_k: int) -> List[str]:
+    """
+    Picks the alleles of every locus kept for exact scoring: the `top_k` best ranked, and any allele tied with the
+    last of them, since the sketch cannot tell tied alleles apart.
+
+    Args:
+        rankings (Dict[str, List[Tuple[str, float]]]): The output of `rank_alleles`.
+        top_k (int): The number of alleles kept per locus.
+
+    Returns:
+        List[str]: The names of the kept alleles.
+    """
+    kept = []
+    for alleles in rankings.values():
+        cutoff = alleles[min(top_k, len(alleles)) - 1][1]
+        kept.extend(name for index, (name, containment) in enumerate(alleles)
+                    if index < top_k or containment == cutoff)
+    return kept
+
+
+def exact_rankings(gene_scores: List[Tuple[str, float]]) -> Dict[str, List[Tuple[str, float]]]:
+    """
+    Groups exact (allele name, score) pairs, such as the output of `ScoreMLST.score_mlst`, by locus, best first.
+    """
+    return {locus: sorted(alleles, key=lambda allele: -allele[1])
+            for locus, alleles in group_alleles(gene_scores).items()}
@@ -0,0 +1,204 @@
+"""store.py"""
+import json
+import os
+from functools import lru_cache
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from mlst_aligner.utils import stream_reads
+
+STORE_VERSION = 1
+BASES = np.frombuffer(b"ACGT", dtype=np.uint8)
+# The 2-bit code of every byte; bytes other than A, C, G and T map to 255 and go to the N-mask instead.
+_CODES = np.full(256, 255, dtype=np.uint8)
+_CODES[BASES] = np.arange(4, dtype=np.uint8)
+
+
+def is_read_store(path: str) -> bool:
+    """Returns whether a path is a read store directory written by `encode_reads`."""
+    return os.path.isfile(os.path.join(path, "store.json"))
+
+
+def pack_bases(sequence: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Packs a byte sequence into 2 bits per base, four bases per byte with the first base in the lowest bits.
+
+    Args:
+        sequence (np.ndarray): The sequence as uint8 byte codes.
+
+    Returns:
+        packed (np.ndarray): The packed bases as uint8, len(sequence) / 4 bytes rounded up.
+        mask_positions (np.ndarray): The positions of the bytes other than A, C, G and T (e.g. N), as int64.
+        mask_bases (np.ndarray): The original bytes at those positions, which are packed as A.
+    """
+    codes = _CODES[sequence]
+    mask_positions = np.flatnonzero(codes == 255)
+    codes[mask_positions] = 0
+
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    quads = padded.reshape(-1, 4)
+    packed = quads[:, 0] | (quads[:, 1] << 2) | (quads[:, 2] << 4) | (quads[:, 3] << 6)
+    return packed, mask_positions.astype(np.int64), sequence[mask_positions]
+
+
+def unpack_bases(packed: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """
+    Unpacks the bases `start` to `stop` of a sequence packed by `pack_bases`.
+
+    Returns:
+        np.ndarray: The bases as uint8 byte codes of A, C, G and T, without the N-mask applied.
+    """
+    first = start // 4
+    window = packed[first:-(-stop // 4)]
+    codes = np.empty((len(window), 4), dtype=np.uint8)
+    for shift in range(4):
+        codes[:, shift] = (window >> (2 * shift)) & 3
+    return BASES[codes.ravel()[start - 4 * first:stop - 4 * first]]
+
+
+def encode_reads(reads_fp: str, store_path: str, chunk_size: int = 100_000) -> dict:
+    """
+    Encodes a FASTA/FASTQ file (optionally gzipped) into a read store directory.
+
+    The store is a directory of NumPy arrays that `ReadStore` memory-maps: `bases.npy`, the bases of all reads
+    concatenated and packed 2 bits per base; `offsets.npy`, the start of every read in that sequence followed by its
+    total length; and the N-mask, `mask_positions.npy` and `mask_bases.npy`, with the position and original byte of
+    every base other than A, C, G and T. Read names go to `names.txt`, one per line, and the format version and sizes
+    to `store.json`. Reads are packed `chunk_size` at a time, so encoding needs about a quarter byte per base.
+
+    Args:
+        reads_fp (str): File path to the reads FASTA/FASTQ file, optionally gzipped.
+        store_path (str): The directory to write the store to, created if needed.
+        chunk_size (int): The number of reads packed at a time.
+
+    Returns:
+        dict: The contents of `store.json`: the format version and the number of reads, bases and masked bases.
+    """
+    os.makedirs(store_path, exist_ok=True)
+    lengths, packed_chunks, mask_positions, mask_bases = [], [], [], []
+    carry = np.zeros(0, dtype=np.uint8)
+    packed_bases = 0
+
+    with open(os.path.join(store_path, "names.txt"), "w") as names:
+        reads = stream_reads(reads_fp)
+        while chunk := list(islice(reads, chunk_size)):
+            names.writelines(f"{name}\n" for name, _ in chunk)
+            lengths.extend(len(sequence) for _, sequence in chunk)
+            sequence = np.frombuffer("".join(sequence for _, sequence in chunk).encode("ascii"), dtype=np.uint8)
+            # Only whole bytes are packed per chunk, the last few bases carry over to the next one.
+            sequence = np.concatenate([carry, sequence])
+            whole = len(sequence) // 4 * 4
+            carry = sequence[whole:]
+            packed, positions, bases = pack_bases(sequence[:whole])
+            packed_chunks.append(packed)
+            mask_positions.append(positions + packed_bases)
+            mask_bases.append(bases)
+            packed_bases += whole
+
+    packed, positions, bases = pack_bases(carry)
+    packed_chunks.append(packed)
+    mask_positions.append(positions + packed_bases)
+    mask_bases.append(bases)
+
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    np.save(os.path.join(store_path, "bases.npy"), np.concatenate(packed_chunks))
+    np.save(os.path.join(store_path, "offsets.npy"), offsets)
+    np.save(os.path.join(store_path, "mask_positions.npy"), np.concatenate(mask_positions))
+    np.save(os.path.join(store_path, "mask_bases.npy"), np.concatenate(mask_bases))
+
+    metadata = {"version": STORE_VERSION, "reads": len(lengths), "bases": int(offsets[-1]),
+                "masked_bases": sum(len(positions) for positions in mask_positions)}
+    with open(os.path.join(store_path, "store.json"), "w") as outfile:
+        json.dump(metadata, outfile)
+    return metadata
+
+
+class ReadStore:
+    """
+    A read store written by `encode_reads`, with its arrays memory-mapped read-only.
+
+    Opening a store costs nothing but the mapping, and the pages of a mapped file are shared by every process that
+    maps it, so worker processes can each open the store and decode their own range of reads straight from the page
+    cache instead of receiving the read strings from the parent.
+
+    Attributes:
+        path (str): The store directory.
+        metadata (dict): The contents of `store.json`.
+        bases (np.ndarray): The 2-bit packed bases of all reads.
+        offsets (np.ndarray): The start of every read in the bases, followed by the total number of bases.
+        mask_positions (np.ndarray): The sorted positions of the bases other than A, C, G and T.
+        mask_bases (np.ndarray): The original bytes at those positions.
+
+    Args:
+        store_path (str): The store directory.
+
+    Raises:
+        FileNotFoundError: If the directory is not a read store.
+        ValueError: If the store was written by an incompatible version.
+    """
+
+    def __init__(self, store_path: str):
+        """
+        Initializes ReadStore
+        """
+        if not is_read_store(store_path):
+            raise FileNotFoundError(f"The directory {store_path} is not a read store.")
+        with open(os.path.join(store_path, "store.json")) as infile:
+            self.metadata = json.load(infile)
+        if self.metadata.get("version") != STORE_VERSION:
+            raise ValueError(f"The read store {store_path} has version {self.metadata.get('version')}, "
+                             f"expected {STORE_VERSION}.")
+        self.path = store_path
+        load = lambda name: np.load(os.path.join(store_path, f"{name}.npy"), mmap_mode="r")
+        self.bases = load("bases")
+        self.offsets = load("offsets")
+        self.mask_positions = load("mask_positions")
+        self.mask_bases = load("mask_bases")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def lengths(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Returns the lengths of the reads `start` to `stop`."""
+        return np.diff(self.offsets[start:(len(self) if stop is None else stop) + 1])
+
+    def sequences(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """
+        Decodes the sequences of the reads `start` to `stop`.
+
+        Returns:
+            List[str]: The read sequences, in store order.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return []
+        first, last = int(self.offsets[start]), int(self.offsets[stop])
+        sequence = unpack_bases(self.bases, first, last)
+        low, high = np.searchsorted(self.mask_positions, [first, last])
+        sequence[self.mask_positions[low:high] - first] = self.mask_bases[low:high]
+
+        text = sequence.tobytes().decode("ascii")
+        bounds = (self.offsets[start:stop + 1] - first).tolist()
+        return [text[bounds[index]:bounds[index + 1]] for index in range(stop - start)]
+
+    def iter_reads(self, start: int = 0, stop: Optional[int] = None,
+                   block_size: int = 4096) -> Iterator[Tuple[str, str]]:
+        """
+        Lazily yields the name and sequence of the reads `start` to `stop`, decoding `block_size` reads at a time.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        with open(os.path.join(self.path, "names.txt")) as names:
+            names = (name.rstrip("\n") for name in islice(names, start, stop))
+            for block_start in range(start, stop, block_size):
+                sequences = self.sequences(block_start, min(block_start + block_size, stop))
+                yield from zip(islice(names, len(sequences)), sequences)
+
+
+@lru_cache(maxsize=8)
+def open_store(store_path: str) -> ReadStore:
+    """Returns the `ReadStore` of a directory, mapping it only once per process."""
+    return ReadStore(store_path)
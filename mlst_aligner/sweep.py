@@ -0,0 +1,110 @@
+"""sweep.py"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, product
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from tqdm import tqdm
+
+from mlst_aligner.aligner import positional_scores_sweep
+from mlst_aligner.partial import final_scores
+from mlst_aligner.scoring import ScoreAccumulator, chunked
+from mlst_aligner.store import is_read_store, open_store
+from mlst_aligner.utils import fetch_references, stream_reads
+
+
+def parameter_grid(matches: Iterable[int], mismatches: Iterable[int],
+                   indels: Iterable[int]) -> List[Tuple[int, int, int]]:
+    """Returns every (match, mismatch, indel) combination of the given values, in nested order."""
+    return list(product(matches, mismatches, indels))
+
+
+def sweep_chunk(parameter_sets: List[Tuple[int, int, int]],
+                references: List[Tuple[str, str]],
+                reads: List[str],
+                batch_size: int = 64) -> List[Dict[str, ScoreAccumulator]]:
+    """
+    Aligns a chunk of reads against every reference under every parameter set and accumulates the scores.
+
+    Returns:
+        List[Dict[str, ScoreAccumulator]]: For every parameter set, in order, the accumulator of every gene.
+    """
+    accumulators = [{gene_name: ScoreAccumulator(len(sequence)) for gene_name, sequence in references}
+                    for _ in parameter_sets]
+    for gene_name, sequence in references:
+        for start in range(0, len(reads), batch_size):
+            results = positional_scores_sweep(parameter_sets, reads[start:start + batch_size], sequence)
+            for gene_accumulators, parameter_results in zip(accumulators, results):
+                for _, scores_at_positions in parameter_results:
+                    gene_accumulators[gene_name].add(scores_at_positions)
+    return accumulators
+
+
+def run_sweep(reads_fp: str,
+              references_fp: str,
+              parameter_sets: Sequence[Tuple[int, int, int]],
+              workers: int = 1,
+              chunk_size: int = 256,
+              batch_size: int = 64,
+              max_reads: Optional[int] = None) -> List[Dict]:
+    """
+    Scores every gene of the references under every scoring parameter set, in a single pass over the reads.
+
+    The reads are parsed once, and every batch of reads is encoded once and aligned under each parameter set in turn
+    by `positional_scores_sweep`. Each score is exactly the one a `ScoreMLST` run with that match, mismatch and indel
+    would give. Only the read parsing and encoding are shared: the DP still runs once per parameter set, so the sweep
+    takes about as long as separate runs on uncompressed reads. With `workers` greater than one, chunks of
+    `chunk_size` reads are scored on a process pool.
+
+    Args:
+        reads_fp (str): File path to the reads FASTA/FASTQ file (optionally gzipped) or read store.
+        references_fp (str): File path to the references FASTA file.
+        parameter_sets (Sequence[Tuple[int, int, int]]): The (match, mismatch, indel) scores to try, e.g. from
+                                                         `parameter_grid`.
+        workers (int): The number of worker processes used to align reads.
+        chunk_size (int): The number of reads sent to a worker at a time.
+        batch_size (int): The number of reads aligned together by the batch kernel.
+        max_reads (Optional[int]): Only use the first reads of the file, e.g. for a quick calibration.
+
+    Returns:
+        List[Dict]: One row per parameter set, in order, with its match, mismatch and indel and the score of every gene.
+    """
+    parameter_sets = [tuple(parameters) for parameters in parameter_sets]
+    references = fetch_references(references_fp)
+    reads = open_store(reads_fp).iter_reads() if is_read_store(reads_fp) else stream_reads(reads_fp)
+    chunks = chunked((sequence for _, sequence in islice(reads, max_reads)), chunk_size)
+
+    totals = [{gene_name: ScoreAccumulator(len(sequence)) for gene_name, sequence in references}
+              for _ in parameter_sets]
+
+    def merge(accumulators: List[Dict[str, ScoreAccumulator]]):
+        for total, gene_accumulators in zip(totals, accumulators):
+            for gene_name, accumulator in gene_accumulators.items():
+                total[gene_name].merge(accumulator)
+
+    with tqdm(total=max_reads, desc="Aligning reads") as progress:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append((len(chunk), executor.submit(sweep_chunk, parameter_sets, references, chunk,
+                                                                batch_size)))
+                    if len(pending) >= 2 * workers:
+                        chunk_length, future = pending.popleft()
+                        merge(future.result())
+                        progress.update(chunk_length)
+                # At most two chunks per worker were in flight, so reads were only read as fast as they were used.
+                for chunk_length, future in pending:
+                    merge(future.result())
+                    progress.update(chunk_length)
+        else:
+            for chunk in chunks:
+                merge(sweep_chunk(parameter_sets, references, chunk, batch_size))
+                progress.update(len(chunk))
+
+    table = []
+    for (match, mismatch, indel), gene_accumulators in zip(parameter_sets, totals):
+        row = {"match": match, "mismatch": mismatch, "indel": indel}
+        row.update(final_scores(gene_accumulators))
+        table.append(row)
+    return table
@@ -1,8 +1,14 @@
 """utils.py"""
+import gzip
+import json
 import os
 import random
-from typing import List, Tuple, Union
-from pysam import FastaFile
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
+from pysam import FastaFile, FastxFile
+
+READ_EXTENSIONS = ('.fasta', '.fa', '.fastq', '.fq')
 
 
 def read_fasta(file_path: str) -> Union[FastaFile, None]:
@@ -30,6 +36,47 @@ def read_fasta(file_path: str) -> Union[FastaFile, None]:
     return sequences_object
 
 
+def validate_reads_path(file_path: str):
+    """Check that a reads file exists and has a FASTA or FASTQ extension, optionally followed by .gz.
+
+    Args:
+        file_path (str): The path to the reads file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist at the provided path.
+        ValueError: If the file path does not have a supported extension.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"The file {file_path} does not exist.")
+    name = file_path.lower()
+    if name.endswith('.gz'):
+        name = name[:-len('.gz')]
+    if not name.endswith(READ_EXTENSIONS):
+        raise ValueError("File extension must be .fasta, .fa, .fastq or .fq, optionally followed by .gz")
+
+
+def stream_reads(file_path: str) -> Iterator[Tuple[str, str]]:
+    """Stream reads from a FASTA or FASTQ file, optionally gzip-compressed.
+
+    Records are parsed sequentially with buffered I/O, so no .fai index is needed and memory use does not depend on
+    the size of the file. Only the name and sequence of each record are kept.
+
+    Args:
+        file_path (str): The path to the reads file.
+
+    Yields:
+        Tuple[str, str]: The name and sequence of each read, in file order.
+
+    Raises:
+        FileNotFoundError: If the file does not exist at the provided path.
+        ValueError: If the file path does not have a .fasta, .fa, .fastq or .fq extension, optionally followed by .gz.
+    """
+    validate_reads_path(file_path)
+    with FastxFile(file_path, persist=False) as reads:
+        for record in reads:
+            yield record.name, record.sequence
+
+
 def fetch_references(file_path: str) -> List[Tuple[str, str]]:
     """
     Utilizes the read_fasta function to parse a FASTA file, extracting gene names and sequences.
@@ -76,28 +123,89 @@ def weighted_average(scores: List[Tuple[int, int]]) -> float:
     return total_product_sum / total_weight_sum if total_weight_sum else 0
 
 
-def subset_fasta(original_fasta: str, subset_count: 1000, output_fasta: str, randomize: bool = False):
+def save_npz(file_path: str, metadata: Dict, arrays: Dict[str, np.ndarray]):
     """
-    Subsets a FASTA file and saves the subset to a new file.
+    Writes arrays and their JSON metadata to a compressed .npz file, under the key `metadata`.
+
+    The file is written next to its destination and renamed over it, so a reader never sees a half-written file.
+
+    Args:
+        file_path (str): The file to write.
+        metadata (Dict): JSON-serializable metadata.
+        arrays (Dict[str, np.ndarray]): The arrays, by key.
+    """
+    temporary_path = f"{file_path}.tmp"
+    with open(temporary_path, "wb") as outfile:
+        np.savez_compressed(outfile, metadata=np.array(json.dumps(metadata)), **arrays)
+    os.replace(temporary_path, file_path)
+
+
+def _write_record(outfile, fastq: bool, name: str, comment: Optional[str], sequence: str, quality: Optional[str]):
+    """Writes one read as a FASTA or FASTQ record."""
+    header = f"{name} {comment}" if comment else name
+    if fastq:
+        outfile.write(f"@{header}\n{sequence}\n+\n{quality}\n")
+    else:
+        outfile.write(f">{header}\n{sequence}\n")
 
-    Parameters:
-    - original_fasta (str): Path to the original FASTA file.
-    - subset_count (int): Number of reads to include in the subset.
-    - output_fasta (str): Path where the subset FASTA file will be saved.
-    - randomize (bool): If True, randomize the subset. Default is False.
 
-    The function reads the original FASTA file, optionally randomizes the order of reads,
-    extracts the specified number of reads, and writes them to the output FASTA file.
+def subset_fasta(original_fasta: str, subset_count: int, output_fasta: str, randomize: bool = False,
+                 seed: Optional[int] = None) -> int:
+    """
+    Subsets a FASTA/FASTQ file, optionally gzipped, and saves the subset to a new file.
+
+    The input is read in a single pass without an index. By default the first `subset_count` reads are kept and
+    reading stops as soon as they are found. With `randomize`, a uniform random subset of the whole file is drawn by
+    reservoir sampling, so memory is bounded by `subset_count` reads whatever the size of the input. The sampled reads
+    are written in file order, and the same `seed` always draws the same subset.
+
+    The output is written as FASTQ when its extension is .fastq or .fq and as FASTA otherwise, gzip-compressed when
+    it ends with .gz.
+
+    Args:
+        original_fasta (str): Path to the original FASTA/FASTQ file, optionally gzipped.
+        subset_count (int): Number of reads to include in the subset.
+        output_fasta (str): Path where the subset will be saved.
+        randomize (bool): If True, draw a random subset instead of the first reads.
+        seed (Optional[int]): The seed of the random subset, None for a different subset on every run.
+
+    Returns:
+        int: The number of reads written, less than `subset_count` when the input has fewer reads.
+
+    Raises:
+        FileNotFoundError: If the input file does not exist.
+        ValueError: If a file path does not have a supported extension, or FASTQ output is requested from reads
+                    without qualities.
     """
-    with FastaFile(original_fasta) as fasta:
-        references = fasta.references
+    validate_reads_path(original_fasta)
+    output_name = output_fasta.lower()
+    output_name = output_name[:-len('.gz')] if output_name.endswith('.gz') else output_name
+    if not output_name.endswith(READ_EXTENSIONS):
+        raise ValueError("File extension must be .fasta, .fa, .fastq or .fq, optionally followed by .gz")
+    fastq = output_name.endswith(('.fastq', '.fq'))
+
+    with FastxFile(original_fasta, persist=False) as reads:
+        records = ((record.name, record.comment, record.sequence, record.quality) for record in reads)
         if randomize:
-            # Randomly shuffle the references list if randomize is True
-            random.shuffle(references)
-        
-        with open(output_fasta, 'w') as outfile:
-            for i in range(min(subset_count, len(references))):
-                sequence = fasta.fetch(references[i])
-                outfile.write(f">{references[i]}\n{sequence}\n")
-
-    print(f"Subset FASTA file saved to {output_fasta} with {subset_count} reads.")
+            rng = random.Random(seed)
+            reservoir = []
+            for read_index, record in enumerate(records):
+                if read_index < subset_count:
+                    reservoir.append((read_index, record))
+                else:
+                    slot = rng.randrange(read_index + 1)
+                    if slot < subset_count:
+                        reservoir[slot] = (read_index, record)
+            subset = [record for _, record in sorted(reservoir, key=lambda item: item[0])]
+        else:
+            subset = list(islice(records, subset_count))
+
+    if fastq and any(quality is None for _, _, _, quality in subset):
+        raise ValueError(f"The reads in {original_fasta} have no qualities to write as FASTQ.")
+    opener = gzip.open if output_fasta.lower().endswith('.gz') else open
+    with opener(output_fasta, 'wt') as outfile:
+        for record in subset:
+            _write_record(outfile, fastq, *record)
+
+    print(f"Subset saved to {output_fasta} with {len(subset)} reads.")
+    return len(subset)
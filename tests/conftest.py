@@ -0,0 +1,42 @@
+"""conftest.py"""
+import os
+import pytest
+from mlst_aligner.utils import stream_reads
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+READS_FP = os.path.join(DATA_DIR, "raw_reads_st73_subset_1000.fasta")
+MLST_FP = os.path.join(DATA_DIR, "mlsts.fasta")
+ALLELE_FILES = ("mlsts.fasta", "mlsts_st10.fasta", "mlsts_random.fasta")
+
+
+@pytest.fixture
+def write_reads(tmp_path):
+    """Returns a function writing the first `count` bundled ST73 reads to a FASTA file and returning its path."""
+    reads = list(stream_reads(READS_FP))
+
+    def write(count, file_name="reads.fasta"):
+        file_path = tmp_path / file_name
+        file_path.write_text("".join(f">{name}\n{sequence}\n" for name, sequence in reads[:count]))
+        return str(file_path)
+
+    return write
+
+
+@pytest.fixture
+def reads_fp(request, write_reads):
+    """Writes the first 100 bundled reads to a FASTA file, or as many as the test parametrizes indirectly."""
+    return write_reads(getattr(request, "param", 100))
+
+
+@pytest.fixture
+def small_reads_fp(write_reads):
+    """Writes the first few reads of the bundled ST73 subset to a FASTA file."""
+    return write_reads(8, "small_reads.fasta")
+
+
+@pytest.fixture
+def allele_db_fp(tmp_path):
+    """Concatenates the bundled MLST sets into a database with three alleles per locus."""
+    file_path = tmp_path / "alleles.fasta"
+    file_path.write_text("".join(open(os.path.join(DATA_DIR, name)).read().rstrip("\n") + "\n" for name in ALLELE_FILES))
+    return str(file_path)
@@ -1,7 +1,13 @@
 """test_aligner.py"""
-import os
+import random
 import pytest
-from mlst_aligner.aligner import positional_alignment
+from mlst_aligner.aligner import (positional_alignment, positional_alignment_numpy, positional_scores, positional_scores_numpy,
+                                  positional_scores_batch, positional_scores_banded, positional_scores_sweep, ReferenceProfile,
+                                  reference_profile, _banded_scores)
+
+
+ENGINES = [positional_alignment, positional_alignment_numpy]
+SCORE_ENGINES = [positional_scores, positional_scores_numpy]
 
 
 @pytest.mark.parametrize(
@@ -28,12 +34,110 @@ from mlst_aligner.aligner import positional_alignment
             13: (5, 4)
         }),
     ])
-def test_positional_alignment(match_reward, mismatch_penalty, indel_penalty, s, t, expected_score, expected_aligned_s,
+@pytest.mark.parametrize("engine", ENGINES)
+def test_positional_alignment(engine, match_reward, mismatch_penalty, indel_penalty, s, t, expected_score, expected_aligned_s,
                               expected_aligned_t, expected_position_score):
-    score, aligned_s, aligned_t, scores_at_positions = positional_alignment(match_reward, mismatch_penalty, indel_penalty, s,
-                                                                            t)
+    score, aligned_s, aligned_t, scores_at_positions = engine(match_reward, mismatch_penalty, indel_penalty, s, t)
 
     assert score == expected_score
     assert aligned_s == expected_aligned_s
     assert aligned_t == expected_aligned_t
     assert scores_at_positions == expected_position_score
+
+
+@pytest.mark.parametrize("match_reward, mismatch_penalty, indel_penalty", [(2, 2, 1), (3, 3, 1), (2, -2, -1), (2, -4, -2), (1, 0, 0)])
+def test_numpy_engine_matches_python_engine(match_reward, mismatch_penalty, indel_penalty):
+    rng = random.Random(0)
+    for _ in range(25):
+        s = ''.join(rng.choice("ACGT") for _ in range(rng.randint(0, 30)))
+        t = ''.join(rng.choice("ACGTN") for _ in range(rng.randint(0, 40)))
+        assert positional_alignment_numpy(match_reward, mismatch_penalty, indel_penalty, s,
+                                          t) == positional_alignment(match_reward, mismatch_penalty, indel_penalty, s, t)
+
+
+@pytest.mark.parametrize("score_engine", SCORE_ENGINES)
+@pytest.mark.parametrize("match_reward, mismatch_penalty, indel_penalty", [(2, 2, 1), (3, 3, 1), (2, -2, -1), (2, -4, -2), (1, 0, 0)])
+def test_score_only_matches_full_alignment(score_engine, match_reward, mismatch_penalty, indel_penalty):
+    rng = random.Random(1)
+    for _ in range(25):
+        s = ''.join(rng.choice("ACGT") for _ in range(rng.randint(0, 30)))
+        t = ''.join(rng.choice("ACGTN") for _ in range(rng.randint(0, 40)))
+        score, _, _, scores_at_positions = positional_alignment(match_reward, mismatch_penalty, indel_penalty, s, t)
+        assert score_engine(match_reward, mismatch_penalty, indel_penalty, s, t) == (score, scores_at_positions)
+
+
+@pytest.mark.parametrize("match_reward, mismatch_penalty, indel_penalty", [(2, 2, 1), (3, 3, 1), (2, -2, -1), (2, -4, -2), (1, 0, 0)])
+def test_batch_matches_single_read(match_reward, mismatch_penalty, indel_penalty):
+    rng = random.Random(2)
+    reads = [''.join(rng.choice("ACGT") for _ in range(rng.randint(0, 30))) for _ in range(25)]
+    t = ''.join(rng.choice("ACGTN") for _ in range(40))
+    expected = [positional_scores(match_reward, mismatch_penalty, indel_penalty, read, t) for read in reads]
+    assert positional_scores_batch(match_reward, mismatch_penalty, indel_penalty, reads, t) == expected
+    assert positional_scores_batch(match_reward, mismatch_penalty, indel_penalty, [], t) == []
+
+
+@pytest.mark.parametrize("match_reward, mismatch_penalty, indel_penalty", [(2, 2, 1), (2, -4, -2), (1, 0, 0)])
+def test_banded_equals_full_when_band_covers_matrix(match_reward, mismatch_penalty, indel_penalty):
+    rng = random.Random(3)
+    for _ in range(25):
+        s = ''.join(rng.choice("ACGT") for _ in range(rng.randint(0, 30)))
+        t = ''.join(rng.choice("ACGTN") for _ in range(rng.randint(0, 40)))
+        expected = positional_scores(match_reward, mismatch_penalty, indel_penalty, s, t)
+        assert positional_scores_banded(match_reward, mismatch_penalty, indel_penalty, s, t, diagonal=0,
+                                        band_width=80) == expected
+        assert positional_scores_banded(match_reward, mismatch_penalty, indel_penalty, s, t, diagonal=None) == expected
+
+
+def test_banded_falls_back_when_band_too_narrow():
+    s = "ACGTACGTTTGCA"
+    t = "GGGGGGGGGGGGGGGGGGGG" + s
+    expected = positional_scores(2, 4, 2, s, t)
+    assert positional_scores_banded(2, 4, 2, s, t, diagonal=18, band_width=2) == expected
+
+
+def test_banded_fills_only_the_band_when_exact():
+    s = "CGT"
+    t = "AAAAAAAAAA" + s + "AAAAAAAAAA"
+    profile = ReferenceProfile(2, 4, 2, t)
+    expected = positional_scores(2, 4, 2, s, t)
+    assert _banded_scores(2, 4, 2, s, t, 10, 2, profile) == expected
+    assert positional_scores_banded(2, 4, 2, s, t, diagonal=10, band_width=2) == expected
+    # A match outside the band, or a negative penalty, makes the band unprovable.
+    assert _banded_scores(2, 4, 2, s, "C" + t, 10, 2, ReferenceProfile(2, 4, 2, "C" + t)) is None
+    assert _banded_scores(2, -4, -2, s, t, 10, 2, ReferenceProfile(2, -4, -2, t)) is None
+
+
+@pytest.mark.parametrize("match_reward, mismatch_penalty, indel_penalty", [(2, 2, 1), (2, -4, -2)])
+def test_engines_with_reference_profile(match_reward, mismatch_penalty, indel_penalty):
+    rng = random.Random(5)
+    t = ''.join(rng.choice("ACGT") for _ in range(60))
+    profile = ReferenceProfile(match_reward, mismatch_penalty, indel_penalty, t)
+    reads = [''.join(rng.choice("ACGTN") for _ in range(rng.randint(0, 40))) for _ in range(20)]
+    parameters = (match_reward, mismatch_penalty, indel_penalty)
+
+    assert positional_scores_batch(*parameters, reads, t, profile=profile) == positional_scores_batch(*parameters, reads, t)
+    for read in reads:
+        expected = positional_scores(*parameters, read, t)
+        assert positional_scores_numpy(*parameters, read, t, profile=profile) == expected
+        assert positional_scores_banded(*parameters, read, t, diagonal=0, band_width=80, profile=profile) == expected
+        assert positional_alignment_numpy(*parameters, read, t, profile=profile) == positional_alignment(*parameters,
+                                                                                                         read, t)
+
+
+def test_reference_profile_caches_derived_structures():
+    profile = reference_profile(2, 4, 2, "ACGTACGTTTGCA")
+    assert reference_profile(2, 4, 2, "ACGTACGTTTGCA") is profile
+    assert reference_profile(2, 4, 1, "ACGTACGTTTGCA") is not profile
+    assert profile.substitution(profile.dtype(100)) is profile.substitution(profile.dtype(100))
+    assert profile.substitution(profile.dtype(100))[ord("A")].tolist() == [2, -4, -4, -4] * 2 + [-4] * 4 + [2]
+
+
+def test_sweep_equals_batch_per_parameter_set():
+    rng = random.Random(11)
+    t = ''.join(rng.choice("ACGT") for _ in range(50))
+    reads = [''.join(rng.choice("ACGTN") for _ in range(rng.randint(0, 35))) for _ in range(15)]
+    # The last set needs int64 cells while the others fit in int32.
+    parameter_sets = [(2, 2, 1), (2, -4, -2), (1, 0, 0), (3, 1, 2**29)]
+    results = positional_scores_sweep(parameter_sets, reads, t)
+    assert results == [positional_scores_batch(*parameters, reads, t) for parameters in parameter_sets]
+    assert positional_scores_sweep(parameter_sets, [], t) == [[], [], [], []]
@@ -0,0 +1,90 @@
+"""test_alleles.py"""
+import os
+import random
+import pytest
+from mlst_aligner.aligner import positional_scores
+from mlst_aligner.alleles import AlleleTrie, ScoreAlleles, group_alleles, split_allele_name
+from mlst_aligner.scoring import GeneScore, ScoreAccumulator
+from mlst_aligner.utils import fetch_references
+from tests.conftest import DATA_DIR
+
+
+@pytest.fixture
+def allele_reads_fp(tmp_path):
+    """Writes 100bp reads tiling the ST73 alleles."""
+    reads = [(f"{name}_{start}", sequence[start:start + 100])
+             for name, sequence in fetch_references(os.path.join(DATA_DIR, "mlsts.fasta"))
+             for start in range(0, len(sequence) - 80, 120)]
+    file_path = tmp_path / "allele_reads.fasta"
+    file_path.write_text("".join(f">{name}\n{sequence}\n" for name, sequence in reads))
+    return str(file_path)
+
+
+def test_split_allele_name():
+    assert split_allele_name("adk_36") == ("adk", "36")
+    assert split_allele_name("dna_pol_3") == ("dna_pol", "3")
+    assert split_allele_name("adk") == ("adk", "")
+
+
+def test_group_alleles_keeps_file_order():
+    loci = group_alleles([("adk_1", "A"), ("fumC_1", "C"), ("adk_2", "G")])
+    assert loci == {"adk": [("adk_1", "A"), ("adk_2", "G")], "fumC": [("fumC_1", "C")]}
+
+
+def test_allele_trie_shares_prefixes():
+    trie = AlleleTrie([("x_1", "ACGTAC"), ("x_2", "ACGTTT"), ("x_3", "ACGTAC"), ("x_4", "ACG")])
+    assert trie.sequences == ["ACG", "ACGTAC", "ACGTTT"]
+    assert trie.sequence_of == [1, 2, 1, 0]
+    assert trie.columns == 8
+    (shared,) = trie.root.children
+    assert shared.edge == "ACG" and shared.sequence_index == 0
+    assert [child.edge for child in shared.children[0].children] == ["AC", "TT"]
+
+
+@pytest.mark.parametrize("scoring_parameters", [(2, 2, 1), (2, 4, 2), (2, -4, -2), (1, 0, 0)])
+def test_allele_trie_matches_per_allele_scores(scoring_parameters):
+    rng = random.Random(0)
+    for _ in range(20):
+        base = [rng.choice("ACGT") for _ in range(rng.randint(1, 30))]
+        alleles = []
+        for allele in range(rng.randint(1, 6)):
+            sequence = list(base)
+            for _ in range(rng.randint(0, 3)):
+                sequence[rng.randrange(len(sequence))] = rng.choice("ACGT")
+            alleles.append((f"x_{allele}", "".join(sequence[:rng.randint(1, len(sequence))])))
+        reads = [''.join(rng.choice("ACGT") for _ in range(rng.randint(1, 25))) for _ in range(rng.randint(1, 6))]
+        multiplicities = [rng.randint(1, 3) for _ in reads]
+
+        trie = AlleleTrie(alleles)
+        for sequence, accumulator in zip(trie.sequences, trie.score(scoring_parameters, reads, multiplicities)):
+            expected = ScoreAccumulator(len(sequence))
+            for read, multiplicity in zip(reads, multiplicities):
+                expected.add(positional_scores(*scoring_parameters, read, sequence)[1], multiplicity)
+            assert accumulator == expected
+
+
+def test_score_alleles_matches_gene_score(allele_reads_fp, allele_db_fp):
+    scorer = ScoreAlleles(allele_reads_fp, allele_db_fp, match=2, mismatch=4, indel=2, dedup=True)
+    rankings = scorer.score_alleles()
+    assert set(rankings) == {"adk", "fumC", "gyrB", "icd", "mdh", "purA", "recA"}
+    assert set(scorer.locus_timings) == set(rankings)
+
+    references = dict(scorer.references)
+    for allele_name, score in rankings["adk"]:
+        gene_score = GeneScore(allele_reads_fp, references[allele_name], match=2, mismatch=4, indel=2)
+        assert score // 1 == gene_score.get_t_score()
+    assert [score for _, score in rankings["adk"]] == sorted((score for _, score in rankings["adk"]), reverse=True)
+
+
+def test_sequence_type(allele_reads_fp, allele_db_fp, tmp_path):
+    profiles_fp = tmp_path / "profiles.tsv"
+    scorer = ScoreAlleles(allele_reads_fp, allele_db_fp, match=2, mismatch=4, indel=2)
+    rankings = scorer.score_alleles()
+    best = [split_allele_name(ranking[0][0])[1] for ranking in rankings.values()]
+    profiles_fp.write_text("ST\t" + "\t".join(rankings) + "\tclonal_complex\n" + "42\t" + "\t".join(best) + "\tnone\n")
+
+    assert scorer.sequence_type(rankings) is None
+    scorer = ScoreAlleles(allele_reads_fp, allele_db_fp, profiles_fp=str(profiles_fp))
+    assert scorer.sequence_type(rankings) == "42"
+    rankings["adk"] = rankings["adk"][1:]
+    assert scorer.sequence_type(rankings) is None
@@ -0,0 +1,99 @@
+"""test_backends.py"""
+import os
+import random
+import pytest
+from mlst_aligner.aligner import reference_profile
+from mlst_aligner.backends import (BACKENDS, Backend, _scores_kernel, batch_of, get_backend, kernel_scores,
+                                   register_backend, select_backend)
+from mlst_aligner.mlst import ScoreMLST
+from mlst_aligner.scoring import GeneScore
+from mlst_aligner.utils import fetch_references, stream_reads
+from tests.conftest import DATA_DIR
+
+REFERENCE = get_backend("python")
+PARAMETERS = [(2, 4, 2), (2, -4, -2), (3, 1, 1), (1, 0, 0)]
+
+
+@pytest.fixture(scope="module")
+def data_reads():
+    """The first 12 bundled reads and the bundled references, with a short reference to keep python affordable."""
+    reads = [sequence for _, sequence in stream_reads(os.path.join(DATA_DIR, "raw_reads_st73_subset_1000.fasta"))]
+    references = [sequence for _, sequence in fetch_references(os.path.join(DATA_DIR, "mlsts.fasta"))]
+    return reads[:12], [references[1][:120], references[4][200:300]]
+
+
+def random_pairs(count, seed=5):
+    """Returns random read/reference pairs over ACGTN, including empty reads."""
+    rng = random.Random(seed)
+    return [(''.join(rng.choice("ACGTN") for _ in range(rng.randint(0, 30))),
+             ''.join(rng.choice("ACGT") for _ in range(rng.randint(1, 40)))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("name", sorted(BACKENDS))
+@pytest.mark.parametrize("parameters", PARAMETERS)
+def test_backend_scores_match_reference(name, parameters, data_reads):
+    backend = get_backend(name)
+    reads, references = data_reads
+    for reference in references:
+        expected = REFERENCE.score_batch(*parameters, reads=reads, t=reference)
+        profile = reference_profile(*parameters, reference)
+        assert backend.score_batch(*parameters, reads=reads, t=reference, profile=profile) == expected
+        assert backend.score_batch(*parameters, reads=reads, t=reference) == expected
+        assert [backend.score(*parameters, s=read, t=reference, profile=profile) for read in reads[:3]] == expected[:3]
+    assert backend.score_batch(*parameters, reads=[], t=references[0]) == []
+
+
+@pytest.mark.parametrize("name", sorted(BACKENDS))
+def test_backend_matches_reference_on_random_pairs(name):
+    backend = get_backend(name)
+    for s, t in random_pairs(40):
+        for parameters in PARAMETERS:
+            expected_score, _, _, expected_positions = REFERENCE.align(*parameters, s=s, t=t)
+            assert backend.score(*parameters, s=s, t=t) == (expected_score, expected_positions)
+            assert backend.align(*parameters, s=s, t=t) == REFERENCE.align(*parameters, s=s, t=t)
+
+
+def test_scores_kernel_matches_reference():
+    # The numba backend compiles this kernel; it is checked here in plain Python so it is covered without numba.
+    score = kernel_scores(_scores_kernel)
+    for s, t in random_pairs(15, seed=9):
+        for parameters in PARAMETERS:
+            assert score(*parameters, s=s, t=t) == REFERENCE.score(*parameters, s=s, t=t)
+    assert batch_of(score)(2, 4, 2, ["ACGT", ""], "ACGA") == REFERENCE.score_batch(2, 4, 2, ["ACGT", ""], "ACGA")
+
+
+def test_registry():
+    assert {"python", "numpy"} <= set(BACKENDS)
+    with pytest.raises(ValueError):
+        get_backend("missing")
+    backend = register_backend(Backend("test", REFERENCE.align, REFERENCE.score, REFERENCE.score_batch))
+    try:
+        assert get_backend("test") is backend
+        assert GeneScore(os.path.join(DATA_DIR, "mlsts.fasta"), "ACGT", engine="test").engine == "test"
+    finally:
+        del BACKENDS["test"]
+    with pytest.raises(ValueError):
+        GeneScore(os.path.join(DATA_DIR, "mlsts.fasta"), "ACGT", engine="test")
+
+
+def test_select_backend_times_every_backend(data_reads):
+    reads, references = data_reads
+    name, timings = select_backend((2, 4, 2), reads, references)
+    assert set(timings) == set(BACKENDS)
+    assert name == min(timings, key=timings.get)
+    assert select_backend((2, 4, 2), [], references) == ("numpy", {})
+
+
+def test_auto_engine_scores_like_reference(tmp_path):
+    reads = list(stream_reads(os.path.join(DATA_DIR, "raw_reads_st73_subset_1000.fasta")))[:20]
+    reads_fp = tmp_path / "reads.fasta"
+    reads_fp.write_text("".join(f">{name}\n{sequence}\n" for name, sequence in reads))
+    mlst_fp = os.path.join(DATA_DIR, "mlsts.fasta")
+
+    scorer = ScoreMLST(str(reads_fp), mlst_fp, engine="auto", calibration_reads=4, match=2, mismatch=4, indel=2)
+    assert scorer.engine in BACKENDS and set(scorer.engine_timings) == set(BACKENDS)
+    assert scorer.score_mlst() == ScoreMLST(str(reads_fp), mlst_fp, match=2, mismatch=4, indel=2).score_mlst()
+
+    reference = fetch_references(mlst_fp)[0][1]
+    gene_score = GeneScore(str(reads_fp), reference, engine="auto", calibration_reads=4)
+    assert gene_score.engine in BACKENDS
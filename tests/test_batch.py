@@ -0,0 +1,70 @@
+"""test_batch.py"""
+import json
+import os
+import pytest
+from mlst_aligner import batch
+from mlst_aligner.batch import completed_samples, read_manifest, run_batch
+from mlst_aligner.mlst import ScoreMLST
+from tests.conftest import DATA_DIR, MLST_FP
+
+
+@pytest.fixture
+def manifest_fp(tmp_path):
+    """Writes two small samples taken from the bundled reads and a manifest listing them."""
+    with open(os.path.join(DATA_DIR, "raw_reads_st73_subset_1000.fasta")) as infile:
+        lines = infile.readlines()
+    (tmp_path / "a.fasta").write_text("".join(lines[:6]))
+    (tmp_path / "b.fasta").write_text("".join(lines[6:12]))
+    file_path = tmp_path / "manifest.tsv"
+    file_path.write_text("sample\treads\n# comment\nA\ta.fasta\nB\tb.fasta\n")
+    return str(file_path)
+
+
+def test_read_manifest(manifest_fp, tmp_path):
+    assert read_manifest(manifest_fp) == [("A", str(tmp_path / "a.fasta")), ("B", str(tmp_path / "b.fasta"))]
+    duplicated = tmp_path / "duplicated.tsv"
+    duplicated.write_text("A\ta.fasta\nA\tb.fasta\n")
+    with pytest.raises(ValueError):
+        read_manifest(str(duplicated))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_matches_single_sample_scores(manifest_fp, tmp_path, workers):
+    output_fp, json_fp = str(tmp_path / "out.tsv"), str(tmp_path / "out.json")
+    table = run_batch(manifest_fp, MLST_FP, output_fp, json_fp, workers=workers, match=2, mismatch=4, indel=2)
+
+    assert [row["sample"] for row in table] == ["A", "B"]
+    assert json.loads(open(json_fp).read()) == table
+    expected = dict(ScoreMLST(str(tmp_path / "a.fasta"), MLST_FP, match=2, mismatch=4, indel=2).score_mlst())
+    assert {gene: table[0][gene] for gene in expected} == expected
+
+
+def test_run_batch_resumes_after_crash(manifest_fp, tmp_path):
+    output_fp = str(tmp_path / "out.tsv")
+    run_batch(manifest_fp, MLST_FP, output_fp, match=2, mismatch=4, indel=2)
+    with open(output_fp) as infile:
+        header, first_row, _ = infile.readlines()
+    # Simulate a crash while the second row was being written.
+    with open(output_fp, "w") as outfile:
+        outfile.write(header + first_row + "B\tb.fa")
+    assert completed_samples(output_fp) == {"A"}
+
+    table = run_batch(manifest_fp, MLST_FP, output_fp, match=2, mismatch=4, indel=2)
+    assert [row["sample"] for row in table] == ["A", "B"]
+    with open(output_fp) as infile:
+        lines = infile.readlines()
+    assert lines[:2] == [header, first_row] and len(lines) == 3
+
+
+def test_run_batch_gives_spare_workers_to_the_reads(manifest_fp, tmp_path, mocker):
+    output_fp = str(tmp_path / "out.tsv")
+    run_batch(manifest_fp, MLST_FP, output_fp, match=2, mismatch=4, indel=2)
+    with open(output_fp) as infile:
+        header, first_row, _ = infile.readlines()
+    with open(output_fp, "w") as outfile:
+        outfile.write(header + first_row)
+
+    scorer = mocker.spy(batch, "ScoreMLST")
+    table = run_batch(manifest_fp, MLST_FP, output_fp, workers=4, match=2, mismatch=4, indel=2)
+    assert scorer.call_count == 1 and scorer.call_args.kwargs["workers"] == 4
+    assert [row["sample"] for row in table] == ["A", "B"]
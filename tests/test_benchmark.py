@@ -0,0 +1,35 @@
+"""test_benchmark.py"""
+import pytest
+from mlst_aligner.benchmark import compare_to_baseline, run_benchmark, scaling_efficiency
+from tests.conftest import MLST_FP, READS_FP
+
+
+def make_result(reads_file, reads, reads_per_second, engine="numpy", workers=1):
+    return {"reads_file": reads_file, "engine": engine, "workers": workers, "reads": reads,
+            "reads_per_second": reads_per_second}
+
+
+def test_run_benchmark_reports_throughput():
+    result = run_benchmark(READS_FP, MLST_FP, max_reads=3)
+    assert result["reads"] == 3 and result["alignments"] == 21
+    assert result["cells"] > 0 and result["peak_rss_mb"] > 0
+    assert result["reads_per_second"] == pytest.approx(3 / result["seconds"])
+    assert result["cells_per_second"] == pytest.approx(result["cells"] / result["seconds"])
+
+
+def test_scaling_efficiency():
+    results = [make_result("small", 1000, 100.0), make_result("large", 10000, 80.0), make_result("small", 1000, 50.0,
+                                                                                               workers=2)]
+    scaling = scaling_efficiency(results)
+    assert scaling[0] == {"engine": "numpy", "workers": 1, "smallest_reads": 1000, "largest_reads": 10000,
+                          "efficiency": 0.8}
+    assert scaling[1]["efficiency"] == 1.0
+
+
+def test_compare_to_baseline_flags_regressions():
+    baseline = {"results": [make_result("small", 1000, 100.0), make_result("large", 10000, 100.0)]}
+    current = {"results": [make_result("small", 1000, 95.0), make_result("large", 10000, 80.0),
+                           make_result("large", 10000, 10.0, engine="python")]}
+    regressions = compare_to_baseline(current, baseline, threshold=0.1)
+    assert len(regressions) == 1 and regressions[0].startswith("large (numpy, 1 workers)")
+    assert compare_to_baseline(current, baseline, threshold=0.25) == []
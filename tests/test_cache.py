@@ -0,0 +1,51 @@
+"""test_cache.py"""
+from mlst_aligner.cache import AlignmentCache
+
+
+def test_cache_round_trip(tmp_path):
+    cache = AlignmentCache(str(tmp_path))
+    scope = AlignmentCache.scope("ACGT", (2, -2, -1))
+    key = AlignmentCache.key(scope, "ACG")
+    assert cache.get_many([key]) == {}
+    cache.put_many([(key, {2: (4, 3), 3: (6, 3)}), (AlignmentCache.key(scope, "TTT"), {})])
+    assert cache.get_many([key]) == {key: {2: (4, 3), 3: (6, 3)}}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    reopened = AlignmentCache(str(tmp_path))
+    assert len(reopened) == 2
+
+
+def test_cache_keys_depend_on_reference_and_parameters():
+    read_key = AlignmentCache.key(AlignmentCache.scope("ACGT", (2, -2, -1)), "ACG")
+    assert read_key != AlignmentCache.key(AlignmentCache.scope("ACGA", (2, -2, -1)), "ACG")
+    assert read_key != AlignmentCache.key(AlignmentCache.scope("ACGT", (2, -4, -1)), "ACG")
+    assert read_key != AlignmentCache.key(AlignmentCache.scope("ACGT", (2, -2, -1)), "ACGG")
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = AlignmentCache(str(tmp_path), max_entries=2)
+    scope = AlignmentCache.scope("ACGT", (2, -2, -1))
+    first, second, third = (AlignmentCache.key(scope, read) for read in ("A", "C", "G"))
+    cache.put_many([(first, {1: (2, 1)})])
+    cache.put_many([(second, {2: (2, 1)})])
+    cache.get_many([first])
+    cache.put_many([(third, {3: (2, 1)})])
+    assert set(cache.get_many([first, second, third])) == {first, third}
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cache_counts_entries_and_keeps_int64_scores(tmp_path):
+    cache = AlignmentCache(str(tmp_path), max_entries=3)
+    scope = AlignmentCache.scope("ACGT", (2, -2, -1))
+    keys = [AlignmentCache.key(scope, read) for read in ("A", "C", "G", "T")]
+    cache.put_many([(keys[0], {1: (2**40, 1)}), (keys[1], {2: (2, 1)})])
+    cache.put_many([(keys[1], {2: (2, 1)})])
+    assert len(cache) == 2
+    cache.get_many([keys[1]])
+    cache.put_many([(keys[2], {3: (2, 1)}), (keys[3], {4: (2, 1)})])
+    assert len(cache) == len(AlignmentCache(str(tmp_path))) == 3
+    assert cache.get_many([keys[0]]) == {}
+    cache.put_many([(keys[0], {1: (2**40, 1)})])
+    assert cache.get_many([keys[0]]) == {keys[0]: {1: (2**40, 1)}}
@@ -0,0 +1,42 @@
+"""test_index.py"""
+import pytest
+from mlst_aligner.index import iter_kmers, KmerIndex
+
+
+def test_iter_kmers():
+    assert list(iter_kmers("ACGTA", 3)) == [(0, "ACG"), (1, "CGT"), (2, "GTA")]
+    assert list(iter_kmers("AC", 3)) == []
+
+
+def test_kmer_index_positions():
+    index = KmerIndex([("gene1", "ACGTAC"), ("gene2", "TTACG")], k=3)
+    assert index.names == ["gene1", "gene2"]
+    assert index.index["ACG"] == [(0, 0), (1, 2)]
+    assert index.index["GTA"] == [(0, 2)]
+
+
+@pytest.mark.parametrize("read, expected", [
+    ("GGACGTT", {0, 1}),
+    ("CGTAA", {0}),
+    ("TTAGG", {1}),
+    ("GGGGG", set()),
+    ("AC", set()),
+])
+def test_kmer_index_candidates(read, expected):
+    index = KmerIndex([("gene1", "ACGTAC"), ("gene2", "TTACG")], k=3)
+    assert index.candidates(read) == expected
+
+
+def test_kmer_index_rejects_invalid_k():
+    with pytest.raises(ValueError):
+        KmerIndex([("gene1", "ACGT")], k=0)
+
+
+@pytest.mark.parametrize("read, expected", [
+    ("CGTAC", 1),
+    ("GGGGGTAC", -2),
+    ("GGGGG", None),
+])
+def test_seed_diagonal(read, expected):
+    index = KmerIndex([("gene1", "ACGTAC"), ("gene2", "TTACG")], k=3)
+    assert index.seed_diagonal(read, 0) == expected
@@ -0,0 +1,46 @@
+"""test_metrics.py"""
+import json
+import os
+from mlst_aligner.metrics import NULL_METRICS, Metrics
+from mlst_aligner.scoring import GeneScore
+from mlst_aligner.utils import fetch_references
+from tests.conftest import DATA_DIR
+
+
+def test_metrics_records_stages_and_counters(tmp_path):
+    metrics = Metrics()
+    with metrics.stage("alignment"):
+        pass
+    with metrics.stage("alignment"):
+        pass
+    assert list(metrics.timed(range(3), "read_io")) == [0, 1, 2]
+    metrics.count("reads", 3)
+    metrics.count("reads")
+
+    report = metrics.as_dict()
+    assert set(report["stages"]) == {"alignment", "read_io"}
+    assert report["counters"] == {"reads": 4}
+    assert report["peak_rss_mb"] > 0
+
+    metrics.write_json(str(tmp_path / "metrics.json"))
+    assert json.loads((tmp_path / "metrics.json").read_text())["counters"] == {"reads": 4}
+
+
+def test_disabled_metrics_are_no_ops():
+    reads = iter(range(3))
+    assert NULL_METRICS.timed(reads, "read_io") is reads
+    with NULL_METRICS.stage("alignment"):
+        NULL_METRICS.count("reads")
+    assert NULL_METRICS.stages == {} and NULL_METRICS.counters == {}
+
+
+def test_gene_score_reports_metrics(small_reads_fp, capsys):
+    reference = dict(fetch_references(os.path.join(DATA_DIR, "mlsts.fasta")))["adk_36"]
+    metrics = Metrics()
+    scorer = GeneScore(small_reads_fp, reference, match=2, mismatch=4, indel=2, batch_size=3, metrics=metrics)
+    scorer.get_t_score()
+
+    assert set(metrics.stages) == {"read_io", "alignment", "merge", "final_scoring"}
+    read_length = sum(len(sequence) for _, sequence in scorer.iter_reads())
+    assert metrics.counters == {"reads": 8, "alignments": 8, "dp_cells": read_length * len(reference)}
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,70 @@
+"""test_mlst.py"""
+import os
+import pytest
+from mlst_aligner.mlst import ScoreMLST
+from mlst_aligner.partial import load_partial
+from tests.conftest import DATA_DIR
+
+
+@pytest.fixture
+def routed_reads_fp(tmp_path):
+    """Writes reads that each contain a 20bp piece of one locus, plus a read that matches none of them."""
+    with open(os.path.join(DATA_DIR, "mlsts.fasta")) as infile:
+        sequences = [line.strip() for line in infile if not line.startswith(">")]
+    reads = [("adk_read", "TTTT" + sequences[1][100:120] + "TTTT"), ("recA_read", sequences[6][50:70]),
+             ("no_locus", "N" * 30)]
+    file_path = tmp_path / "routed_reads.fasta"
+    file_path.write_text("".join(f">{name}\n{sequence}\n" for name, sequence in reads))
+    return str(file_path)
+
+
+def test_score_mlst_routes_reads_to_loci(routed_reads_fp):
+    scorer = ScoreMLST(routed_reads_fp, os.path.join(DATA_DIR, "mlsts.fasta"), kmer_size=15, check_recall=True,
+                       match=2, mismatch=4, indel=2, recall_min_score=40)
+    routed_reads = scorer.route_reads()
+    assert [len(routed) for routed in routed_reads] == [0, 1, 0, 0, 0, 0, 1]
+
+    gene_scores = dict(scorer.score_mlst())
+    assert gene_scores["adk_36"] > 0 and gene_scores["recA_25"] > 0
+    assert scorer.routing_stats["exhaustive_alignments"] == 21
+    assert scorer.routing_stats["skipped_alignments"] == 19
+    assert set(scorer.routing_stats["recall"].values()) == {1.0}
+
+
+def test_score_mlst_exhaustive_mode_has_no_routing_stats(routed_reads_fp):
+    scorer = ScoreMLST(routed_reads_fp, os.path.join(DATA_DIR, "mlsts.fasta"), match=2, mismatch=4, indel=2)
+    assert len(scorer.score_mlst()) == 7
+    assert scorer.routing_stats == {}
+
+
+@pytest.mark.parametrize("kmer_size", [None, 15])
+def test_score_mlst_resumes_from_checkpoint(write_reads, tmp_path, kmer_size):
+    mlst_fp = os.path.join(DATA_DIR, "mlsts.fasta")
+    checkpoint = str(tmp_path / "checkpoint.npz")
+    options = {"match": 2, "mismatch": 4, "indel": 2, "kmer_size": kmer_size}
+    expected = ScoreMLST(write_reads(120), mlst_fp, **options).score_mlst()
+
+    first = ScoreMLST(write_reads(70), mlst_fp, checkpoint=checkpoint, checkpoint_interval=30, **options)
+    first.score_mlst()
+    assert first.checkpoint_stats == {"resumed_reads": 0, "new_reads": 70}
+    assert load_partial(checkpoint)[0]["reads_consumed"] == 70
+
+    second = ScoreMLST(write_reads(120), mlst_fp, checkpoint=checkpoint, checkpoint_interval=30, **options)
+    assert second.score_mlst() == expected
+    assert second.checkpoint_stats == {"resumed_reads": 70, "new_reads": 50}
+
+    third = ScoreMLST(write_reads(120), mlst_fp, checkpoint=checkpoint, **options)
+    assert third.score_mlst() == expected
+    assert third.checkpoint_stats == {"resumed_reads": 120, "new_reads": 0}
+
+
+def test_score_mlst_rejects_foreign_checkpoint(write_reads, tmp_path):
+    mlst_fp = os.path.join(DATA_DIR, "mlsts.fasta")
+    checkpoint = str(tmp_path / "checkpoint.npz")
+    ScoreMLST(write_reads(40), mlst_fp, checkpoint=checkpoint, match=2, mismatch=4, indel=2).score_mlst()
+
+    with pytest.raises(ValueError):
+        ScoreMLST(write_reads(40), mlst_fp, checkpoint=checkpoint, match=2, mismatch=4, indel=1).score_mlst()
+    # A file that does not start with the checkpointed reads.
+    with pytest.raises(ValueError):
+        ScoreMLST(write_reads(20), mlst_fp, checkpoint=checkpoint, match=2, mismatch=4, indel=2).score_mlst()
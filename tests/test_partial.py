@@ -0,0 +1,81 @@
+"""test_partial.py"""
+import pytest
+from mlst_aligner.mlst import ScoreMLST
+from mlst_aligner.partial import final_scores, load_partial, merge_partials, parse_shard
+from mlst_aligner.scoring import GeneScore
+from mlst_aligner.utils import stream_reads
+from tests.conftest import MLST_FP
+
+OPTIONS = {"match": 2, "mismatch": 4, "indel": 2}
+
+
+def score_shards(reads_fp, tmp_path, count, **options):
+    """Scores every shard of the reads and returns the partial result files."""
+    partial_fps = []
+    for index in range(1, count + 1):
+        scorer = ScoreMLST(reads_fp, MLST_FP, shard=(index, count), **OPTIONS, **options)
+        scorer.score_mlst()
+        partial_fps.append(str(tmp_path / f"shard_{index}.npz"))
+        scorer.save_partial(partial_fps[-1])
+    return partial_fps
+
+
+def test_parse_shard():
+    assert parse_shard(None) is None
+    assert parse_shard("2/4") == (2, 4)
+    for shard in ("0/4", "5/4", "2", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(shard)
+
+
+def test_shards_split_the_reads(reads_fp):
+    names = [name for name, _ in stream_reads(reads_fp)]
+    shards = [[name for name, _ in GeneScore(reads_fp, "ACGT", shard=(index, 3)).iter_reads()] for index in (1, 2, 3)]
+    assert sorted(sum(shards, [])) == sorted(names)
+    assert shards[1] == names[1::3]
+
+
+@pytest.mark.parametrize("reads_fp", [150], indirect=True)
+@pytest.mark.parametrize("kmer_size", [None, 15])
+def test_merged_shards_match_single_run(reads_fp, tmp_path, kmer_size):
+    expected = ScoreMLST(reads_fp, MLST_FP, kmer_size=kmer_size, **OPTIONS)
+    expected_scores = expected.score_mlst()
+
+    partial_fps = score_shards(reads_fp, tmp_path, 3, kmer_size=kmer_size)
+    metadata, gene_accumulators = merge_partials(reversed(partial_fps))
+
+    assert metadata["shards"] == [1, 2, 3] and metadata["missing_shards"] == []
+    assert gene_accumulators == expected.gene_accumulators
+    assert final_scores(gene_accumulators) == expected_scores
+
+
+def test_save_and_load_partial(reads_fp, tmp_path):
+    scorer = ScoreMLST(reads_fp, MLST_FP, **OPTIONS)
+    scorer.score_mlst()
+    scorer.save_partial(str(tmp_path / "whole.npz"))
+    metadata, gene_accumulators = load_partial(str(tmp_path / "whole.npz"))
+    assert (metadata["shard"], metadata["shard_count"]) == (1, 1)
+    assert metadata["fingerprint"] == scorer.fingerprint()
+    assert gene_accumulators == scorer.gene_accumulators
+
+
+def test_merge_partials_rejects_mismatched_shards(reads_fp, tmp_path):
+    partial_fps = score_shards(reads_fp, tmp_path, 2)
+    with pytest.raises(ValueError):
+        merge_partials([partial_fps[0], partial_fps[0]])
+    with pytest.raises(ValueError):
+        merge_partials([])
+
+    other = ScoreMLST(reads_fp, MLST_FP, shard=(2, 2), match=2, mismatch=4, indel=1)
+    other.score_mlst()
+    other.save_partial(str(tmp_path / "other.npz"))
+    with pytest.raises(ValueError):
+        merge_partials([partial_fps[0], str(tmp_path / "other.npz")])
+
+    metadata, _ = merge_partials(partial_fps[:1])
+    assert metadata["missing_shards"] == [2]
+
+
+def test_adaptive_cannot_be_sharded(reads_fp):
+    with pytest.raises(ValueError):
+        GeneScore(reads_fp, "ACGT", shard=(1, 2), adaptive=True)
@@ -1,7 +1,13 @@
 """test_scoring.py"""
+import gzip
+import random
+import os
 import pytest
 from unittest.mock import patch, MagicMock
-from mlst_aligner.scoring import merge_scores, GeneScore
+from mlst_aligner.aligner import positional_scores
+from mlst_aligner.scoring import merge_scores, shuffled, GeneScore, ScoreAccumulator
+from mlst_aligner.utils import fetch_references, stream_reads, weighted_average
+from tests.conftest import DATA_DIR
 
 
 @pytest.mark.parametrize(
@@ -46,3 +52,142 @@ from mlst_aligner.scoring import merge_scores, GeneScore
     ])
 def test_merge_scores(input_dicts, expected_output):
     assert merge_scores(input_dicts) == expected_output
+
+
+@pytest.fixture
+def adk_reference():
+    return dict(fetch_references(os.path.join(DATA_DIR, "mlsts.fasta")))["adk_36"]
+
+
+def test_gene_score_engines_agree(small_reads_fp, adk_reference):
+    scores = [
+        GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2, engine=engine).get_t_score()
+        for engine in ("python", "numpy")
+    ]
+    assert scores[0] == scores[1]
+
+
+def test_gene_score_keeps_alignments_only_on_request(small_reads_fp, adk_reference):
+    score_only = GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2)
+    with_alignments = GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2, alignments=True)
+    assert score_only.get_t_score() == with_alignments.get_t_score()
+    assert score_only.alignments == []
+    assert len(with_alignments.alignments) == 8
+
+
+def test_score_accumulator_matches_weighted_averages():
+    score_dicts = [{1: (10, 2), 2: (20, 2)}, {2: (5, 1)}, {3: (7, 3), 1: (1, 1)}]
+    accumulator = ScoreAccumulator(4)
+    for scores_at_positions in score_dicts:
+        accumulator.add(scores_at_positions)
+    expected = sum(weighted_average(scores) for scores in merge_scores(score_dicts).values())
+    assert accumulator.total_score() == pytest.approx(expected)
+    assert ScoreAccumulator(4).total_score() == 0
+
+
+def test_score_accumulator_merge_and_multiplicity():
+    first, second, combined = ScoreAccumulator(3), ScoreAccumulator(3), ScoreAccumulator(3)
+    first.add({1: (4, 2)}, multiplicity=2)
+    second.add({1: (1, 1), 3: (2, 2)})
+    combined.add({1: (4, 2)})
+    combined.add({1: (4, 2)})
+    combined.add({1: (1, 1), 3: (2, 2)})
+    assert first.merge(second) == combined
+
+
+def test_gene_score_matches_merge_scores_path(small_reads_fp, adk_reference):
+    score_dicts = [positional_scores(2, -4, -2, sequence, adk_reference)[1] for _, sequence in stream_reads(small_reads_fp)]
+    expected = sum(weighted_average(scores) for scores in merge_scores(score_dicts).values()) // len(adk_reference)
+    assert GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2).get_t_score() == expected
+
+
+def test_gene_score_parallel_matches_serial(small_reads_fp, adk_reference):
+    serial = GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2)
+    parallel = GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2, workers=2, chunk_size=3)
+    assert serial.get_t_score() == parallel.get_t_score()
+    assert serial.accumulator == parallel.accumulator
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 64])
+def test_gene_score_batch_size_does_not_change_scores(small_reads_fp, adk_reference, batch_size):
+    reference_run = GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2, engine="python")
+    batched_run = GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2, batch_size=batch_size)
+    reference_run.get_scores()
+    batched_run.get_scores()
+    assert reference_run.accumulator == batched_run.accumulator
+
+
+
+def test_gene_score_reads_gzipped_fastq(tmp_path, small_reads_fp, adk_reference):
+    with open(small_reads_fp) as infile:
+        lines = [line.strip() for line in infile]
+    fastq_fp = tmp_path / "small_reads.fastq.gz"
+    with gzip.open(fastq_fp, "wt") as outfile:
+        for name, sequence in zip(lines[::2], lines[1::2]):
+            outfile.write(f"@{name[1:]}\n{sequence}\n+\n{'I' * len(sequence)}\n")
+    fasta_score = GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2).get_t_score()
+    fastq_score = GeneScore(str(fastq_fp), adk_reference, match=2, mismatch=-4, indel=-2).get_t_score()
+    assert fasta_score == fastq_score
+
+
+def test_gene_score_dedup_matches_full_path(tmp_path, small_reads_fp, adk_reference):
+    with open(small_reads_fp) as infile:
+        lines = infile.readlines()
+    duplicated_fp = tmp_path / "duplicated_reads.fasta"
+    duplicated_fp.write_text("".join(lines * 3 + lines[:4]))
+
+    full = GeneScore(str(duplicated_fp), adk_reference, match=2, mismatch=-4, indel=-2)
+    collapsed = GeneScore(str(duplicated_fp), adk_reference, match=2, mismatch=-4, indel=-2, dedup=True, batch_size=3)
+    assert full.get_t_score() == collapsed.get_t_score()
+    assert full.accumulator == collapsed.accumulator
+    assert collapsed.dedup_stats == {"reads": 26, "unique_reads": 8, "unique_fraction": 8 / 26, "alignments_saved": 18}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_gene_score_cache_only_aligns_misses(tmp_path, small_reads_fp, adk_reference, workers):
+    expected = GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2)
+    expected_score = expected.get_t_score()
+
+    first_run = GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2, cache_dir=str(tmp_path),
+                          workers=workers, chunk_size=3)
+    assert first_run.get_t_score() == expected_score
+    assert (first_run.cache.hits, first_run.cache.misses) == (0, 8)
+
+    second_run = GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2, cache_dir=str(tmp_path),
+                           workers=workers, chunk_size=3)
+    assert second_run.get_t_score() == expected_score
+    assert second_run.accumulator == expected.accumulator
+    assert (second_run.cache.hits, second_run.cache.misses) == (8, 0)
+
+    other_parameters = GeneScore(small_reads_fp, adk_reference, match=2, mismatch=4, indel=2, cache_dir=str(tmp_path))
+    other_parameters.get_t_score()
+    assert other_parameters.cache.misses == 8
+
+
+@pytest.mark.parametrize("buffer_size", [3, 100])
+def test_shuffled_is_a_seeded_permutation(buffer_size):
+    items = list(range(50))
+    order = list(shuffled(items, buffer_size, random.Random(1)))
+    assert sorted(order) == items and order != items
+    assert order == list(shuffled(iter(items), buffer_size, random.Random(1)))
+
+
+def test_gene_score_adaptive_uses_every_read_until_converged(small_reads_fp, adk_reference):
+    expected = GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2)
+    adaptive = GeneScore(small_reads_fp, adk_reference, match=2, mismatch=-4, indel=-2, adaptive=True,
+                         adaptive_batch_size=3, tolerance=0, patience=5)
+    assert adaptive.get_t_score() == expected.get_t_score()
+    assert adaptive.accumulator == expected.accumulator
+    assert adaptive.adaptive_stats["reads"] == 8 and adaptive.adaptive_stats["batches"] == 3
+    assert not adaptive.adaptive_stats["converged"]
+
+
+def test_gene_score_adaptive_stops_early(adk_reference):
+    reads_fp = os.path.join(DATA_DIR, "raw_reads_st73_subset_1000.fasta")
+    adaptive = GeneScore(reads_fp, adk_reference, match=2, mismatch=-4, indel=-2, adaptive=True,
+                         adaptive_batch_size=100, tolerance=0.01, patience=2, seed=3)
+    score = adaptive.get_t_score()
+    stats = adaptive.adaptive_stats
+    assert stats["converged"] and stats["reads"] < 1000
+    assert stats["estimate"] // 1 == score
+    assert 0 < stats["standard_error"] < 0.05 * stats["estimate"]
@@ -0,0 +1,84 @@
+"""test_server.py"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from mlst_aligner.mlst import ScoreMLST
+from mlst_aligner.server import ScoringServer, send_request
+from tests.conftest import DATA_DIR, MLST_FP
+
+
+def run_server(server):
+    """Runs a server on an event loop in a background thread and returns a function stopping it."""
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(server.serve_forever())
+
+    def serve():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        connections = asyncio.all_tasks(loop)
+        for connection in connections:
+            connection.cancel()
+        loop.run_until_complete(asyncio.gather(*connections, return_exceptions=True))
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not os.path.exists(server.socket_path):
+        if time.monotonic() > deadline:
+            loop.call_soon_threadsafe(task.cancel)
+            thread.join(timeout=1)
+            pytest.fail(f"server did not create {server.socket_path} within 10 seconds")
+        time.sleep(0.01)
+
+    def stop():
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join()
+        loop.close()
+
+    return stop
+
+
+def test_server_scores_reads(tmp_path, small_reads_fp):
+    server = ScoringServer(MLST_FP, str(tmp_path / "server.sock"), match=2, mismatch=4, indel=2)
+    stop = run_server(server)
+    try:
+        response = send_request({"reads": small_reads_fp, "sample": "small"}, server.socket_path)
+        expected = dict(ScoreMLST(small_reads_fp, MLST_FP, match=2, mismatch=4, indel=2).score_mlst())
+        assert response["ok"] and response["sample"] == "small"
+        assert response["scores"] == expected
+
+        missing = send_request({"reads": str(tmp_path / "missing.fasta")}, server.socket_path)
+        assert not missing["ok"] and "does not exist" in missing["error"]
+        assert not send_request({"command": "reboot"}, server.socket_path)["ok"]
+        stats = send_request({"command": "stats"}, server.socket_path)
+        assert (stats["completed"], stats["failed"], stats["running"]) == (1, 1, 0)
+    finally:
+        stop()
+    assert not os.path.exists(server.socket_path)
+
+
+def test_server_rejects_jobs_past_queue_limit(tmp_path):
+    with open(os.path.join(DATA_DIR, "raw_reads_st73_subset_1000.fasta")) as infile:
+        lines = infile.readlines()
+    reads_fp = tmp_path / "reads.fasta"
+    reads_fp.write_text("".join(lines[:200]))
+
+    server = ScoringServer(MLST_FP, str(tmp_path / "server.sock"), workers=1, max_queue=0, match=2, mismatch=4,
+                           indel=2)
+    stop = run_server(server)
+    try:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            running = pool.submit(send_request, {"reads": str(reads_fp)}, server.socket_path)
+            while send_request({"command": "stats"}, server.socket_path)["running"] == 0:
+                time.sleep(0.01)
+            rejected = send_request({"reads": str(reads_fp)}, server.socket_path)
+            assert running.result()["ok"]
+        assert not rejected["ok"] and "busy" in rejected["error"]
+        assert send_request({"command": "stats"}, server.socket_path)["rejected"] == 1
+    finally:
+        stop()
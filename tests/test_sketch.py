@@ -0,0 +1,95 @@
+"""test_sketch.py"""
+import os
+import numpy as np
+import pytest
+from mlst_aligner.mlst import ScoreMLST
+from mlst_aligner.sketch import (Sketch, exact_rankings, kmer_hashes, load_sketches, rank_alleles, save_sketches,
+                                 sketch_references, top_candidates)
+from mlst_aligner.utils import fetch_references, stream_reads
+from tests.conftest import DATA_DIR
+
+
+def test_kmer_hashes_skip_invalid_kmers():
+    assert len(kmer_hashes("ACGTACGT", 4)) == 5
+    assert len(kmer_hashes("ACGNACGT", 4)) == 1
+    assert len(kmer_hashes("ACG", 4)) == 0
+    hashes = kmer_hashes("ACGTACGT", 4)
+    assert hashes[0] == hashes[4] and len(set(hashes.tolist())) == 4
+
+
+def test_containment_of_scaled_sketches():
+    references = fetch_references(os.path.join(DATA_DIR, "mlsts.fasta"))
+    sequence = references[0][1]
+    for scaled in (1, 4):
+        whole, half = Sketch(21, scaled), Sketch(21, scaled)
+        whole.add([sequence])
+        half.add([sequence[:len(sequence) // 2]])
+        assert half.containment(whole) == 1.0
+        assert 0.3 < whole.containment(half) < 0.7
+    with pytest.raises(ValueError):
+        Sketch(21, 1).containment(Sketch(15, 1))
+
+
+def test_save_and_load_sketches(tmp_path):
+    references = fetch_references(os.path.join(DATA_DIR, "mlsts.fasta"))
+    sketches = sketch_references(references, k=15, scaled=2)
+    file_path = str(tmp_path / "sketches.npz")
+    save_sketches(file_path, sketches, references)
+    loaded = load_sketches(file_path, references, k=15, scaled=2)
+    assert list(loaded) == list(sketches)
+    for name, sketch in sketches.items():
+        assert (loaded[name].k, loaded[name].scaled) == (15, 2)
+        assert np.array_equal(loaded[name].hashes, sketch.hashes)
+
+    for options in ({"k": 21}, {"scaled": 1}, {"references": references[1:]}):
+        with pytest.raises(ValueError):
+            load_sketches(file_path, **options)
+
+
+def test_top_candidates_keep_ties():
+    rankings = {"adk": [("adk_1", 0.9), ("adk_2", 0.5), ("adk_3", 0.5), ("adk_4", 0.1)], "icd": [("icd_1", 0.0)]}
+    assert top_candidates(rankings, 1) == ["adk_1", "icd_1"]
+    assert top_candidates(rankings, 2) == ["adk_1", "adk_2", "adk_3", "icd_1"]
+
+
+def test_preselection_keeps_the_true_alleles(reads_fp, allele_db_fp):
+    options = {"match": 2, "mismatch": 4, "indel": 2}
+    exact = exact_rankings(ScoreMLST(reads_fp, allele_db_fp, **options).score_mlst())
+
+    scorer = ScoreMLST(reads_fp, allele_db_fp, sketch_top_k=1, **options)
+    gene_scores = scorer.score_mlst()
+    true_alleles = [name for name, _ in fetch_references(os.path.join(DATA_DIR, "mlsts.fasta"))]
+    assert {name for name, _ in gene_scores} >= set(true_alleles)
+    assert len(scorer.sketch_rankings) == 7 and all(len(ranking) == 3 for ranking in scorer.sketch_rankings.values())
+    for locus, ranking in exact_rankings(gene_scores).items():
+        assert ranking[0] == exact[locus][0]
+
+
+def test_sketch_ranking_never_drops_the_true_allele(allele_db_fp):
+    read_sketch = Sketch(21)
+    read_sketch.add(sequence for _, sequence in stream_reads(os.path.join(DATA_DIR, "raw_reads_st73_subset_10000.fasta")))
+    rankings = rank_alleles(sketch_references(fetch_references(allele_db_fp), k=21), read_sketch)
+    assert rankings["icd"][0][0] == "icd_13" and rankings["icd"][0][1] > rankings["icd"][1][1]
+    kept = top_candidates(rankings, 1)
+    assert set(kept) >= {name for name, _ in fetch_references(os.path.join(DATA_DIR, "mlsts.fasta"))}
+
+
+def test_preselection_with_prebuilt_sketches_and_routing(reads_fp, allele_db_fp):
+    references = fetch_references(allele_db_fp)
+    sketches = sketch_references(references, k=21, scaled=2)
+    scorer = ScoreMLST(reads_fp, allele_db_fp, sketch_top_k=1, allele_sketches=sketches, kmer_size=15)
+    assert len(scorer.score_mlst()) == len(scorer.references) == len(scorer.kmer_index.names)
+    assert len(scorer.all_references) == 21
+
+    with pytest.raises(ValueError):
+        ScoreMLST(reads_fp, allele_db_fp, sketch_top_k=1, allele_sketches=dict(list(sketches.items())[:5]))
+    with pytest.raises(ValueError):
+        ScoreMLST(reads_fp, allele_db_fp, sketch_top_k=1, shard=(1, 2))
+
+
+def test_rank_alleles_groups_by_locus():
+    read_sketch = Sketch(4)
+    read_sketch.add(["ACGTACGT"])
+    allele_sketches = sketch_references([("adk_1", "TTTTT"), ("adk_2", "ACGTAC"), ("icd_1", "ACGTTT")], k=4)
+    rankings = rank_alleles(allele_sketches, read_sketch)
+    assert rankings == {"adk": [("adk_2", 1.0), ("adk_1", 0.0)], "icd": [("icd_1", 1 / 3)]}
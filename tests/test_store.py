@@ -0,0 +1,62 @@
+"""test_store.py"""
+import gzip
+import numpy as np
+import pytest
+from mlst_aligner.mlst import ScoreMLST
+from mlst_aligner.scoring import GeneScore
+from mlst_aligner.store import ReadStore, encode_reads, is_read_store, pack_bases, unpack_bases
+from tests.conftest import MLST_FP, READS_FP
+
+
+@pytest.fixture
+def store_path(tmp_path, write_reads):
+    """Encodes the first 200 bundled reads into a read store."""
+    path = str(tmp_path / "reads.store")
+    encode_reads(write_reads(200), path)
+    return path
+
+
+def test_pack_and_unpack_bases():
+    sequence = np.frombuffer(b"ACGTTGCAACG", dtype=np.uint8)
+    packed, mask_positions, _ = pack_bases(sequence)
+    assert len(packed) == 3
+    assert len(mask_positions) == 0
+    assert unpack_bases(packed, 0, 11).tobytes() == b"ACGTTGCAACG"
+    assert unpack_bases(packed, 3, 9).tobytes() == b"TTGCAA"
+
+
+def test_encode_reads_round_trip_with_masked_bases(tmp_path):
+    reads = [("r1", "NACGTNNA"), ("r2", "A"), ("r3", ""), ("r4", "acgtRYACGT"), ("r5", "GATTACA")]
+    reads_fp = tmp_path / "reads.fastq.gz"
+    with gzip.open(reads_fp, "wt") as outfile:
+        outfile.writelines(f"@{name}\n{sequence}\n+\n{'I' * len(sequence)}\n" for name, sequence in reads)
+
+    # A tiny chunk size makes reads straddle the packed bytes of consecutive chunks.
+    metadata = encode_reads(str(reads_fp), str(tmp_path / "store"), chunk_size=2)
+    store = ReadStore(str(tmp_path / "store"))
+
+    assert metadata == {"version": 1, "reads": 5, "bases": 26, "masked_bases": 9}
+    assert is_read_store(str(tmp_path / "store")) and not is_read_store(str(tmp_path))
+    assert len(store) == 5
+    assert list(store.iter_reads(block_size=2)) == reads
+    assert store.sequences(1, 4) == ["A", "", "acgtRYACGT"]
+    assert store.lengths().tolist() == [8, 1, 0, 10, 7]
+
+
+def test_read_store_is_compact_and_memory_mapped(store_path):
+    store = ReadStore(store_path)
+    assert isinstance(store.bases, np.memmap)
+    assert store.bases.nbytes * 4 - store.metadata["bases"] < 4
+
+
+def test_gene_score_reads_store_like_fasta(store_path, tmp_path):
+    reference = dict(ScoreMLST(READS_FP, MLST_FP).references)["adk_36"]
+    expected = GeneScore(str(tmp_path / "reads.fasta"), reference, match=2, mismatch=4, indel=2).get_t_score()
+    for workers in (1, 2):
+        gene_score = GeneScore(store_path, reference, match=2, mismatch=4, indel=2, workers=workers, chunk_size=64)
+        assert gene_score.get_t_score() == expected
+
+
+def test_score_mlst_accepts_store(store_path, tmp_path):
+    expected = ScoreMLST(str(tmp_path / "reads.fasta"), MLST_FP, match=2, mismatch=4, indel=2).score_mlst()
+    assert ScoreMLST(store_path, MLST_FP, match=2, mismatch=4, indel=2).score_mlst() == expected
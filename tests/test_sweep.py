@@ -0,0 +1,25 @@
+"""test_sweep.py"""
+import pytest
+from mlst_aligner.mlst import ScoreMLST
+from mlst_aligner.sweep import parameter_grid, run_sweep
+from tests.conftest import MLST_FP
+
+
+def test_parameter_grid():
+    assert parameter_grid([1, 2], [-4], [-2, 1]) == [(1, -4, -2), (1, -4, 1), (2, -4, -2), (2, -4, 1)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sweep_matches_separate_runs(reads_fp, workers):
+    parameter_sets = [(2, -4, -2), (2, 4, 2), (1, 3, 1000)]
+    table = run_sweep(reads_fp, MLST_FP, parameter_sets, workers=workers, chunk_size=32, batch_size=16)
+
+    assert [(row["match"], row["mismatch"], row["indel"]) for row in table] == parameter_sets
+    for (match, mismatch, indel), row in zip(parameter_sets, table):
+        expected = ScoreMLST(reads_fp, MLST_FP, match=match, mismatch=mismatch, indel=indel).score_mlst()
+        assert [(gene_name, row[gene_name]) for gene_name, _ in expected] == expected
+
+
+def test_sweep_max_reads(reads_fp):
+    table = run_sweep(reads_fp, MLST_FP, [(2, 4, 2)], max_reads=0)
+    assert [value for key, value in table[0].items() if key not in ("match", "mismatch", "indel")] == [0] * 7
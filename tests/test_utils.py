@@ -1,10 +1,13 @@
 """utils.py"""
 
+import gzip
+import json
 import pytest
 import os
+import numpy as np
 from pysam import FastaFile
-from mlst_aligner.utils import read_fasta, weighted_average, subset_fasta, fetch_references
-from unittest.mock import patch, mock_open, MagicMock
+from mlst_aligner.utils import read_fasta, weighted_average, subset_fasta, fetch_references, save_npz, stream_reads
+from unittest.mock import MagicMock
 
 
 def create_temp_fasta_file(tmp_path, content=">seq1\nATCG"):
@@ -65,23 +68,49 @@ def test_weighted_average(scores, expected_average):
 
 def test_subset_fasta_creates_output_file(tmp_path):
     """
-    Test that the subset_fasta function creates an output file at the specified location.
+    Test that the subset_fasta function creates an output file with the first reads when not randomized.
     """
-    original_fasta = "path/to/original/test_data.fasta"
+    original_fasta = tmp_path / "original.fasta"
+    original_fasta.write_text(">seq1\nATGC\n>seq2 comment\nATGG\n>seq3\nTTTT\n")
     output_fasta = tmp_path / "output.fasta"
-    subset_count = 5
 
-    # Mock open to simulate reading and writing files
-    with patch("builtins.open", mock_open(read_data=">seq1\nATGC\n>seq2\nATGG\n")) as mocked_file:
-        # Assuming FastaFile is a custom class you're using to read FASTA files
-        with patch("mlst_aligner.utils.FastaFile") as MockFastaFile:
-            mock_fasta_file = MockFastaFile.return_value
-            mock_fasta_file.references = ['seq1', 'seq2']
-            mock_fasta_file.fetch.side_effect = ['ATGC', 'ATGG']
+    assert subset_fasta(str(original_fasta), 2, str(output_fasta)) == 2
+    assert output_fasta.read_text() == ">seq1\nATGC\n>seq2 comment\nATGG\n"
+    assert subset_fasta(str(original_fasta), 5, str(output_fasta)) == 3
 
-            subset_fasta(original_fasta, subset_count, str(output_fasta))
-            mocked_file.assert_called_with(str(output_fasta),
-                                           'w')  # Check if the output file was attempted to be opened for writing
+
+@pytest.fixture
+def numbered_fastq_gz(tmp_path):
+    """Writes a gzipped FASTQ file of 500 numbered reads."""
+    file_path = tmp_path / "reads.fastq.gz"
+    with gzip.open(file_path, "wt") as outfile:
+        for index in range(500):
+            outfile.write(f"@read{index}\nACGT\n+\nIIII\n")
+    return str(file_path)
+
+
+def test_subset_fasta_reservoir_is_reproducible(numbered_fastq_gz, tmp_path):
+    first, second, other = (str(tmp_path / name) for name in ("a.fastq.gz", "b.fastq.gz", "c.fasta"))
+    assert subset_fasta(numbered_fastq_gz, 50, first, randomize=True, seed=7) == 50
+    subset_fasta(numbered_fastq_gz, 50, second, randomize=True, seed=7)
+    subset_fasta(numbered_fastq_gz, 50, other, randomize=True, seed=8)
+
+    names = [name for name, _ in stream_reads(first)]
+    indices = [int(name[len("read"):]) for name in names]
+    assert names == [name for name, _ in stream_reads(second)]
+    assert names != [name for name, _ in stream_reads(other)]
+    assert indices == sorted(indices) and len(set(indices)) == 50
+    # The sample is spread over the whole file, not taken from its start.
+    assert max(indices) > 250
+    with gzip.open(first, "rt") as infile:
+        assert infile.readline().startswith("@read") and infile.readlines()[1] == "+\n"
+
+
+def test_subset_fasta_rejects_fastq_output_without_qualities(tmp_path):
+    original_fasta = tmp_path / "original.fasta"
+    original_fasta.write_text(">seq1\nATGC\n")
+    with pytest.raises(ValueError):
+        subset_fasta(str(original_fasta), 1, str(tmp_path / "output.fastq"))
 
 
 @pytest.fixture
@@ -119,3 +148,42 @@ def test_fetch_references_with_invalid_extension(mocker):
     mocker.patch('mlst_aligner.utils.read_fasta', side_effect=ValueError("Invalid file extension."))
     file_path = 'invalid.txt'
     assert fetch_references(file_path) == [], "fetch_references should return an empty list for files with invalid extensions."
+
+
+@pytest.mark.parametrize("file_name, content, opener", [
+    ("reads.fasta", ">seq1\nATCG\n>seq2 comment\nGG\nCC\n", open),
+    ("reads.fq", "@seq1\nATCG\n+\nIIII\n@seq2 comment\nGGCC\n+\nIIII\n", open),
+    ("reads.fa.gz", ">seq1\nATCG\n>seq2\nGGCC\n", gzip.open),
+    ("reads.fastq.gz", "@seq1\nATCG\n+\nIIII\n@seq2\nGGCC\n+\nIIII\n", gzip.open),
+])
+def test_stream_reads(tmp_path, file_name, content, opener):
+    """
+    Test that stream_reads yields names and sequences from plain and gzipped FASTA/FASTQ files without an index.
+    """
+    file_path = tmp_path / file_name
+    with opener(file_path, "wt") as f:
+        f.write(content)
+    assert list(stream_reads(str(file_path))) == [("seq1", "ATCG"), ("seq2", "GGCC")]
+    assert not os.path.exists(str(file_path) + ".fai")
+
+
+def test_stream_reads_invalid_paths(tmp_path):
+    """
+    Test that stream_reads raises the same errors as read_fasta for missing files and unsupported extensions.
+    """
+    with pytest.raises(FileNotFoundError):
+        next(stream_reads("non_existing_file.fastq"))
+    file_path = tmp_path / "reads.txt.gz"
+    file_path.touch()
+    with pytest.raises(ValueError):
+        next(stream_reads(str(file_path)))
+
+
+def test_save_npz_replaces_the_file(tmp_path):
+    file_path = str(tmp_path / "arrays.npz")
+    save_npz(file_path, {"version": 1}, {"values": np.arange(3)})
+    save_npz(file_path, {"version": 2}, {"values": np.arange(4)})
+    with np.load(file_path) as arrays:
+        assert json.loads(str(arrays["metadata"])) == {"version": 2}
+        assert arrays["values"].tolist() == [0, 1, 2, 3]
+    assert os.listdir(tmp_path) == ["arrays.npz"]